@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.interfaces.actuator import ActuatorInterface
+from app.utils.logger import logger
+from app.utils.mailbox import LatestValueMailbox
+from app.utils.stats import RunningStats
+
+
+class ActuatorWriter(ActuatorInterface):
+    """
+    ActuatorWriter decouples actuator writes from the thread requesting them.
+    Attributes:
+        actuator (ActuatorInterface): The actuator performing the actual, blocking writes.
+        pending (LatestValueMailbox[Tuple[int, float]]): Single slot holding the newest unsent
+            value, stamped with the override generation it was queued in.
+        write_latency (RunningStats): Duration of the completed writes in seconds.
+    Methods:
+        __init__(actuator: ActuatorInterface):
+            Initializes the ActuatorWriter around the given actuator.
+        start() -> None:
+            Starts the writer thread.
+        update(value: float) -> None:
+            Queues the value, superseding an older value that was not sent yet.
+        override(value: float) -> None:
+            Discards the queued value, waits for the write in flight and writes the value.
+        stats() -> Dict[str, float]:
+            Returns write counters and latency statistics.
+    """
+
+    def __init__(self, actuator: ActuatorInterface):
+        self.actuator = actuator
+        self.pending: LatestValueMailbox[Tuple[int, float]] = LatestValueMailbox()
+        self.write_latency = RunningStats()
+        self.failed_writes = 0
+        self.discarded = 0
+        self._generation = 0
+        # Held while writing, so an override waits for the write in flight
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the writer thread, at most one write is in flight at a time"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread after the write in flight completed"""
+        self.pending.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def update(self, value: float) -> None:
+        self.pending.put((self._generation, value))
+
+    def override(self, value: float) -> None:
+        # Values queued before, even one already taken by the writer thread, are stale
+        self._generation += 1
+        with self._write_lock:
+            self.actuator.override(value)
+
+    def _run(self) -> None:
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            generation, value = item
+            with self._write_lock:
+                if generation != self._generation:
+                    self.discarded += 1
+                    continue
+                started = time.monotonic()
+                try:
+                    self.actuator.update(value)
+                except Exception as e:
+                    self.failed_writes += 1
+                    logger.error(f"Error updating actuator: {e}")
+                    continue
+                self.write_latency.add(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, float]:
+        """Return write counters and write latency statistics."""
+        return {
+            "requested": self.pending.received,
+            "superseded": self.pending.dropped,
+            "failed": self.failed_writes,
+            "discarded": self.discarded,
+            "pending": self.pending.stats()["pending"],
+            **self.write_latency.as_dict("write_latency_s_"),
+        }
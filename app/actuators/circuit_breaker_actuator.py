@@ -0,0 +1,115 @@
+from typing import Callable, Dict, Optional
+
+from app.interfaces.actuator import ActuatorInterface, AsyncActuatorInterface
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.logger import logger
+
+
+def _record_failure(breaker: CircuitBreaker, error: Exception) -> None:
+    """Report a failed write to the breaker, logging when it opens"""
+    was_open = breaker.state == "open"
+    breaker.record_failure()
+    if breaker.state == "open" and not was_open:
+        logger.error(f"Actuator circuit opened after error: {error}")
+    else:
+        logger.warning(f"Actuator update failed: {error}")
+
+
+class CircuitBreakerActuator(ActuatorInterface):
+    """
+    CircuitBreakerActuator stops calling an actuator while its backend keeps failing.
+    While the breaker is open, updates are rejected immediately instead of waiting for
+    the request timeout; the next update after the reset timeout probes the backend.
+    A failed update is logged and counted rather than raised to the caller.
+    Overrides are attempted even while the breaker is open and raise on failure.
+    Attributes:
+        actuator (ActuatorInterface): The actuator performing the writes.
+        breaker (CircuitBreaker): The breaker deciding whether a write is attempted.
+        on_failure (Optional[Callable[[], None]]): Called when an update failed or was rejected.
+    Methods:
+        __init__(actuator: ActuatorInterface, breaker: CircuitBreaker, on_failure=None):
+            Initializes the CircuitBreakerActuator around the given actuator.
+        update(value: float) -> None:
+            Writes the value unless the breaker is open.
+        override(value: float) -> None:
+            Writes the value regardless of the breaker state.
+        stats() -> Dict[str, float]:
+            Returns the breaker state and counters.
+    """
+
+    def __init__(
+        self,
+        actuator: ActuatorInterface,
+        breaker: CircuitBreaker,
+        on_failure: Optional[Callable[[], None]] = None,
+    ):
+        self.actuator = actuator
+        self.breaker = breaker
+        self.on_failure = on_failure
+        self.failed_writes = 0
+
+    def update(self, value: float) -> None:
+        if not self.breaker.allow():
+            self._failed()
+            return
+        try:
+            self.actuator.update(value)
+        except Exception as e:
+            self.failed_writes += 1
+            _record_failure(self.breaker, e)
+            self._failed()
+            return
+        self.breaker.record_success()
+
+    def override(self, value: float) -> None:
+        self.actuator.override(value)
+
+    def _failed(self) -> None:
+        if self.on_failure is not None:
+            self.on_failure()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the breaker state and counters."""
+        return {"failed_writes": self.failed_writes, **self.breaker.stats()}
+
+
+class AsyncCircuitBreakerActuator(AsyncActuatorInterface):
+    """
+    AsyncCircuitBreakerActuator stops calling an async actuator while its backend keeps failing.
+    Attributes:
+        actuator (AsyncActuatorInterface): The actuator performing the writes.
+        breaker (CircuitBreaker): The breaker deciding whether a write is attempted.
+        on_failure (Optional[Callable[[], None]]): Called when an update failed or was rejected.
+    """
+
+    def __init__(
+        self,
+        actuator: AsyncActuatorInterface,
+        breaker: CircuitBreaker,
+        on_failure: Optional[Callable[[], None]] = None,
+    ):
+        self.actuator = actuator
+        self.breaker = breaker
+        self.on_failure = on_failure
+        self.failed_writes = 0
+
+    async def update(self, value: float) -> None:
+        if not self.breaker.allow():
+            self._failed()
+            return
+        try:
+            await self.actuator.update(value)
+        except Exception as e:
+            self.failed_writes += 1
+            _record_failure(self.breaker, e)
+            self._failed()
+            return
+        self.breaker.record_success()
+
+    def _failed(self) -> None:
+        if self.on_failure is not None:
+            self.on_failure()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the breaker state and counters."""
+        return {"failed_writes": self.failed_writes, **self.breaker.stats()}
@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Dict, Optional
+
+from app.interfaces.actuator import ActuatorInterface, AsyncActuatorInterface
+
+
+class OutputFilter:
+    """
+    Suppresses actuator writes that would not change the actuator state noticeably.
+
+    Values are first quantized to the actuator resolution. A quantized value is
+    suppressed while it stays within the deadband around the last sent value,
+    unless the last write is older than the heartbeat interval.
+
+    A value is taken as sent once it passes the filter. If writing it fails, call
+    `reset` so the next value is forwarded instead of being suppressed against a
+    value the actuator never received.
+
+    Parameters
+    ----------
+    deadband_abs : float
+        Absolute deadband around the last sent value
+    deadband_rel : float
+        Deadband relative to the magnitude of the last sent value
+    quantum : Optional[float]
+        Actuator resolution values are rounded to, None to disable quantization
+    heartbeat_s : Optional[float]
+        Resend an unchanged value after this many seconds, None to never resend
+    time_fn : Callable[[], float]
+        Clock returning seconds, defaults to `time.monotonic`
+    """
+
+    def __init__(
+        self,
+        deadband_abs: float = 0.0,
+        deadband_rel: float = 0.0,
+        quantum: Optional[float] = None,
+        heartbeat_s: Optional[float] = None,
+        time_fn: Callable[[], float] = time.monotonic,
+    ):
+        self.deadband_abs = deadband_abs
+        self.deadband_rel = deadband_rel
+        self.quantum = quantum
+        self.heartbeat_s = heartbeat_s
+        self.time_fn = time_fn
+
+        self.last_sent: Optional[float] = None
+        self._last_sent_at = 0.0
+        self.forwarded = 0
+        self.suppressed = 0
+        self.heartbeats = 0
+
+    def filter(self, value: float) -> Optional[float]:
+        """
+        Return the value to send, or None if the write should be suppressed.
+        """
+        if self.quantum:
+            value = round(value / self.quantum) * self.quantum
+
+        now = self.time_fn()
+        if self.last_sent is not None:
+            band = max(self.deadband_abs, self.deadband_rel * abs(self.last_sent))
+            if abs(value - self.last_sent) <= band:
+                if (
+                    self.heartbeat_s is None
+                    or now - self._last_sent_at < self.heartbeat_s
+                ):
+                    self.suppressed += 1
+                    return None
+                self.heartbeats += 1
+
+        self.last_sent = value
+        self._last_sent_at = now
+        self.forwarded += 1
+        return value
+
+    def reset(self) -> None:
+        """Forget the last sent value after a failed write or a write around the filter"""
+        self.last_sent = None
+
+    def stats(self) -> Dict[str, float]:
+        """Return forwarded, suppressed and heartbeat write counters."""
+        return {
+            "forwarded": self.forwarded,
+            "suppressed": self.suppressed,
+            "heartbeats": self.heartbeats,
+        }
+
+
+class FilteredActuator(ActuatorInterface):
+    """
+    FilteredActuator only forwards values passing an OutputFilter.
+    Overrides are always forwarded and reset the filter.
+    Attributes:
+        actuator (ActuatorInterface): The actuator receiving the forwarded values.
+        output_filter (OutputFilter): The filter deciding which values are sent.
+    """
+
+    def __init__(self, actuator: ActuatorInterface, output_filter: OutputFilter):
+        self.actuator = actuator
+        self.output_filter = output_filter
+
+    def update(self, value: float) -> None:
+        value = self.output_filter.filter(value)
+        if value is not None:
+            try:
+                self.actuator.update(value)
+            except Exception:
+                self.output_filter.reset()
+                raise
+
+    def override(self, value: float) -> None:
+        try:
+            self.actuator.override(value)
+        finally:
+            # The actuator no longer holds the last value the filter let through
+            self.output_filter.reset()
+
+
+class AsyncFilteredActuator(AsyncActuatorInterface):
+    """
+    AsyncFilteredActuator only forwards values passing an OutputFilter.
+    Attributes:
+        actuator (AsyncActuatorInterface): The actuator receiving the forwarded values.
+        output_filter (OutputFilter): The filter deciding which values are sent.
+    """
+
+    def __init__(self, actuator: AsyncActuatorInterface, output_filter: OutputFilter):
+        self.actuator = actuator
+        self.output_filter = output_filter
+
+    async def update(self, value: float) -> None:
+        value = self.output_filter.filter(value)
+        if value is not None:
+            try:
+                await self.actuator.update(value)
+            except Exception:
+                self.output_filter.reset()
+                raise
@@ -1,33 +1,118 @@
-from app.interfaces.actuator import ActuatorInterface
+import time
+from typing import Optional, Union
+
+import httpx
+
+from app.interfaces.actuator import ActuatorInterface, AsyncActuatorInterface
+from app.utils.adaptive_timeout import AdaptiveTimeout
 from app.utils.config import config
 from app.utils.logger import logger
-from app.utils.influx_client import influx_connector
+from app.utils.metrics import STAGE_SECONDS
 from app.swncrew_backend_client import Client
+from app.swncrew_backend_client.errors import UnexpectedStatus
+from app.swncrew_backend_client.models.http_validation_error import HTTPValidationError
 from app.swncrew_backend_client.models.proportional_valve import ProportionalValve
+from app.swncrew_backend_client.types import Response
 from app.swncrew_backend_client.api.proportional_valves import (
     set_state_v1_actuators_proportional_set_post,
 )
 
+_POST_SECONDS = STAGE_SECONDS.labels(stage="actuator_post")
+
+
+def _check(response: Response[Union[HTTPValidationError, ProportionalValve]]) -> None:
+    """Raise for a response that did not apply the state"""
+    if not 200 <= response.status_code < 300:
+        raise UnexpectedStatus(response.status_code, response.content)
+
 
 class ProportionalValveActuator(ActuatorInterface):
     """
     ProportionalValveActuator is responsible for controlling a proportional valve actuator.
     Attributes:
-        client (Client): The client used to communicate with the actuator.
+        client (Client): The client used to communicate with the actuator. It must be
+            dedicated to this actuator, as its request timeout follows `timeout`.
+        timeout (Optional[AdaptiveTimeout]): Adapts the request timeout to the observed latency.
+        valve_id (int): The valve to control, defaults to `PROPORTIONAL_VALVE_ID`.
     Methods:
-        __init__(client: Client):
+        __init__(client: Client, timeout: Optional[AdaptiveTimeout] = None,
+                 valve_id: Optional[int] = None):
             Initializes the ProportionalValveActuator with the given client.
         update(value: float) -> None:
             Updates the state of the proportional valve actuator with the given value and timestamp.
-            Logs the response from the actuator.
+            Raises UnexpectedStatus if the actuator does not answer with a 2xx status.
     """
 
-    def __init__(self, client: Client):
+    def __init__(
+        self,
+        client: Client,
+        timeout: Optional[AdaptiveTimeout] = None,
+        valve_id: Optional[int] = None,
+    ):
         self.client = client
+        self.timeout = timeout
+        self.valve_id = config.PROPORTIONAL_VALVE_ID if valve_id is None else valve_id
+        self._timeout_s: Optional[float] = None
 
     def update(self, value: float) -> None:
+        update_request = ProportionalValve(id=self.valve_id, state=value)
+        if self.timeout is not None and self.timeout.current_s != self._timeout_s:
+            self._timeout_s = self.timeout.current_s
+            self.client.get_httpx_client().timeout = httpx.Timeout(self._timeout_s)
+        started = time.perf_counter()
+        try:
+            response = set_state_v1_actuators_proportional_set_post.sync_detailed(
+                client=self.client, body=update_request
+            )
+        except httpx.TimeoutException:
+            if self.timeout is not None:
+                self.timeout.observe_timeout()
+            raise
+        elapsed = time.perf_counter() - started
+        _POST_SECONDS.observe(elapsed)
+        logger.debug(f"Actuator update response: {response.status_code}")
+        _check(response)
+        if self.timeout is not None:
+            self.timeout.observe(elapsed)
+
+
+class AsyncProportionalValveActuator(AsyncActuatorInterface):
+    """
+    AsyncProportionalValveActuator controls a proportional valve from an asyncio event loop.
+    Attributes:
+        client (Client): The client used to communicate with the actuator. It must be
+            dedicated to this actuator, as its request timeout follows `timeout`.
+        timeout (Optional[AdaptiveTimeout]): Adapts the request timeout to the observed latency.
+    Methods:
+        __init__(client: Client, timeout: Optional[AdaptiveTimeout] = None):
+            Initializes the AsyncProportionalValveActuator with the given client.
+        update(value: float) -> None:
+            Sends the new state through the client's async HTTP connection pool.
+            Raises UnexpectedStatus if the actuator does not answer with a 2xx status.
+    """
+
+    def __init__(self, client: Client, timeout: Optional[AdaptiveTimeout] = None):
+        self.client = client
+        self.timeout = timeout
+        self._timeout_s: Optional[float] = None
+
+    async def update(self, value: float) -> None:
         update_request = ProportionalValve(id=config.PROPORTIONAL_VALVE_ID, state=value)
-        response = set_state_v1_actuators_proportional_set_post.sync(
-            client=self.client, body=update_request
-        )
-        logger.debug(f"Actuator update response: {response}")
+        if self.timeout is not None and self.timeout.current_s != self._timeout_s:
+            self._timeout_s = self.timeout.current_s
+            self.client.get_async_httpx_client().timeout = httpx.Timeout(self._timeout_s)
+        started = time.perf_counter()
+        try:
+            response = await set_state_v1_actuators_proportional_set_post.asyncio_detailed(
+                client=self.client, body=update_request
+            )
+        except httpx.TimeoutException:
+            if self.timeout is not None:
+                self.timeout.observe_timeout()
+            raise
+        elapsed = time.perf_counter() - started
+        _POST_SECONDS.observe(elapsed)
+        logger.debug(f"Actuator update response: {response.status_code}")
+        _check(response)
+        if self.timeout is not None:
+            self.timeout.observe(elapsed)
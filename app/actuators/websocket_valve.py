@@ -0,0 +1,267 @@
+import json
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import websocket
+
+from app.interfaces.actuator import ActuatorInterface
+from app.utils.config import config
+from app.utils.logger import logger
+from app.utils.stats import RunningStats
+
+
+class WebSocketValveActuator(ActuatorInterface):
+    """
+    WebSocketValveActuator streams proportional valve states over a persistent WebSocket.
+    Every command is a single frame ``{"seq": n, "id": valve_id, "state": value}``; the
+    backend acknowledges it with a frame carrying the same ``seq``. While the channel is
+    down, or when acknowledgements stop arriving in time, commands are sent through the
+    fallback actuator instead and the channel is reconnected in the background. If the latest
+    command is not acknowledged before the channel goes down, it is resent through the fallback
+    unless a newer command superseded it.
+    An override is sent behind the earlier commands on the channel and waits for its
+    acknowledgement. Without the channel, or without the acknowledgement, it waits until
+    the earlier commands are acknowledged or overdue before it is written through the
+    fallback, so no earlier command can arrive after it.
+    Attributes:
+        url (str): The WebSocket URL of the actuator command channel.
+        fallback (ActuatorInterface): The actuator used while the channel is unavailable.
+        ack_timeout_s (float): Time after which an unacknowledged command marks the channel as down.
+        ack_latency (RunningStats): Round trip time of acknowledged commands in seconds.
+        valve_id (int): The valve to control, defaults to `PROPORTIONAL_VALVE_ID`.
+    Methods:
+        __init__(fallback: ActuatorInterface, url: Optional[str] = None, ack_timeout_s: float = 0.5,
+                 reconnect_interval_s: float = 1.0, valve_id: Optional[int] = None):
+            Initializes the actuator with its fallback.
+        start() -> None:
+            Starts the connection thread.
+        update(value: float) -> None:
+            Sends the value over the channel, or through the fallback if the channel is down.
+        override(value: float) -> None:
+            Writes the value after all earlier commands, superseding unacknowledged ones.
+        stats() -> Dict[str, float]:
+            Returns command, acknowledgement, fallback and resend counters.
+    """
+
+    def __init__(
+        self,
+        fallback: ActuatorInterface,
+        url: Optional[str] = None,
+        ack_timeout_s: float = 0.5,
+        reconnect_interval_s: float = 1.0,
+        valve_id: Optional[int] = None,
+    ):
+        self.valve_id = config.PROPORTIONAL_VALVE_ID if valve_id is None else valve_id
+        self.url = url or (
+            f"ws://{config.BACKEND_BASE}/v1/actuators/proportional/ws/{self.valve_id}"
+        )
+        self.fallback = fallback
+        self.ack_timeout_s = ack_timeout_s
+        self.reconnect_interval_s = reconnect_interval_s
+
+        self.sent = 0
+        self.acked = 0
+        self.ack_timeouts = 0
+        self.fallbacks = 0
+        self.resent = 0
+        self.connects = 0
+        self.ack_latency = RunningStats()
+
+        self._ws: Optional[websocket.WebSocket] = None
+        self._seq = 0
+        self._pending: Dict[int, float] = {}
+        self._last_sent: Optional[Tuple[int, float]] = None
+        self._last_acked = 0
+        self._lock = threading.Lock()
+        self._acked = threading.Condition(self._lock)
+        self._fallback_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the connection thread keeping the channel open"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Close the channel and stop the connection thread"""
+        self._stop.set()
+        self._close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether commands are currently sent over the channel"""
+        return self._ws is not None
+
+    def update(self, value: float) -> None:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        if self._ws is not None and not self._acks_overdue():
+            try:
+                self._send(seq, value)
+                return
+            except Exception as e:
+                logger.warning(f"Actuator channel send failed: {e}")
+                self._close()
+
+        self.fallbacks += 1
+        self._write_fallback(seq, value)
+
+    def override(self, value: float) -> None:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            # Earlier commands must not be resent after this one
+            self._last_sent = None
+        if self._ws is not None and not self._acks_overdue():
+            try:
+                self._send(seq, value)
+                with self._lock:
+                    if self._acked.wait_for(
+                        lambda: self._last_acked >= seq, self.ack_timeout_s
+                    ):
+                        return
+            except Exception as e:
+                logger.warning(f"Actuator channel send failed: {e}")
+            with self._lock:
+                self._last_sent = None
+            self._close()
+
+        self._await_unacked()
+        self.fallbacks += 1
+        with self._fallback_lock:
+            self.fallback.override(value)
+
+    def _await_unacked(self) -> None:
+        """Wait until all commands sent on the channel are acknowledged or overdue"""
+        with self._lock:
+            newest = max(self._pending.values(), default=None)
+        if newest is not None:
+            time.sleep(max(newest + self.ack_timeout_s - time.monotonic(), 0.0))
+            self._acks_overdue()
+
+    def _send(self, seq: int, value: float) -> None:
+        with self._lock:
+            self._pending[seq] = time.monotonic()
+            self._last_sent = (seq, value)
+        self._ws.send(
+            json.dumps({"seq": seq, "id": self.valve_id, "state": value})
+        )
+        self.sent += 1
+
+    def _write_fallback(self, seq: int, value: float) -> bool:
+        """Write command `seq` through the fallback unless a newer command superseded it"""
+        with self._fallback_lock:
+            if seq != self._seq:
+                return False
+            self.fallback.update(value)
+            return True
+
+    def _resend_unacked(self) -> None:
+        """Resend the last channel command through the fallback if it was not acknowledged"""
+        with self._lock:
+            last_sent, self._last_sent = self._last_sent, None
+        if last_sent is None:
+            return
+        seq, value = last_sent
+        try:
+            if self._write_fallback(seq, value):
+                self.resent += 1
+                logger.warning(f"Resent unacknowledged actuator command {seq} through the fallback")
+        except Exception as e:
+            logger.error(f"Resending actuator command {seq} failed: {e}")
+
+    def _acks_overdue(self) -> bool:
+        """Check for commands waiting longer than the ack timeout, closing the channel if so"""
+        deadline = time.monotonic() - self.ack_timeout_s
+        with self._lock:
+            overdue = [seq for seq, sent in self._pending.items() if sent < deadline]
+            for seq in overdue:
+                del self._pending[seq]
+        if not overdue:
+            return False
+        self.ack_timeouts += len(overdue)
+        logger.warning(f"{len(overdue)} actuator commands not acknowledged, using fallback")
+        self._close()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                ws = websocket.create_connection(self.url, timeout=self.reconnect_interval_s)
+            except Exception as e:
+                logger.debug("Actuator channel unavailable: %s", e)
+                self._stop.wait(self.reconnect_interval_s)
+                continue
+
+            # Wake up regularly to notice overdue acknowledgements while no commands are sent
+            ws.settimeout(self.ack_timeout_s)
+            with self._lock:
+                self._pending.clear()
+            self._ws = ws
+            self.connects += 1
+            logger.info("Actuator channel opened")
+            self._receive(ws)
+            self._close()
+            logger.info("Actuator channel closed")
+            if not self._stop.is_set():
+                self._resend_unacked()
+
+    def _receive(self, ws: websocket.WebSocket) -> None:
+        while not self._stop.is_set() and self._ws is ws:
+            try:
+                message = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                if self._acks_overdue():
+                    return
+                continue
+            except Exception:
+                return
+            if not message:
+                return
+            try:
+                seq = int(json.loads(message)["seq"])
+            except Exception as e:
+                logger.warning(f"Invalid actuator acknowledgement: {e}")
+                continue
+            with self._lock:
+                sent = self._pending.pop(seq, None)
+                if self._last_sent is not None and self._last_sent[0] == seq:
+                    self._last_sent = None
+                if sent is not None:
+                    self._last_acked = max(self._last_acked, seq)
+                    self._acked.notify_all()
+            if sent is not None:
+                self.acked += 1
+                self.ack_latency.add(time.monotonic() - sent)
+
+    def _close(self) -> None:
+        """Drop the connection without a closing handshake, waking up the receiver"""
+        ws, self._ws = self._ws, None
+        if ws is None or ws.sock is None:
+            return
+        try:
+            ws.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        ws.shutdown()
+
+    def stats(self) -> Dict[str, float]:
+        """Return command, acknowledgement and fallback counters."""
+        return {
+            "connected": int(self.connected),
+            "connects": self.connects,
+            "sent": self.sent,
+            "acked": self.acked,
+            "ack_timeouts": self.ack_timeouts,
+            "fallbacks": self.fallbacks,
+            "resent": self.resent,
+            **self.ack_latency.as_dict("ack_latency_s_"),
+        }
@@ -0,0 +1,115 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.interfaces.controller import ControllerInterface
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.logger import logger
+
+
+class _Reply:
+    """One-shot result slot; a pre-acquired lock is cheaper to wait on than a Future"""
+
+    __slots__ = ("_done", "result", "error")
+
+    def __init__(self):
+        self._done = threading.Lock()
+        self._done.acquire()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+
+    def set(self, result: Any, error: Optional[Exception] = None) -> None:
+        self.result = result
+        self.error = error
+        self._done.release()
+
+    def wait(self) -> Any:
+        self._done.acquire()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+_Command = Tuple[Callable[..., Any], Tuple[Any, ...], Optional[_Reply]]
+
+
+class ControlActor(ControllerInterface):
+    """
+    Single-writer front end of a controller.
+
+    Every call is turned into a command on a queue and executed by one actor
+    thread, so the controller state is only ever mutated from that thread, in
+    the order the commands arrived, regardless of how many threads deliver
+    sensor readings, setpoints or watchdog events. `calculate_update` waits for
+    the result of its command; setpoint and hold/release commands are fire and
+    forget.
+
+    Readers do not go through the actor: the controller publishes an immutable
+    snapshot after every command, which can be read from any thread without
+    locking.
+
+    Parameters
+    ----------
+    controller : ControllerInterface
+        Controller owned by the actor thread
+    """
+
+    def __init__(self, controller: ControllerInterface):
+        self.controller = controller
+        self.commands = 0
+        self.failed_commands = 0
+        self._queue: "queue.SimpleQueue[Optional[_Command]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the actor thread"""
+        self._thread = threading.Thread(target=self._run, name="control-actor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the actor thread after the queued commands were executed"""
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
+        reply = _Reply()
+        self._queue.put((self.controller.calculate_update, (sensor_reading,), reply))
+        return reply.wait()
+
+    def set_setpoint(self, setpoint: Optional[float]) -> None:
+        self._queue.put((self.controller.set_setpoint, (setpoint,), None))
+
+    def hold(self) -> None:
+        self._queue.put((self.controller.hold, (), None))
+
+    def release(self, output: Optional[float] = None) -> None:
+        self._queue.put((self.controller.release, (output,), None))
+
+    def _run(self) -> None:
+        while True:
+            command = self._queue.get()
+            if command is None:
+                return
+            method, args, reply = command
+            self.commands += 1
+            try:
+                result = method(*args)
+            except Exception as e:
+                self.failed_commands += 1
+                if reply is not None:
+                    reply.set(None, e)
+                else:
+                    logger.error(f"Error in controller command {method.__name__}: {e}")
+                continue
+            if reply is not None:
+                reply.set(result)
+
+    def stats(self) -> Dict[str, float]:
+        """Return executed, failed and queued command counters."""
+        return {
+            "commands": self.commands,
+            "failed_commands": self.failed_commands,
+            "pending": self._queue.qsize(),
+        }
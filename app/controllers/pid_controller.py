@@ -1,42 +1,307 @@
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Literal, NamedTuple, Optional
 from simple_pid import PID
 
 from app.interfaces.controller import ControllerInterface
 from app.swncrew_backend_client.models.sensor_reading import SensorReading
 from app.utils.config import config
-from app.utils.influx_client import influx_connector
+from app.utils.controller_state import ControllerState, ControllerStateFile
 from app.utils.logger import logger
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.pid_history import PIDHistoryBuffer
+
+if TYPE_CHECKING:
+    from app.utils.influx_client import InfluxConnector
+
+_PID_STEP_SECONDS = STAGE_SECONDS.labels(stage="pid_step")
+_TELEMETRY_SECONDS = STAGE_SECONDS.labels(stage="influx_write")
+
+TimeBase = Literal["monotonic", "sensor"]
+
+# Time step of a recompute on the same reading, simple_pid's own step when no time passed
+_NO_TIME_S = 1e-16
+
+
+class PIDSnapshot(NamedTuple):
+    """Immutable view of the controller state after a step or command"""
+
+    timestamp_ns: Optional[int]
+    measurement: Optional[float]
+    setpoint: float
+    P: float
+    I: float
+    D: float
+    output: Optional[float]
+    auto_mode: bool
 
 
 class PIDController(ControllerInterface):
-    def __init__(self):
+    """
+    Controller backed by a single `simple_pid.PID`.
+
+    Parameters
+    ----------
+    time_fn : Optional[Callable[[], float]]
+        Clock returning seconds, None for `simple_pid`'s default monotonic clock
+    telemetry : Optional[InfluxConnector]
+        Connector receiving the PID state after every update, None for no telemetry
+    history_size : Optional[int]
+        Number of recent steps kept in memory, defaults to `PID_HISTORY_SIZE`, 0 to disable
+    history_path : Optional[str]
+        File backing the step history so other processes can read it, None to keep it
+        in process memory
+    time_base : Optional[TimeBase]
+        "monotonic" to let `simple_pid` time steps with `time_fn`, "sensor" to derive the
+        time step from `SensorReading.timestamp_ns`, defaults to `PID_TIME_BASE`.
+        With sensor time, readings not newer than the last processed one are skipped and
+        every other reading computes a new output, regardless of the sensor rate. The
+        first step after a setpoint message may recompute on the last processed reading,
+        without time passing, so the new setpoint applies right away.
+    state_file : Optional[ControllerStateFile]
+        File receiving a snapshot of the controller state every `state_interval_s`
+        and after every command, None to not persist the state
+    state_interval_s : Optional[float]
+        Minimum time between snapshots saved by steps, defaults to `PID_STATE_INTERVAL_S`
+
+    Attributes
+    ----------
+    steps : int
+        Number of readings processed by the PID
+    duplicates : int
+        Readings skipped because their timestamp equals the last processed one
+    out_of_order : int
+        Readings skipped because their timestamp is older than the last processed one
+    held : bool
+        Whether the controller is paused by `hold`
+    snapshot : PIDSnapshot
+        State after the latest step or command, replaced as a whole so readers on
+        other threads always see a consistent state
+    """
+
+    def __init__(
+        self,
+        time_fn: Optional[Callable[[], float]] = None,
+        telemetry: Optional["InfluxConnector"] = None,
+        history_size: Optional[int] = None,
+        history_path: Optional[str] = None,
+        time_base: Optional[TimeBase] = None,
+        state_file: Optional[ControllerStateFile] = None,
+        state_interval_s: Optional[float] = None,
+    ):
+        self.telemetry = telemetry
+        self.state_file = state_file
+        if state_interval_s is None:
+            state_interval_s = config.PID_STATE_INTERVAL_S
+        self.state_interval_s = state_interval_s
+        self._next_save = 0.0
+        self.time_base = time_base or config.PID_TIME_BASE
+        self.steps = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self._last_timestamp_ns: Optional[int] = None
+        self._restart_time_base = True
+        self._setpoint_received = False
+        self.held = False
+        self._enabled = False
+        if history_size is None:
+            history_size = config.PID_HISTORY_SIZE
+        self.history = PIDHistoryBuffer(history_size, history_path) if history_size else None
         self.pid = PID(
             config.PID_KP,
             config.PID_KI,
             config.PID_KD,
             output_limits=(config.PID_OUTPUT_MIN, config.PID_OUTPUT_MAX),
             auto_mode=False,
+            time_fn=time_fn,
+            # Sensor timestamps already define the steps; with simple_pid's default
+            # sample time, readings less than 10 ms apart would return the last output
+            sample_time=None if self.time_base == "sensor" else 0.01,
         )
+        self.snapshot = PIDSnapshot(None, None, self.pid.setpoint, 0.0, 0.0, 0.0, None, False)
 
     def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
         if self.pid.auto_mode:
-            update = self.pid(sensor_reading.value)
-            logger.debug(f"Calculated PID Update {update}")
-            influx_connector.write_pid(self.pid, sensor_reading.timestamp_ns)
+            dt = None
+            if self.time_base == "sensor":
+                recompute = self._setpoint_received
+                self._setpoint_received = False
+                if recompute and sensor_reading.timestamp_ns == self._last_timestamp_ns:
+                    dt = _NO_TIME_S
+                elif self._is_stale(sensor_reading.timestamp_ns):
+                    return None
+                else:
+                    dt = self._sensor_dt(sensor_reading.timestamp_ns)
+            started = time.perf_counter()
+            update = self.pid(sensor_reading.value, dt=dt)
+            _PID_STEP_SECONDS.observe(time.perf_counter() - started)
+            self.steps += 1
+            p, i, d = self.pid.components
+            self.snapshot = PIDSnapshot(
+                sensor_reading.timestamp_ns,
+                sensor_reading.value,
+                self.pid.setpoint,
+                p,
+                i,
+                d,
+                update,
+                True,
+            )
+            if self.history is not None:
+                self.history.append(
+                    sensor_reading.timestamp_ns,
+                    sensor_reading.value,
+                    self.pid.setpoint,
+                    p,
+                    i,
+                    d,
+                    update,
+                )
+            if self.state_file is not None and started >= self._next_save:
+                self.save_state()
+                self._next_save = started + self.state_interval_s
+            logger.debug("Calculated PID Update %s", update)
+            if self.telemetry is not None:
+                started = time.perf_counter()
+                self.telemetry.write_pid(self.pid, sensor_reading.timestamp_ns)
+                _TELEMETRY_SECONDS.observe(time.perf_counter() - started)
         else:
             update = None
 
         return update
 
+    def _sensor_dt(self, timestamp_ns: int) -> Optional[float]:
+        """
+        Time since the last processed reading in seconds.
+
+        Returns None for the first reading after enabling, which is timed with
+        `simple_pid`'s clock since there is no earlier reading to refer to.
+        """
+        last_ns, self._last_timestamp_ns = self._last_timestamp_ns, timestamp_ns
+        if self._restart_time_base:
+            self._restart_time_base = False
+            return None
+        return (timestamp_ns - last_ns) / 1e9
+
+    def _is_stale(self, timestamp_ns: int) -> bool:
+        """Count and report readings that are not newer than the last processed one"""
+        last_ns = self._last_timestamp_ns
+        if last_ns is None or timestamp_ns > last_ns:
+            return False
+        if timestamp_ns == last_ns:
+            self.duplicates += 1
+            logger.debug("Skipping duplicate sensor reading at %s", timestamp_ns)
+        else:
+            self.out_of_order += 1
+            logger.debug("Skipping out-of-order sensor reading at %s", timestamp_ns)
+        return True
+
+    def _publish(self) -> None:
+        """Publish a snapshot after a command changed the setpoint or mode"""
+        p, i, d = self.pid.components
+        self.snapshot = self.snapshot._replace(
+            setpoint=self.pid.setpoint, P=p, I=i, D=d, auto_mode=self.pid.auto_mode
+        )
+        if self.state_file is not None:
+            self.save_state()
+
+    def save_state(self) -> None:
+        """Save a snapshot of the controller state to the state file"""
+        kp, ki, kd = self.pid.tunings
+        self.state_file.save(
+            ControllerState(
+                saved_ns=time.time_ns(),
+                **self.snapshot._asdict(),
+                Kp=kp,
+                Ki=ki,
+                Kd=kd,
+                enabled=self._enabled,
+            )
+        )
+
+    def restore(self, state: ControllerState, max_age_s: float) -> bool:
+        """
+        Continue from a saved state, e.g. one persisted before a restart.
+
+        The integrator is set so that the first output equals the last saved one
+        with the current gains (bumpless transfer), instead of re-converging from
+        zero. The gains themselves are kept as configured.
+
+        Parameters
+        ----------
+        state : ControllerState
+            State to continue from
+        max_age_s : float
+            Maximum age of the state in seconds, older states are ignored
+
+        Returns
+        -------
+        bool
+            Whether the state was restored
+        """
+        age_s = state.age_s
+        if not 0 <= age_s <= max_age_s:
+            logger.info(f"Ignoring controller state saved {age_s:.1f}s ago")
+            return False
+        if state.Kp != self.pid.Kp or state.Ki != self.pid.Ki or state.Kd != self.pid.Kd:
+            logger.info(
+                f"Gains changed from {(state.Kp, state.Ki, state.Kd)} to {self.pid.tunings} "
+                "since the controller state was saved"
+            )
+        self.pid.setpoint = state.setpoint
+        if state.enabled:
+            integral = state.I
+            if state.output is not None and state.measurement is not None:
+                integral = state.output - self.pid.Kp * (state.setpoint - state.measurement)
+            self._enabled = True
+            self._enable(integral)
+        self._publish()
+        logger.info(f"Restored controller state saved {age_s:.1f}s ago, setpoint {state.setpoint}")
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Return step counters and readings skipped by the sensor time base."""
+        return {
+            "steps": self.steps,
+            "duplicates": self.duplicates,
+            "out_of_order": self.out_of_order,
+        }
+
+    def hold(self) -> None:
+        if self.held:
+            return
+        self.held = True
+        self.pid.set_auto_mode(False)
+        self._publish()
+        logger.debug("PID controller held")
+
+    def release(self, output: Optional[float] = None) -> None:
+        if not self.held:
+            return
+        self.held = False
+        if self._enabled:
+            self._enable(sum(self.pid.components) if output is None else output)
+        self._publish()
+        logger.debug("PID controller released")
+
+    def _enable(self, last_output: float) -> None:
+        self.pid.set_auto_mode(True, last_output=last_output)
+        # Time steps restart from the first reading after enabling
+        self._restart_time_base = True
+
     def set_setpoint(self, setpoint: Optional[float]) -> None:
         # TODO: on first None an Update of 0 should be emitted
         if setpoint is None:
+            self._enabled = False
             self.pid.set_auto_mode(False)
+            self._publish()
             logger.debug("Setpoint is None, disabling PID controller")
             return
 
-        if not self.pid.auto_mode:
-            self.pid.set_auto_mode(True, last_output=0)
+        self._enabled = True
+        self._setpoint_received = True
+        if not self.pid.auto_mode and not self.held:
+            self._enable(0)
             logger.debug("Setpoint is set, enabling PID controller")
         self.pid.setpoint = setpoint
+        self._publish()
         logger.debug(f"Setpoint updated to {setpoint}")
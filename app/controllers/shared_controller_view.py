@@ -0,0 +1,82 @@
+from typing import Optional
+
+from app.controllers.pid_controller import PIDSnapshot
+from app.utils.control_status import ControlStatusFile
+from app.utils.controller_state import ControllerStateFile
+from app.utils.pid_history import PIDHistoryBuffer
+
+_EMPTY = PIDSnapshot(None, None, 0.0, 0.0, 0.0, 0.0, None, False)
+
+
+class SharedControllerView:
+    """
+    Read-only view of a controller running in another process.
+
+    Workers that do not own the control loop serve API reads from the files the
+    owning worker keeps up to date, so reads neither reach nor slow down the
+    control loop. The snapshot comes from the state file if there is one, as it
+    lags the controller by at most the snapshot interval, and from the published
+    control status otherwise. The history is read from the file-backed buffer the
+    controller appends its steps to.
+
+    Parameters
+    ----------
+    status_file : ControlStatusFile
+        Status file published by the worker owning the controller
+    state_file : Optional[ControllerStateFile]
+        State file written by the worker owning the controller, None if not persisted
+    history_path : Optional[str]
+        File backing the step history of the controller, None if it is kept in memory
+    sensor_id : Optional[int]
+        Sensor of the loop viewed among the loops published by the owning worker,
+        None for its main controller
+    """
+
+    def __init__(
+        self,
+        status_file: ControlStatusFile,
+        state_file: Optional[ControllerStateFile] = None,
+        history_path: Optional[str] = None,
+        sensor_id: Optional[int] = None,
+    ):
+        self.status_file = status_file
+        self.state_file = state_file
+        self.history_path = history_path
+        self.sensor_id = sensor_id
+        self._history: Optional[PIDHistoryBuffer] = None
+
+    @property
+    def history(self) -> Optional[PIDHistoryBuffer]:
+        """Step history of the owning worker, None if it is not shared"""
+        if self.history_path is None:
+            return None
+        # Attached lazily, the owning worker may create it after this worker started
+        if self._history is None or self._history.stale:
+            self._history = PIDHistoryBuffer.attach(self.history_path)
+        return self._history
+
+    @property
+    def snapshot(self) -> PIDSnapshot:
+        """Latest snapshot saved or published by the owning worker"""
+        if self.state_file is not None:
+            state = self.state_file.load()
+            if state is None:
+                return _EMPTY
+            return PIDSnapshot(
+                timestamp_ns=state.timestamp_ns,
+                measurement=state.measurement,
+                setpoint=state.setpoint,
+                P=state.P,
+                I=state.I,
+                D=state.D,
+                output=state.output,
+                auto_mode=state.auto_mode,
+            )
+        status = self.status_file.load()
+        if status is None:
+            return _EMPTY
+        if self.sensor_id is None:
+            snapshot = status.get("snapshot")
+        else:
+            snapshot = status.get("snapshots", {}).get(str(self.sensor_id))
+        return _EMPTY if snapshot is None else PIDSnapshot(**snapshot)
@@ -0,0 +1,467 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.controllers.pid_controller import _NO_TIME_S, PIDSnapshot, TimeBase
+from app.interfaces.controller import ControllerInterface
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.config import config
+from app.utils.logger import logger
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.pid_history import PIDHistoryBuffer
+
+if TYPE_CHECKING:
+    from app.utils.influx_client import InfluxConnector
+
+_PID_STEP_SECONDS = STAGE_SECONDS.labels(stage="pid_step")
+_TELEMETRY_SECONDS = STAGE_SECONDS.labels(stage="influx_write")
+
+# Stands in for a missing timestamp, sensor timestamps are never this old
+_NO_TIMESTAMP = np.iinfo(np.int64).min
+
+# State of every loop, one row per loop. Missing inputs and outputs are NaN like
+# simple_pid's None.
+_LOOP_DTYPE = np.dtype(
+    [
+        ("kp", np.float64),
+        ("ki", np.float64),
+        ("kd", np.float64),
+        ("out_min", np.float64),
+        ("out_max", np.float64),
+        ("setpoint", np.float64),
+        ("enabled", np.bool_),
+        ("held", np.bool_),
+        ("auto_mode", np.bool_),
+        ("proportional", np.float64),
+        ("integral", np.float64),
+        ("derivative", np.float64),
+        ("last_input", np.float64),
+        ("last_output", np.float64),
+        ("last_time", np.float64),
+        # Sensor time base
+        ("last_timestamp_ns", np.int64),
+        ("restart_time_base", np.bool_),
+        ("setpoint_received", np.bool_),
+        # Reading staged for the next tick
+        ("pending", np.bool_),
+        ("pending_value", np.float64),
+        ("pending_timestamp_ns", np.int64),
+        # Latest step, reported by the snapshot
+        ("step_timestamp_ns", np.int64),
+        ("step_measurement", np.float64),
+        ("step_output", np.float64),
+        ("steps", np.int64),
+        ("duplicates", np.int64),
+        ("out_of_order", np.int64),
+    ]
+)
+
+
+class VectorizedPIDController:
+    """
+    PID engine advancing many independent control loops in one batched NumPy step.
+
+    The state of every loop is a row of a structured array. Readings are staged
+    per loop with `submit` and `tick` steps all loops with a staged reading at
+    once. The update law mirrors `simple_pid.PID` as `PIDController` uses it:
+    proportional on error, derivative on measurement, clamped integral and
+    output, `sample_time` gating with the monotonic time base and time steps
+    derived from sensor timestamps with the sensor time base. Setpoints,
+    hold and release follow `PIDController` as well, so a loop behaves the same
+    whichever engine runs it.
+
+    Each loop is addressed through the `PIDLoop` returned by `add_loop`, which
+    implements `ControllerInterface`.
+
+    Parameters
+    ----------
+    time_fn : Callable[[], float]
+        Clock returning seconds, defaults to `time.monotonic` like `simple_pid`
+    telemetry : Optional[InfluxConnector]
+        Connector receiving the state of every stepped loop, None for no telemetry
+    time_base : Optional[TimeBase]
+        Time base of all loops, defaults to `PID_TIME_BASE`, see `PIDController`
+    capacity : int
+        Number of loops allocated up front, grown on demand
+
+    Attributes
+    ----------
+    loops : List[PIDLoop]
+        The loops in the order they were added
+    ticks : int
+        Number of batched steps
+    """
+
+    def __init__(
+        self,
+        time_fn: Callable[[], float] = time.monotonic,
+        telemetry: Optional["InfluxConnector"] = None,
+        time_base: Optional[TimeBase] = None,
+        capacity: int = 16,
+    ):
+        self.time_fn = time_fn
+        self.telemetry = telemetry
+        self.time_base = time_base or config.PID_TIME_BASE
+        # Sensor timestamps already define the steps, see PIDController
+        self.sample_time = None if self.time_base == "sensor" else 0.01
+        self.loops: List["PIDLoop"] = []
+        self.ticks = 0
+        self._state = np.zeros(max(capacity, 1), dtype=_LOOP_DTYPE)
+        self._lock = threading.Lock()
+
+    def add_loop(self, sensor_id: int, history: Optional[PIDHistoryBuffer] = None) -> "PIDLoop":
+        """
+        Add a disabled loop with the configured gains and output limits.
+
+        Parameters
+        ----------
+        sensor_id : int
+            Sensor the loop controls, tags its telemetry
+        history : Optional[PIDHistoryBuffer]
+            Buffer recording the steps of the loop, None to not record them
+
+        Returns
+        -------
+        PIDLoop
+            The controller of the new loop
+        """
+        with self._lock:
+            index = len(self.loops)
+            if index == len(self._state):
+                grown = np.zeros(2 * index, dtype=_LOOP_DTYPE)
+                grown[:index] = self._state
+                self._state = grown
+            row = self._state[index : index + 1]
+            row["kp"], row["ki"], row["kd"] = config.PID_KP, config.PID_KI, config.PID_KD
+            row["out_min"], row["out_max"] = config.PID_OUTPUT_MIN, config.PID_OUTPUT_MAX
+            row["last_timestamp_ns"] = _NO_TIMESTAMP
+            row["restart_time_base"] = True
+            row["step_timestamp_ns"] = _NO_TIMESTAMP
+            row["step_measurement"] = row["step_output"] = np.nan
+            self._reset(np.array([index]))
+            loop = PIDLoop(self, index, sensor_id, history)
+            self.loops.append(loop)
+        logger.debug(f"Added PID loop {index} for sensor {sensor_id}")
+        return loop
+
+    def submit(self, index: int, reading: SensorReading) -> None:
+        """Stage a reading for the next tick, replacing one staged before"""
+        with self._lock:
+            row = self._state[index : index + 1]
+            row["pending"] = True
+            row["pending_value"] = reading.value
+            row["pending_timestamp_ns"] = reading.timestamp_ns
+
+    def tick(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Step every loop with a staged reading in one batch.
+
+        Staged readings of loops that are disabled or held are dropped.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Indices of the loops that calculated an update and the updates
+        """
+        with self._lock:
+            self.ticks += 1
+            state = self._state[: len(self.loops)]
+            indices = np.flatnonzero(state["pending"])
+            state["pending"][indices] = False
+            indices = indices[state["auto_mode"][indices]]
+            values = state["pending_value"][indices]
+            timestamps_ns = state["pending_timestamp_ns"][indices]
+            return self._step(indices, values, timestamps_ns)
+
+    def step(self, index: int, reading: SensorReading) -> Optional[float]:
+        """Step a single loop on a reading, None if it calculated no update"""
+        with self._lock:
+            if not self._state["auto_mode"][index]:
+                return None
+            indices, outputs = self._step(
+                np.array([index]),
+                np.array([reading.value], dtype=np.float64),
+                np.array([reading.timestamp_ns], dtype=np.int64),
+            )
+        return float(outputs[0]) if indices.size else None
+
+
+    def _step(
+        self, indices: np.ndarray, values: np.ndarray, timestamps_ns: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Step the given loops in auto mode, the lock must be held"""
+        started = time.perf_counter()
+        state = self._state
+        now = self.time_fn()
+        # NaN takes the time step from the clock, like simple_pid's dt=None
+        dt = np.full(indices.size, np.nan)
+        if self.time_base == "sensor":
+            fresh, dt = self._sensor_dt(indices, timestamps_ns)
+            indices, values, timestamps_ns, dt = (
+                indices[fresh],
+                values[fresh],
+                timestamps_ns[fresh],
+                dt[fresh],
+            )
+        clock_dt = now - state["last_time"][indices]
+        clock_dt[clock_dt == 0] = _NO_TIME_S
+        dt = np.where(np.isnan(dt), clock_dt, dt)
+
+        outputs = state["last_output"][indices]
+        # Within the sample time, loops with an output return it unchanged
+        computed = np.ones(indices.size, dtype=bool)
+        if self.sample_time is not None:
+            computed = (dt >= self.sample_time) | np.isnan(outputs)
+        outputs[computed] = self._update(indices[computed], values[computed], dt[computed], now)
+
+        state["steps"][indices] += 1
+        state["step_timestamp_ns"][indices] = timestamps_ns
+        state["step_measurement"][indices] = values
+        state["step_output"][indices] = outputs
+        _PID_STEP_SECONDS.observe(time.perf_counter() - started)
+        self._record(indices)
+        return indices, outputs
+
+    def _update(
+        self, loops: np.ndarray, inputs: np.ndarray, dt: np.ndarray, now: float
+    ) -> np.ndarray:
+        """Apply the update law of `simple_pid.PID.__call__` and return the outputs"""
+        state = self._state
+        out_min, out_max = state["out_min"][loops], state["out_max"][loops]
+        error = state["setpoint"][loops] - inputs
+        last_input = state["last_input"][loops]
+        d_input = inputs - np.where(np.isnan(last_input), inputs, last_input)
+        proportional = state["kp"][loops] * error
+        integral = np.clip(
+            state["integral"][loops] + state["ki"][loops] * error * dt, out_min, out_max
+        )
+        derivative = -state["kd"][loops] * d_input / dt
+        outputs = np.clip(proportional + integral + derivative, out_min, out_max)
+
+        state["proportional"][loops] = proportional
+        state["integral"][loops] = integral
+        state["derivative"][loops] = derivative
+        state["last_output"][loops] = outputs
+        state["last_input"][loops] = inputs
+        state["last_time"][loops] = now
+        return outputs
+
+    def _sensor_dt(
+        self, indices: np.ndarray, timestamps_ns: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Time steps derived from sensor timestamps, see `PIDController`.
+
+        Returns which readings are stepped on and their time steps. Readings not newer
+        than the last processed one are counted and skipped, unless a setpoint arrived
+        since, which recomputes without time passing. The first reading after enabling
+        is timed with the clock, marked by NaN.
+        """
+        state = self._state
+        recompute = state["setpoint_received"][indices]
+        state["setpoint_received"][indices] = False
+        last_ns = state["last_timestamp_ns"][indices]
+        known = last_ns != _NO_TIMESTAMP
+        same = known & (timestamps_ns == last_ns)
+        recomputed = recompute & same
+        stale = known & ~recomputed & (timestamps_ns <= last_ns)
+        state["duplicates"][indices[stale & same]] += 1
+        state["out_of_order"][indices[stale & ~same]] += 1
+
+        advancing = ~recomputed & ~stale
+        restarted = advancing & state["restart_time_base"][indices]
+        state["last_timestamp_ns"][indices[advancing]] = timestamps_ns[advancing]
+        state["restart_time_base"][indices[restarted]] = False
+
+        dt = (timestamps_ns - last_ns) / 1e9
+        dt[recomputed] = _NO_TIME_S
+        dt[restarted] = np.nan
+        return ~stale, dt
+
+    def _record(self, indices: np.ndarray) -> None:
+        """Append the latest step of the given loops to their histories and telemetry"""
+        state = self._state[indices]
+        steps = list(
+            zip(
+                indices.tolist(),
+                state["step_timestamp_ns"].tolist(),
+                state["step_measurement"].tolist(),
+                state["setpoint"].tolist(),
+                state["proportional"].tolist(),
+                state["integral"].tolist(),
+                state["derivative"].tolist(),
+                state["step_output"].tolist(),
+            )
+        )
+        for index, timestamp_ns, measurement, setpoint, p, i, d, output in steps:
+            history = self.loops[index].history
+            if history is not None:
+                history.append(timestamp_ns, measurement, setpoint, p, i, d, output)
+        if self.telemetry is not None and steps:
+            started = time.perf_counter()
+            for index, timestamp_ns, _, setpoint, p, i, d, _ in steps:
+                self.telemetry.write_step(
+                    self.loops[index].sensor_id, p, i, d, setpoint, True, timestamp_ns
+                )
+            _TELEMETRY_SECONDS.observe(time.perf_counter() - started)
+
+    def set_setpoint(self, index: int, setpoint: Optional[float]) -> None:
+        """Set the setpoint of a loop, None disables it, see `PIDController.set_setpoint`"""
+        with self._lock:
+            row = self._state[index : index + 1]
+            if setpoint is None:
+                row["enabled"] = row["auto_mode"] = False
+                logger.debug(f"Setpoint is None, disabling PID loop {index}")
+                return
+            row["enabled"] = row["setpoint_received"] = True
+            if not row["auto_mode"][0] and not row["held"][0]:
+                self._enable(index, 0.0)
+                logger.debug(f"Setpoint is set, enabling PID loop {index}")
+            row["setpoint"] = setpoint
+        logger.debug(f"Setpoint of PID loop {index} updated to {setpoint}")
+
+    def hold(self, index: int) -> None:
+        """Pause a loop, see `PIDController.hold`"""
+        with self._lock:
+            row = self._state[index : index + 1]
+            if row["held"][0]:
+                return
+            row["held"] = True
+            row["auto_mode"] = False
+        logger.debug(f"PID loop {index} held")
+
+    def release(self, index: int, output: Optional[float] = None) -> None:
+        """Resume a held loop bumplessly, see `PIDController.release`"""
+        with self._lock:
+            row = self._state[index : index + 1]
+            if not row["held"][0]:
+                return
+            row["held"] = False
+            if row["enabled"][0]:
+                if output is None:
+                    p, i, d = row["proportional"][0], row["integral"][0], row["derivative"][0]
+                    output = float(p + i + d)
+                self._enable(index, output)
+        logger.debug(f"PID loop {index} released")
+
+    def _enable(self, index: int, last_output: float) -> None:
+        """Switch a loop to auto mode like `simple_pid.PID.set_auto_mode`, the lock must be held"""
+        row = self._state[index : index + 1]
+        if not row["auto_mode"][0]:
+            self._reset(np.array([index]))
+            row["integral"] = np.clip(last_output, row["out_min"], row["out_max"])
+            row["auto_mode"] = True
+        # Time steps restart from the first reading after enabling
+        row["restart_time_base"] = True
+
+    def _reset(self, indices: np.ndarray) -> None:
+        """Clear the terms and last step of loops like `simple_pid.PID.reset`"""
+        state = self._state
+        state["proportional"][indices] = 0.0
+        state["derivative"][indices] = 0.0
+        state["integral"][indices] = np.clip(
+            0.0, state["out_min"][indices], state["out_max"][indices]
+        )
+        state["last_time"][indices] = self.time_fn()
+        state["last_output"][indices] = np.nan
+        state["last_input"][indices] = np.nan
+
+    def snapshot(self, index: int) -> PIDSnapshot:
+        """Return the state of a loop after its latest step or command"""
+        with self._lock:
+            row = self._state[index]
+            timestamp_ns = int(row["step_timestamp_ns"])
+            measurement = float(row["step_measurement"])
+            output = float(row["step_output"])
+            return PIDSnapshot(
+                timestamp_ns=None if timestamp_ns == _NO_TIMESTAMP else timestamp_ns,
+                measurement=None if np.isnan(measurement) else measurement,
+                setpoint=float(row["setpoint"]),
+                P=float(row["proportional"]),
+                I=float(row["integral"]),
+                D=float(row["derivative"]),
+                output=None if np.isnan(output) else output,
+                auto_mode=bool(row["auto_mode"]),
+            )
+
+    def loop_stats(self, index: int) -> Dict[str, float]:
+        """Return the step counters of a loop."""
+        with self._lock:
+            row = self._state[index]
+            return {
+                "steps": int(row["steps"]),
+                "duplicates": int(row["duplicates"]),
+                "out_of_order": int(row["out_of_order"]),
+            }
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of loops, ticks and the step counters summed over all loops."""
+        with self._lock:
+            state = self._state[: len(self.loops)]
+            return {
+                "loops": len(self.loops),
+                "ticks": self.ticks,
+                "steps": int(state["steps"].sum()),
+                "duplicates": int(state["duplicates"].sum()),
+                "out_of_order": int(state["out_of_order"].sum()),
+            }
+
+
+class PIDLoop(ControllerInterface):
+    """
+    A single loop of a `VectorizedPIDController`.
+
+    Offers what the service uses of `PIDController`: commands, steps, the snapshot,
+    the step history and statistics. Readings are either stepped on right away with
+    `calculate_update` or staged with `submit` for the next batched tick of the engine.
+
+    Parameters
+    ----------
+    engine : VectorizedPIDController
+        Engine holding the state of the loop
+    index : int
+        Row of the loop in the engine
+    sensor_id : int
+        Sensor the loop controls
+    history : Optional[PIDHistoryBuffer]
+        Buffer the engine records the steps of the loop in, None to not record them
+    """
+
+    def __init__(
+        self,
+        engine: VectorizedPIDController,
+        index: int,
+        sensor_id: int,
+        history: Optional[PIDHistoryBuffer] = None,
+    ):
+        self.engine = engine
+        self.index = index
+        self.sensor_id = sensor_id
+        self.history = history
+
+    @property
+    def snapshot(self) -> PIDSnapshot:
+        """State of the loop after its latest step or command"""
+        return self.engine.snapshot(self.index)
+
+    def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
+        return self.engine.step(self.index, sensor_reading)
+
+    def submit(self, sensor_reading: SensorReading) -> None:
+        """Stage a reading for the next tick of the engine"""
+        self.engine.submit(self.index, sensor_reading)
+
+    def set_setpoint(self, setpoint: Optional[float]) -> None:
+        self.engine.set_setpoint(self.index, setpoint)
+
+    def hold(self) -> None:
+        self.engine.hold(self.index)
+
+    def release(self, output: Optional[float] = None) -> None:
+        self.engine.release(self.index, output)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the step counters of the loop."""
+        return self.engine.loop_stats(self.index)
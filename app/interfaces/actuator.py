@@ -9,6 +9,8 @@ class ActuatorInterface(ABC):
     -------
     update(value: float) -> None
         Update the actuator with a new value and timestamp.
+    override(value: float) -> None
+        Write a value no earlier update may overwrite, such as a safe state.
     """
 
     @abstractmethod
@@ -22,3 +24,43 @@ class ActuatorInterface(ABC):
         Returns:
             None
         """
+
+    def override(self, value: float) -> None:
+        """
+        Write a value that must not be overwritten by any earlier update.
+
+        Updates still queued are discarded and updates in flight complete before
+        the value is written. Wrappers that may drop a write, such as filters and
+        circuit breakers, pass it on unconditionally. Failures are raised. By
+        default the value is written with `update`.
+
+        Args:
+            value (float): The value to set for the actuator.
+
+        Returns:
+            None
+        """
+        self.update(value)
+
+
+class AsyncActuatorInterface(ABC):
+    """
+    Abstract base class for an actuator driven from an asyncio event loop.
+
+    Methods
+    -------
+    update(value: float) -> None
+        Update the actuator with a new value without blocking the event loop.
+    """
+
+    @abstractmethod
+    async def update(self, value: float) -> None:
+        """
+        Update the actuator with a new value.
+
+        Args:
+            value (float): The new value to set for the actuator.
+
+        Returns:
+            None
+        """
@@ -30,3 +30,30 @@ class ControllerInterface(ABC):
         -------
         None
         """
+
+    def hold(self) -> None:
+        """
+        Pause the controller while its inputs cannot be trusted.
+
+        While held, no updates are calculated and integration is paused. Controllers
+        without internal state may ignore this.
+
+        Returns
+        -------
+        None
+        """
+
+    def release(self, output: Optional[float] = None) -> None:
+        """
+        Resume a held controller.
+
+        Parameters
+        ----------
+        output : Optional[float]
+            Output the actuator currently holds, used for a bumpless restart,
+            None to continue from the last calculated output
+
+        Returns
+        -------
+        None
+        """
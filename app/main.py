@@ -1,32 +1,746 @@
+import asyncio
+import inspect
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
 from fastapi import FastAPI
 
-from app.actuators.proportional_valve import ProportionalValveActuator
-from app.controllers.pid_controller import PIDController
+# Stops a started component, either blocking or as a coroutine
+ShutdownStep = Callable[[], Any]
+
+
+class ControlLoop(NamedTuple):
+    """Components of the control loop the API reports on"""
+
+    controller: Any
+    actuator_breaker: Any = None
+    actuator_timeout: Any = None
+    # Status published by the owning worker, only set in the other workers
+    control_status: Any = None
+    # Controllers of all loops by sensor id, selected by the API
+    loops: Any = None
+
+
+class ActuatorGuards(NamedTuple):
+    """Optional components shaping and protecting the actuator writes"""
+
+    output_filter: Any = None
+    timeout: Any = None
+    breaker: Any = None
+
+
+async def start_services(application: FastAPI) -> List[ShutdownStep]:
+    """
+    Build the controller, actuators and services and start them.
+
+    Everything beyond FastAPI is imported here rather than at module level, so
+    importing `app.main` stays cheap and the configuration is only read once the
+    application starts.
+
+    Only the worker holding the control lock runs the control loop. Other
+    workers, e.g. further uvicorn workers, only serve the API from the status,
+    state and history files the owning worker keeps up to date.
+
+    Args:
+        application (FastAPI): The application receiving the routes.
+
+    Returns:
+        The steps stopping the started services, in the order they are to run.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
+    from app.utils.control_lock import ControlLock
+    from app.utils.control_status import ControlStatusFile
+    from app.utils.logger import logger
+
+    application.title = config.PROJECT_NAME
+    application.version = config.VERSION
+    application.debug = config.DEBUG_LEVEL == "DEBUG"
+
+    shutdown: List[ShutdownStep] = []
+    stats_sources = {}
+    control_lock = ControlLock(config.CONTROL_LOCK_PATH.format(SENSOR_ID=config.SENSOR_ID))
+    owner = control_lock.acquire()
+    stats_sources["worker"] = lambda: {"control_owner": int(control_lock.owned)}
+    status_file = ControlStatusFile(
+        config.CONTROL_STATUS_PATH.format(SENSOR_ID=config.SENSOR_ID)
+    )
+
+    if not owner:
+        logger.info(f"Control loop owned by another worker, worker {os.getpid()} serves the API")
+        include_routers(application, shared_control_loop(status_file), stats_sources)
+        return shutdown
+
+    logger.info(f"Worker {os.getpid()} owns the control loop")
+    control_loop = await start_control_loop(stats_sources, shutdown)
+    publisher = create_status_publisher(status_file, control_loop, stats_sources)
+    include_routers(application, control_loop, stats_sources)
+    # Started once all statistics are registered with the metrics
+    publisher.start()
+    shutdown += [publisher.stop, control_lock.release]
+    return shutdown
+
+
+def shared_control_loop(status_file) -> ControlLoop:
+    """
+    Create the views of the control loops run by the worker owning them.
+
+    Args:
+        status_file (ControlStatusFile): The status published by the owning worker.
+
+    Returns:
+        ControlLoop: The views of the main controller and of all loops.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.controllers.shared_controller_view import SharedControllerView
+    from app.utils.config import config
+    from app.utils.controller_state import ControllerStateFile
+
+    controller = SharedControllerView(
+        status_file,
+        ControllerStateFile(config.PID_STATE_PATH) if config.PID_STATE_PATH else None,
+        history_path(),
+    )
+    loops = {
+        sensor_id: SharedControllerView(
+            status_file, history_path=history_path(sensor_id), sensor_id=sensor_id
+        )
+        for sensor_id in control_loops()
+    }
+    return ControlLoop(controller, control_status=status_file, loops=loops)
+
+
+def history_path(sensor_id: Optional[int] = None) -> Optional[str]:
+    """Return the file sharing the step history of a loop, None to keep it in memory"""
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
+
+    if not config.PID_HISTORY_PATH:
+        return None
+    return config.PID_HISTORY_PATH.format(
+        SENSOR_ID=config.SENSOR_ID if sensor_id is None else sensor_id
+    )
+
+
+def control_loops() -> Dict[int, int]:
+    """Return the valve ids of the control loops keyed by their sensor ids"""
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
+
+    if config.PID_ENGINE == "vectorized" and config.CONTROL_LOOPS:
+        return dict(config.CONTROL_LOOPS)
+    return {config.SENSOR_ID: config.PROPORTIONAL_VALVE_ID}
+
+
+def create_status_publisher(
+    status_file,
+    control_loop: ControlLoop,
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+):
+    """
+    Create the publisher sharing the control loop status with the other workers.
+
+    Args:
+        status_file (ControlStatusFile): The file the status is published to.
+        control_loop (ControlLoop): The control loop components reported on.
+        stats_sources (Dict): The statistics of the started components, receives the
+            statistics of the publisher.
+
+    Returns:
+        ControlStatusPublisher: The publisher, not started yet.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.routes.api import actuator_breaker_state
+    from app.utils.config import config
+    from app.utils.control_status import ControlStatusPublisher
+    from app.utils.metrics import registry
+
+    def collect() -> Dict[str, Any]:
+        breaker = None
+        if control_loop.actuator_breaker is not None:
+            breaker = actuator_breaker_state(
+                control_loop.actuator_breaker, control_loop.actuator_timeout
+            ).model_dump()
+        return {
+            "stats": {name: source() for name, source in stats_sources.items()},
+            "breaker": breaker,
+            "snapshot": control_loop.controller.snapshot._asdict(),
+            "snapshots": {
+                str(sensor_id): loop.snapshot._asdict()
+                for sensor_id, loop in control_loop.loops.items()
+            },
+            "metrics": registry.render(),
+        }
+
+    publisher = ControlStatusPublisher(status_file, collect, config.CONTROL_STATUS_INTERVAL_S)
+    stats_sources["status_publisher"] = publisher.stats
+    return publisher
+
+
+def include_routers(
+    application: FastAPI,
+    control_loop: ControlLoop,
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+) -> None:
+    """
+    Add the API and metrics routes reporting on the control loop.
+
+    Args:
+        application (FastAPI): The application receiving the routes.
+        control_loop (ControlLoop): The control loop components, or their views.
+        stats_sources (Dict): The statistics of the started components.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.routes.api import create_api_router
+    from app.routes.metrics import create_metrics_router
+    from app.utils.metrics import registry
+
+    application.include_router(
+        create_api_router(
+            controller=control_loop.controller,
+            stats_sources=stats_sources,
+            actuator_breaker=control_loop.actuator_breaker,
+            actuator_timeout=control_loop.actuator_timeout,
+            control_status=control_loop.control_status,
+            loops=control_loop.loops,
+        )
+    )
+    for name, source in stats_sources.items():
+        registry.register_stats(name, source)
+    application.include_router(create_metrics_router(registry, control_loop.control_status))
+
+
+async def start_control_loop(
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+    shutdown: List[ShutdownStep],
+) -> ControlLoop:
+    """
+    Build and start the controller, actuators and WebSocket service.
+
+    Args:
+        stats_sources (Dict): Receives the statistics of the started components.
+        shutdown (List[ShutdownStep]): Receives the steps stopping the started components.
+
+    Returns:
+        ControlLoop: The PID controller, the actuator circuit breaker and the adaptive
+        actuator timeout.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
+    from app.utils.http_client import ConnectionStats, create_backend_client
+    from app.utils.influx_client import get_influx_connector
+
+    influx_connector = get_influx_connector()
+    connection_stats = ConnectionStats()
+    stats_sources.update(
+        influx=influx_connector.writer.stats,
+        backend_connections=connection_stats.stats,
+    )
+    if config.PID_ENGINE == "vectorized":
+        control_loop, stops = await start_vectorized_service(
+            influx_connector, connection_stats, stats_sources
+        )
+        shutdown += stops
+        shutdown.append(influx_connector.writer.stop)
+        return control_loop
+
+    pid, state_file = create_pid_controller(influx_connector)
+    # Dedicated to the valve actuator, which sets its request timeout
+    valve_client = create_backend_client(connection_stats)
+    stats_sources["controller"] = pid.stats
+    if state_file is not None:
+        stats_sources["controller_state"] = state_file.stats
+
+    guards = create_actuator_guards(stats_sources)
+    if config.WS_SERVICE_MODE == "asyncio":
+        ws_service, stops = await start_asyncio_service(pid, valve_client, guards, stats_sources)
+    else:
+        ws_service, stops = await start_thread_service(pid, valve_client, guards, stats_sources)
+    stats_sources["setpoint_connection"] = ws_service.setpoint_gaps.stats
+    stats_sources["sensor_connection"] = ws_service.sensor_gaps.stats
+
+    # Stop taking inputs first, then drain what is queued towards the outputs
+    shutdown += stops
+    shutdown.append(influx_connector.writer.stop)
+    if state_file is not None:
+        shutdown += [pid.save_state, state_file.close]
+
+    return ControlLoop(pid, guards.breaker, guards.timeout, loops={config.SENSOR_ID: pid})
+
+
+def create_pid_controller(influx_connector) -> Tuple[Any, Optional[Any]]:
+    """
+    Create the PID controller, restoring its state from the state file if configured.
+
+    Args:
+        influx_connector (InfluxConnector): Receives the controller telemetry.
+
+    Returns:
+        The PID controller and its state file, None without `PID_STATE_PATH`.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.controllers.pid_controller import PIDController
+    from app.utils.config import config
+    from app.utils.controller_state import ControllerStateFile
+
+    state_file = None
+    if config.PID_STATE_PATH:
+        state_file = ControllerStateFile(config.PID_STATE_PATH)
+    pid = PIDController(
+        telemetry=influx_connector, history_path=history_path(), state_file=state_file
+    )
+    if state_file is not None:
+        saved_state = state_file.load()
+        if saved_state is not None:
+            pid.restore(saved_state, config.PID_STATE_MAX_AGE_S)
+    return pid, state_file
+
+
+def create_actuator_guards(
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+) -> ActuatorGuards:
+    """
+    Create the configured output filter, adaptive timeout and circuit breaker.
+
+    Args:
+        stats_sources (Dict): Receives the statistics of the created components.
+
+    Returns:
+        ActuatorGuards: The components, None where not configured.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.actuators.output_filter import OutputFilter
+    from app.utils.adaptive_timeout import AdaptiveTimeout
+    from app.utils.circuit_breaker import CircuitBreaker
+    from app.utils.config import config
+
+    guards = ActuatorGuards()
+    if config.ACTUATOR_DEADBAND_ABS or config.ACTUATOR_DEADBAND_REL or config.ACTUATOR_QUANTUM:
+        guards = guards._replace(
+            output_filter=OutputFilter(
+                deadband_abs=config.ACTUATOR_DEADBAND_ABS,
+                deadband_rel=config.ACTUATOR_DEADBAND_REL,
+                quantum=config.ACTUATOR_QUANTUM,
+                heartbeat_s=config.ACTUATOR_HEARTBEAT_S,
+            )
+        )
+        stats_sources["output_filter"] = guards.output_filter.stats
+    if config.ACTUATOR_ADAPTIVE_TIMEOUT:
+        guards = guards._replace(
+            timeout=AdaptiveTimeout(
+                initial_s=config.ACTUATOR_TIMEOUT_S,
+                min_s=config.ACTUATOR_TIMEOUT_MIN_S,
+                max_s=config.ACTUATOR_TIMEOUT_S,
+            )
+        )
+        stats_sources["actuator_timeout"] = guards.timeout.stats
+    if config.ACTUATOR_BREAKER_THRESHOLD:
+        guards = guards._replace(
+            breaker=CircuitBreaker(
+                failure_threshold=config.ACTUATOR_BREAKER_THRESHOLD,
+                reset_timeout_s=config.ACTUATOR_BREAKER_RESET_S,
+            )
+        )
+    return guards
+
+
+def _reset_filter(guards: ActuatorGuards) -> Optional[Callable[[], None]]:
+    """Return the callback resetting the output filter after a failed write, if any"""
+    return guards.output_filter.reset if guards.output_filter is not None else None
+
+
+async def start_asyncio_service(
+    pid, valve_client, guards: ActuatorGuards, stats_sources
+) -> Tuple[Any, List[ShutdownStep]]:
+    """
+    Start the WebSocket service and actuator chain as tasks in the running event loop.
+
+    Args:
+        pid (PIDController): The controller computing the actuator updates.
+        valve_client (Client): Backend client dedicated to the valve actuator.
+        guards (ActuatorGuards): The filter, timeout and breaker of the actuator writes.
+        stats_sources (Dict): Receives the statistics of the started components.
+
+    Returns:
+        The WebSocket service and the steps stopping it.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.actuators.circuit_breaker_actuator import AsyncCircuitBreakerActuator
+    from app.actuators.output_filter import AsyncFilteredActuator
+    from app.actuators.proportional_valve import AsyncProportionalValveActuator
+    from app.services.async_websocket_service import AsyncWebSocketService
+    from app.utils.config import config
+    from app.utils.http_client import async_warm_up
+
+    if config.BACKEND_WARMUP:
+        await async_warm_up(valve_client)
+    actuator = AsyncProportionalValveActuator(client=valve_client, timeout=guards.timeout)
+    if guards.breaker is not None:
+        actuator = AsyncCircuitBreakerActuator(
+            actuator, guards.breaker, on_failure=_reset_filter(guards)
+        )
+        stats_sources["actuator_breaker"] = actuator.stats
+    if guards.output_filter is not None:
+        actuator = AsyncFilteredActuator(actuator, guards.output_filter)
+    ws_service = AsyncWebSocketService(controller=pid, actuator=actuator)
+    stats_sources["ws_service"] = ws_service.stats
+    ws_service.start()
+    return ws_service, [ws_service.stop]
+
+
+async def start_thread_service(
+    pid, valve_client, guards: ActuatorGuards, stats_sources
+) -> Tuple[Any, List[ShutdownStep]]:
+    """
+    Start the thread-based WebSocket service, actuator chain and stream watchdog.
+
+    Args:
+        pid (PIDController): The controller computing the actuator updates.
+        valve_client (Client): Backend client dedicated to the valve actuator.
+        guards (ActuatorGuards): The filter, timeout and breaker of the actuator writes.
+        stats_sources (Dict): Receives the statistics of the started components.
+
+    Returns:
+        The WebSocket service and the steps stopping the started components, in order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.controllers.control_actor import ControlActor
+    from app.services.websocket_service import WebSocketService
+    from app.utils.config import config
+    from app.utils.http_client import warm_up
+
+    if config.BACKEND_WARMUP:
+        # The blocking client connects in a worker thread, keeping the event loop free
+        await asyncio.to_thread(warm_up, valve_client)
+    controller = pid
+    if config.CONTROL_ACTOR:
+        controller = ControlActor(pid)
+        controller.start()
+        stats_sources["control_actor"] = controller.stats
+    # Stopped outermost first, so values queued in a wrapper reach the wrapped channel
+    actuator_stops: List[ShutdownStep] = []
+    actuator = create_actuator_chain(valve_client, guards, stats_sources, actuator_stops)
+    watchdog = create_watchdog(controller, actuator, stats_sources)
+    ws_service = WebSocketService(
+        controller=controller,
+        actuator=actuator,
+        control_period_s=config.CONTROL_PERIOD_S,
+        coalesce_sensor=config.SENSOR_COALESCING,
+        watchdog=watchdog,
+    )
+
+    ws_service.start()
+    if watchdog is not None:
+        watchdog.start()
+
+    if ws_service.scheduler is not None:
+        stats_sources["scheduler"] = ws_service.scheduler.stats
+    if ws_service.sensor_mailbox is not None:
+        stats_sources["sensor_mailbox"] = ws_service.sensor_mailbox.stats
+
+    stops: List[ShutdownStep] = [ws_service.stop]
+    if watchdog is not None:
+        stops.append(watchdog.timer.stop)
+    if controller is not pid:
+        stops.append(controller.stop)
+    return ws_service, stops + actuator_stops
+
+
+async def start_vectorized_service(
+    influx_connector, connection_stats, stats_sources
+) -> Tuple[ControlLoop, List[ShutdownStep]]:
+    """
+    Start a WebSocket service and actuator chain per configured loop, all stepped in
+    batches by the vectorized PID engine at `CONTROL_PERIOD_S`.
+
+    Args:
+        influx_connector (InfluxConnector): Receives the telemetry of every loop.
+        connection_stats (ConnectionStats): Collects the statistics of the backend clients.
+        stats_sources (Dict): Receives the statistics of the started components.
+
+    Returns:
+        The control loop of `SENSOR_ID`, or the first configured one, with the controllers
+        of all loops, and the steps stopping the started components, in order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.controllers.vectorized_pid_controller import VectorizedPIDController
+    from app.services.batch_control_scheduler import BatchControlScheduler
+    from app.utils.config import config
+    from app.utils.deadline_timer import DeadlineTimer
+
+    engine = VectorizedPIDController(telemetry=influx_connector)
+    stats_sources["controller"] = engine.stats
+    # Shared by the watchdogs of all loops, started once a watchdog uses it
+    timer = DeadlineTimer()
+    actuator_stops: List[ShutdownStep] = []
+    components = await create_vectorized_loops(
+        engine, connection_stats, timer, stats_sources, actuator_stops
+    )
+    scheduler = BatchControlScheduler(
+        engine, [component.scheduled for component in components], config.CONTROL_PERIOD_S
+    )
+    stats_sources["scheduler"] = scheduler.stats
+
+    if any(component.scheduled.watchdog is not None for component in components):
+        timer.start()
+    for component in components:
+        component.ws_service.start()
+        if component.scheduled.watchdog is not None:
+            component.scheduled.watchdog.start()
+    scheduler.start()
+
+    main = next(
+        (c for c in components if c.scheduled.loop.sensor_id == config.SENSOR_ID), components[0]
+    )
+    # Stop taking inputs first, then the steps, then drain what is queued towards the outputs
+    stops: List[ShutdownStep] = [component.ws_service.stop for component in components]
+    return (
+        ControlLoop(
+            main.scheduled.loop,
+            main.guards.breaker,
+            main.guards.timeout,
+            loops={loop.sensor_id: loop for loop in engine.loops},
+        ),
+        stops + [scheduler.stop, timer.stop] + actuator_stops,
+    )
+
+
+class LoopComponents(NamedTuple):
+    """Components of a loop run by the vectorized engine"""
+
+    scheduled: Any
+    ws_service: Any
+    guards: ActuatorGuards
+    stats: Dict[str, Callable[[], Dict[str, float]]]
+
+
+async def create_vectorized_loops(
+    engine,
+    connection_stats,
+    timer,
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+    actuator_stops: List[ShutdownStep],
+) -> List[LoopComponents]:
+    """
+    Add the configured loops to the vectorized engine with their components, none started.
+
+    Args:
+        engine (VectorizedPIDController): The engine stepping the loops.
+        connection_stats (ConnectionStats): Collects the statistics of the backend clients.
+        timer (DeadlineTimer): The timer shared by the watchdogs of all loops.
+        stats_sources (Dict): Receives the statistics of every loop, prefixed by its sensor.
+        actuator_stops (List[ShutdownStep]): Receives the steps stopping the started
+            actuators, outermost first.
+
+    Returns:
+        The components of every loop, in the configured order.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
+    from app.utils.http_client import create_backend_client, warm_up
+    from app.utils.pid_history import PIDHistoryBuffer
+
+    components = []
+    for sensor_id, valve_id in control_loops().items():
+        history = None
+        if config.PID_HISTORY_SIZE:
+            history = PIDHistoryBuffer(config.PID_HISTORY_SIZE, history_path(sensor_id))
+        # Dedicated to the valve actuator of the loop, which sets its request timeout
+        valve_client = create_backend_client(connection_stats)
+        if config.BACKEND_WARMUP:
+            await asyncio.to_thread(warm_up, valve_client)
+        components.append(
+            create_loop_components(
+                engine.add_loop(sensor_id, history), valve_id, valve_client, timer, actuator_stops
+            )
+        )
+        stats_sources.update(
+            {f"loop_{sensor_id}_{name}": source for name, source in components[-1].stats.items()}
+        )
+    return components
+
+
+def create_loop_components(
+    loop, valve_id: int, valve_client, timer, actuator_stops: List[ShutdownStep]
+) -> LoopComponents:
+    """
+    Create the actuator chain, watchdog and WebSocket service of a vectorized loop.
+
+    Args:
+        loop (PIDLoop): The loop of the vectorized engine.
+        valve_id (int): The valve the loop writes to.
+        valve_client (Client): Backend client dedicated to the valve actuator.
+        timer (DeadlineTimer): The timer shared by the watchdogs of all loops.
+        actuator_stops (List[ShutdownStep]): Receives the steps stopping the started
+            actuators, outermost first.
+
+    Returns:
+        LoopComponents: The scheduled loop, its WebSocket service and actuator guards,
+        and the statistics of its components.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.services.batch_control_scheduler import ScheduledLoop
+    from app.services.websocket_service import WebSocketService
+
+    stats = {"controller": loop.stats}
+    guards = create_actuator_guards(stats)
+    actuator = create_actuator_chain(valve_client, guards, stats, actuator_stops, valve_id)
+    watchdog = create_watchdog(loop, actuator, stats, timer)
+    ws_service = WebSocketService(
+        controller=loop,
+        actuator=actuator,
+        watchdog=watchdog,
+        sensor_id=loop.sensor_id,
+        step_on_message=False,
+    )
+    stats["setpoint_connection"] = ws_service.setpoint_gaps.stats
+    stats["sensor_connection"] = ws_service.sensor_gaps.stats
+    return LoopComponents(
+        ScheduledLoop(loop, actuator, lambda: ws_service.sensor_reading, watchdog),
+        ws_service,
+        guards,
+        stats,
+    )
+
+
+def create_actuator_chain(
+    valve_client,
+    guards: ActuatorGuards,
+    stats_sources: Dict[str, Callable[[], Dict[str, float]]],
+    actuator_stops: List[ShutdownStep],
+    valve_id: Optional[int] = None,
+):
+    """
+    Create the blocking actuator chain writing to the valve.
+
+    Args:
+        valve_client (Client): Backend client dedicated to the valve actuator.
+        guards (ActuatorGuards): The filter, timeout and breaker of the actuator writes.
+        stats_sources (Dict): Receives the statistics of the started components.
+        actuator_stops (List[ShutdownStep]): Receives the steps stopping the started
+            actuators, outermost first.
+        valve_id (Optional[int]): The valve written to, None for `PROPORTIONAL_VALVE_ID`.
+
+    Returns:
+        ActuatorInterface: The outermost actuator of the chain.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.actuators.actuator_writer import ActuatorWriter
+    from app.actuators.circuit_breaker_actuator import CircuitBreakerActuator
+    from app.actuators.output_filter import FilteredActuator
+    from app.actuators.proportional_valve import ProportionalValveActuator
+    from app.actuators.websocket_valve import WebSocketValveActuator
+    from app.utils.config import config
+
+    actuator = ProportionalValveActuator(
+        client=valve_client, timeout=guards.timeout, valve_id=valve_id
+    )
+    if guards.breaker is not None:
+        actuator = CircuitBreakerActuator(
+            actuator, guards.breaker, on_failure=_reset_filter(guards)
+        )
+        stats_sources["actuator_breaker"] = actuator.stats
+    if config.ACTUATOR_CHANNEL == "websocket":
+        actuator = WebSocketValveActuator(
+            fallback=actuator, ack_timeout_s=config.ACTUATOR_TIMEOUT_S, valve_id=valve_id
+        )
+        actuator.start()
+        actuator_stops.insert(0, actuator.stop)
+        stats_sources["actuator_channel"] = actuator.stats
+    # Filtered on the writing thread, so a failed write can reset the filter in time
+    if guards.output_filter is not None:
+        actuator = FilteredActuator(actuator, guards.output_filter)
+    if config.ACTUATOR_NONBLOCKING:
+        actuator = ActuatorWriter(actuator=actuator)
+        actuator.start()
+        actuator_stops.insert(0, actuator.stop)
+        stats_sources["actuator_writer"] = actuator.stats
+    return actuator
+
+
+def create_watchdog(controller, actuator, stats_sources, timer=None):
+    """
+    Create the stream watchdog if stream timeouts or a reading age limit are configured.
+
+    Args:
+        controller (ControllerInterface): The controller held on a stream timeout.
+        actuator (ActuatorInterface): The actuator chain driven to the safe state.
+        stats_sources (Dict): Receives the statistics of the watchdog.
+        timer (Optional[DeadlineTimer]): Timer shared with the watchdogs of other loops,
+            started by the caller, None to start a timer of its own.
+
+    Returns:
+        Optional[StreamWatchdog]: The watchdog with its timer started, None if not configured.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.services.stream_watchdog import StreamWatchdog
+    from app.utils.config import config
+    from app.utils.deadline_timer import DeadlineTimer
+
+    if not (config.SENSOR_TIMEOUT_S or config.SETPOINT_TIMEOUT_S or config.SENSOR_MAX_AGE_S):
+        return None
+    if timer is None:
+        timer = DeadlineTimer()
+        timer.start()
+    watchdog = StreamWatchdog(
+        controller=controller,
+        actuator=actuator,
+        timer=timer,
+        sensor_timeout_s=config.SENSOR_TIMEOUT_S,
+        setpoint_timeout_s=config.SETPOINT_TIMEOUT_S,
+        max_reading_age_s=config.SENSOR_MAX_AGE_S,
+        safe_state=config.ACTUATOR_SAFE_STATE,
+        safe_state_retry_s=config.ACTUATOR_SAFE_STATE_RETRY_S,
+    )
+    stats_sources["watchdog"] = watchdog.stats
+    return watchdog
+
+
+async def stop_services(shutdown: List[ShutdownStep], timeout_s: float) -> None:
+    """
+    Run the shutdown steps in order, giving up after `timeout_s` seconds in total.
 
-from app.services.websocket_service import WebSocketService
-from app.utils.config import config
+    Blocking steps run in a worker thread so the event loop stays responsive.
+    A failing step is logged and does not prevent the following ones.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.utils.logger import logger
 
-from app.routes.api import create_api_router
+    deadline = time.monotonic() + timeout_s
+    for step in shutdown:
+        remaining = deadline - time.monotonic()
+        try:
+            if inspect.iscoroutinefunction(step):
+                await asyncio.wait_for(step(), remaining)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(step), remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutdown exceeded {timeout_s}s, skipping the remaining steps")
+            return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Whatever a component raises, the following ones still have to be stopped
+            logger.error(f"Error during shutdown: {e}")
 
-from app.swncrew_backend_client import Client
 
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Start the services when the application starts and stop them when it shuts down.
 
-app = FastAPI(
-    version=config.VERSION,
-    title=config.PROJECT_NAME,
-    debug=config.DEBUG_LEVEL == "DEBUG",
-)
+    Args:
+        application (FastAPI): The application being served.
+    """
+    # pylint: disable=import-outside-toplevel
+    from app.utils.config import config
 
-# Setup Dependencies
-pid = PIDController()
-rest_client = Client(base_url=f"http://{config.BACKEND_BASE}", timeout=0.5)
-proportional = ProportionalValveActuator(client=rest_client)
-ws_service = WebSocketService(controller=pid, actuator=proportional)
+    shutdown = await start_services(application)
+    yield
+    await stop_services(shutdown, config.SHUTDOWN_TIMEOUT_S)
 
-ws_service.start()
 
-api_router = create_api_router(controller=pid)
-app.include_router(api_router)
+app = FastAPI(lifespan=lifespan)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.utils.circuit_breaker import BreakerState
+
+
+class CircuitBreakerState(BaseModel):
+    """
+    Model representing the state of the actuator circuit breaker.
+
+    Parameters
+    ----------
+    state : BreakerState
+        "closed" while writes pass, "open" while they are skipped, "half_open" while probing
+    consecutive_failures : int
+        Number of failed writes since the last successful one
+    opened : int
+        Number of times the breaker opened
+    rejected : int
+        Number of writes skipped while the breaker was open
+    timeout_s : Optional[float]
+        Current actuator request timeout, None if it is not adaptive
+    """
+    state: BreakerState
+    consecutive_failures: int
+    opened: int
+    rejected: int
+    timeout_s: Optional[float] = None
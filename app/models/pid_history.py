@@ -0,0 +1,49 @@
+from typing import TYPE_CHECKING, Dict, List
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class PIDHistory(BaseModel):
+    """
+    Model representing recent controller steps as parallel series.
+
+    Parameters
+    ----------
+    timestamp_ns : List[int]
+        Sensor timestamp of every step in nanoseconds since Epoch
+    measurement : List[float]
+        Process value fed to the controller
+    setpoint : List[float]
+        Setpoint at the time of the step
+    P : List[float]
+        Proportional component of the PID output
+    I : List[float]
+        Integral component of the PID output
+    D : List[float]
+        Derivative component of the PID output
+    output : List[float]
+        Controller output sent to the actuator
+    """
+    timestamp_ns: List[int]
+    measurement: List[float]
+    setpoint: List[float]
+    P: List[float]
+    I: List[float]
+    D: List[float]
+    output: List[float]
+
+    @classmethod
+    def new(cls, series: Dict[str, "np.ndarray"]):
+        """
+        Create a new PIDHistory instance from the arrays of a history query.
+
+        Args:
+            series (Dict[str, np.ndarray]): Arrays keyed by field name.
+
+        Returns:
+            PIDHistory: A new instance of PIDHistory holding the series as lists.
+        """
+        return PIDHistory(**{name: values.tolist() for name, values in series.items()})
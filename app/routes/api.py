@@ -1,9 +1,88 @@
-from fastapi import APIRouter
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Union
+from fastapi import APIRouter, HTTPException, Query
+from app.models.circuit_breaker_state import CircuitBreakerState
 from app.models.pid_components import PIDComponents
-from app.controllers.pid_controller import PIDController
+from app.models.pid_history import PIDHistory
 
-def create_api_router(controller: PIDController) -> APIRouter:
+if TYPE_CHECKING:
+    from app.controllers.pid_controller import PIDController
+    from app.controllers.shared_controller_view import SharedControllerView
+    from app.controllers.vectorized_pid_controller import PIDLoop
+    from app.utils.adaptive_timeout import AdaptiveTimeout
+    from app.utils.circuit_breaker import CircuitBreaker
+    from app.utils.control_status import ControlStatusFile
+
+StatsSource = Callable[[], Dict[str, float]]
+
+
+def actuator_breaker_state(
+    actuator_breaker: "CircuitBreaker", actuator_timeout: Optional["AdaptiveTimeout"] = None
+) -> CircuitBreakerState:
+    """
+    Describe the actuator circuit breaker and the current actuator request timeout.
+
+    Args:
+        actuator_breaker (CircuitBreaker): The breaker guarding actuator writes.
+        actuator_timeout (Optional[AdaptiveTimeout]): The adaptive request timeout, if any.
+
+    Returns:
+        CircuitBreakerState: The breaker state, its counters and the current request timeout.
+    """
+    return CircuitBreakerState(
+        state=actuator_breaker.state,
+        consecutive_failures=actuator_breaker.consecutive_failures,
+        opened=actuator_breaker.opened,
+        rejected=actuator_breaker.rejected,
+        timeout_s=actuator_timeout.current_s if actuator_timeout is not None else None,
+    )
+
+
+def load_control_status(control_status: "ControlStatusFile") -> dict:
+    """
+    Load the status published by the worker owning the control loop.
+
+    Args:
+        control_status (ControlStatusFile): The status file of the control loop.
+
+    Returns:
+        dict: The published status.
+
+    Raises:
+        HTTPException: 503 if no status was published yet.
+    """
+    status = control_status.load()
+    if status is None:
+        raise HTTPException(status_code=503, detail="Control loop status not published yet")
+    return status
+
+
+def create_api_router(
+    controller: Optional[Union["PIDController", "SharedControllerView"]],
+    stats_sources: Optional[Dict[str, StatsSource]] = None,
+    actuator_breaker: Optional["CircuitBreaker"] = None,
+    actuator_timeout: Optional["AdaptiveTimeout"] = None,
+    control_status: Optional["ControlStatusFile"] = None,
+    loops: Optional[Dict[int, Union["PIDController", "PIDLoop", "SharedControllerView"]]] = None,
+) -> APIRouter:
+    """
+    Create the API routes of the control loop.
+
+    Workers not owning the control loop pass the `control_status` published by the
+    owning worker, which the breaker and statistics routes are then served from.
+    The controller routes select one of the `loops`, keyed by sensor id, with the
+    `sensor_id` query parameter and report on `controller` without it.
+    """
     api_router = APIRouter()
+    stats_sources = stats_sources or {}
+    loops = loops or {}
+
+    def select_controller(sensor_id: Optional[int]):
+        if sensor_id is None:
+            return controller
+        if sensor_id not in loops:
+            raise HTTPException(status_code=404, detail=f"No control loop for sensor {sensor_id}")
+        return loops[sensor_id]
 
     @api_router.get("/health")
     def read_health():
@@ -16,17 +95,82 @@ def create_api_router(controller: PIDController) -> APIRouter:
         return {"status": "ok"}
 
     @api_router.get("/pid/components", response_model=PIDComponents)
-    def get_pid_components():
+    def get_pid_components(sensor_id: Optional[int] = None):
         """
-        Retrieve the PID components from the given PID controller.
+        Retrieve the PID components from the latest snapshot of the given PID controller.
 
         Args:
-            controller (PIDController): The PID controller instance, injected by dependency.
+            sensor_id (Optional[int]): The sensor of the control loop, None for the main one.
 
         Returns:
             PIDComponents: A new instance of PIDComponents containing the PID components.
         """
-        components = controller.pid.components
-        return PIDComponents.new(components)
+        selected = select_controller(sensor_id)
+        if selected is None:
+            raise HTTPException(
+                status_code=503, detail="PID controller runs in another worker without shared state"
+            )
+        snapshot = selected.snapshot
+        return PIDComponents.new((snapshot.P, snapshot.I, snapshot.D))
+
+    @api_router.get("/pid/history", response_model=PIDHistory)
+    def get_pid_history(
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        max_points: int = Query(default=1000, ge=1, le=100_000),
+        sensor_id: Optional[int] = None,
+    ):
+        """
+        Retrieve recent controller steps from the history of the controller.
+
+        Args:
+            start_ns (Optional[int]): Only include steps with a sensor timestamp at or after this time.
+            end_ns (Optional[int]): Only include steps with a sensor timestamp at or before this time.
+            max_points (int): Decimate the steps in the range to at most this many points.
+            sensor_id (Optional[int]): The sensor of the control loop, None for the main one.
+
+        Returns:
+            PIDHistory: The recorded measurements, setpoints, PID components and outputs.
+        """
+        selected = select_controller(sensor_id)
+        if selected is None or selected.history is None:
+            raise HTTPException(status_code=404, detail="PID history is disabled")
+        return PIDHistory.new(selected.history.query(start_ns, end_ns, max_points))
+
+    @api_router.get("/actuator/breaker", response_model=CircuitBreakerState)
+    def get_actuator_breaker():
+        """
+        Retrieve the state of the circuit breaker guarding actuator writes.
+
+        Returns:
+            CircuitBreakerState: The breaker state, its counters and the current request timeout.
+        """
+        if control_status is not None:
+            breaker = load_control_status(control_status)["breaker"]
+            if breaker is None:
+                raise HTTPException(status_code=404, detail="Actuator circuit breaker is disabled")
+            return CircuitBreakerState(**breaker)
+        if actuator_breaker is None:
+            raise HTTPException(status_code=404, detail="Actuator circuit breaker is disabled")
+        return actuator_breaker_state(actuator_breaker, actuator_timeout)
+
+    @api_router.get("/stats")
+    def get_stats():
+        """
+        Retrieve runtime statistics of the registered service components.
+
+        Returns:
+            dict: The statistics of every registered component, keyed by component name.
+        """
+        stats = {name: source() for name, source in stats_sources.items()}
+        if control_status is None:
+            return stats
+        status = load_control_status(control_status)
+        # The components run in the owning worker, only the worker entry is local
+        return {
+            **status["stats"],
+            **stats,
+            "control_status": {"age_s": (time.time_ns() - status["published_ns"]) / 1e9},
+        }
 
     return api_router
@@ -0,0 +1,40 @@
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.routes.api import load_control_status
+from app.utils.metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from app.utils.control_status import ControlStatusFile
+
+
+class PrometheusResponse(PlainTextResponse):
+    media_type = "text/plain; version=0.0.4"
+
+
+def create_metrics_router(
+    registry: MetricsRegistry, control_status: Optional["ControlStatusFile"] = None
+) -> APIRouter:
+    """
+    Create the metrics route.
+
+    Workers not owning the control loop pass the `control_status` published by the
+    owning worker and serve the metrics it rendered.
+    """
+    metrics_router = APIRouter()
+
+    @metrics_router.get("/metrics", response_class=PrometheusResponse)
+    def get_metrics():
+        """
+        Expose hot path timing histograms, WebSocket counters and component statistics.
+
+        Returns:
+            str: All metrics in the Prometheus text exposition format.
+        """
+        if control_status is not None:
+            return load_control_status(control_status)["metrics"]
+        return registry.render()
+
+    return metrics_router
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from app.interfaces.actuator import AsyncActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.utils.config import config
+from app.utils.connection_gaps import ConnectionGaps
+from app.utils.logger import logger
+from app.utils.metrics import STAGE_SECONDS, WS_ERRORS, WS_MESSAGES, WS_RECONNECTS
+from app.utils.reconnect_backoff import ReconnectBackoff
+from app.utils.sensor_decoder import parse_sensor_message
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+_PARSE_SECONDS = STAGE_SECONDS.labels(stage="json_parse")
+_READING_SECONDS = STAGE_SECONDS.labels(stage="sensor_reading")
+
+
+class AsyncWebSocketService:
+    """
+    asyncio implementation of the setpoint and sensor WebSocket service.
+
+    Runs inside the FastAPI event loop as independent tasks, so receiving, computing
+    and actuating never block each other:
+
+    - one receiver task per WebSocket, only parsing messages
+    - a control task computing updates from the newest sensor reading
+    - an actuator task writing the newest update, one write in flight at a time
+
+    Stopping cancels the receivers first; the control task still computes the update
+    for a reading received before, and the actuator task writes it before exiting.
+
+    Controller calls run on a dedicated single-thread executor. This keeps blocking
+    work inside the controller (such as telemetry writes) off the event loop while
+    still serializing all access to the controller.
+
+    Parameters
+    ----------
+    controller : ControllerInterface
+        Controller implementation for processing setpoint and sensor data
+    actuator : AsyncActuatorInterface
+        Actuator implementation for applying controller updates
+
+    Attributes
+    ----------
+    sensor_reading : Optional[SensorReading]
+        Latest sensor reading received
+    setpoint_gaps : ConnectionGaps
+        Interruptions of the setpoint stream by reconnects
+    sensor_gaps : ConnectionGaps
+        Interruptions of the sensor stream by reconnects
+    """
+
+    def __init__(self, controller: ControllerInterface, actuator: AsyncActuatorInterface):
+        self.actuator = actuator
+        self.controller = controller
+        self.sensor_reading: Optional[SensorReading] = None
+        self.setpoint_gaps = ConnectionGaps(
+            "setpoint", data_gap=False, stable_s=config.WS_RECONNECT_MAX_S
+        )
+        self.sensor_gaps = ConnectionGaps("sensor", data_gap=True, stable_s=config.WS_RECONNECT_MAX_S)
+
+        self.readings_received = 0
+        self.readings_dropped = 0
+        self.updates_written = 0
+        self.updates_superseded = 0
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="controller"
+        )
+        # Set when a control step is due, and to wake up the control task on stop
+        self._reading_pending = asyncio.Event()
+        self._reading_ready = False
+        self._pending_update: Optional[float] = None
+        self._update_pending = asyncio.Event()
+        self._stopping = False
+        self._control_done = False
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the service tasks in the running event loop"""
+        self._tasks = [
+            asyncio.create_task(
+                self._run_ws(
+                    f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/setpoint/{config.SENSOR_ID}",
+                    "Setpoint",
+                    self.setpoint_gaps,
+                    self._on_setpoint_message,
+                )
+            ),
+            asyncio.create_task(
+                self._run_ws(
+                    f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/{config.SENSOR_ID}",
+                    "Sensor",
+                    self.sensor_gaps,
+                    self._on_sensor_message,
+                )
+            ),
+            asyncio.create_task(self._run_control()),
+            asyncio.create_task(self._run_actuator()),
+        ]
+
+    async def stop(self) -> None:
+        """Stop receiving, write the pending update and release the controller executor"""
+        receivers, workers = self._tasks[:2], self._tasks[2:]
+        try:
+            for task in receivers:
+                task.cancel()
+            await asyncio.gather(*receivers, return_exceptions=True)
+            self._stopping = True
+            self._reading_pending.set()
+            await asyncio.gather(*workers)
+        finally:
+            # Only left running when stopping was cancelled, e.g. by a shutdown timeout
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            self._executor.shutdown(wait=True)
+
+    async def _run_ws(
+        self,
+        url: str,
+        name: str,
+        gaps: ConnectionGaps,
+        on_message: Callable[[str], Awaitable[None]],
+    ) -> None:
+        """
+        Receive messages from a WebSocket, reconnecting when it closes.
+
+        A lost connection is retried immediately, further attempts back off
+        exponentially with jitter. Keepalive pings detect a dead peer.
+        """
+        messages = WS_MESSAGES.labels(websocket=name.lower())
+        errors = WS_ERRORS.labels(websocket=name.lower())
+        reconnects = WS_RECONNECTS.labels(websocket=name.lower())
+        backoff = ReconnectBackoff(config.WS_RECONNECT_INITIAL_S, config.WS_RECONNECT_MAX_S)
+        first_attempt = True
+        while True:
+            if not first_attempt:
+                reconnects.inc()
+            first_attempt = False
+            try:
+                async with connect(
+                    url,
+                    ping_interval=config.WS_PING_INTERVAL_S or None,
+                    ping_timeout=config.WS_PING_TIMEOUT_S,
+                ) as websocket:
+                    gaps.opened()
+                    logger.info(f"{name} WebSocket opened")
+                    async for message in websocket:
+                        messages.inc()
+                        gaps.message(time.perf_counter())
+                        await on_message(message)
+            except ConnectionClosed as e:
+                logger.info(f"{name} WebSocket closed: {e.code} - {e.reason}")
+            except Exception as e:
+                errors.inc()
+                logger.error(f"{name} WS error: {e}")
+            if gaps.lost():
+                backoff.reset()
+            delay = backoff.next_delay()
+            if delay:
+                logger.info(f"{name} WebSocket reconnecting in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _on_setpoint_message(self, message: str) -> None:
+        """Handle setpoint messages"""
+        logger.debug(f"Received setpoint message: {message}")
+        try:
+            setpoint = json.loads(message)
+            await self._call_controller(self.controller.set_setpoint, setpoint)
+            if self.sensor_reading:
+                self._reading_ready = True
+                self._reading_pending.set()
+        except Exception as e:
+            WS_ERRORS.labels(websocket="setpoint").inc()
+            logger.error(f"Error processing setpoint message: {e}")
+
+    async def _on_sensor_message(self, message: str) -> None:
+        """Handle sensor messages"""
+        logger.debug("Received sensor message: %s", message)
+        try:
+            started = time.perf_counter()
+            value, timestamp_ns = parse_sensor_message(message)
+            parsed = time.perf_counter()
+            self.sensor_reading = SensorReading(value, timestamp_ns)
+            _PARSE_SECONDS.observe(parsed - started)
+            _READING_SECONDS.observe(time.perf_counter() - parsed)
+            self.readings_received += 1
+            if self._reading_ready:
+                self.readings_dropped += 1
+            self._reading_ready = True
+            self._reading_pending.set()
+        except Exception as e:
+            WS_ERRORS.labels(websocket="sensor").inc()
+            logger.error(f"Error processing sensor message: {e}")
+
+    async def _run_control(self) -> None:
+        """Compute controller updates from the newest sensor reading until stopped"""
+        try:
+            while True:
+                if not self._reading_ready:
+                    if self._stopping:
+                        return
+                    await self._reading_pending.wait()
+                    self._reading_pending.clear()
+                    continue
+                self._reading_ready = False
+                try:
+                    update = await self._call_controller(
+                        self.controller.calculate_update, self.sensor_reading
+                    )
+                except Exception as e:
+                    logger.error(f"Error calculating controller update: {e}")
+                    continue
+                if update is not None:
+                    if self._pending_update is not None:
+                        self.updates_superseded += 1
+                    self._pending_update = update
+                    self._update_pending.set()
+        finally:
+            self._control_done = True
+            self._update_pending.set()
+
+    async def _run_actuator(self) -> None:
+        """Write the newest controller update to the actuator until control is done"""
+        while True:
+            if self._pending_update is None:
+                if self._control_done:
+                    return
+                await self._update_pending.wait()
+                self._update_pending.clear()
+                continue
+            update, self._pending_update = self._pending_update, None
+            try:
+                await self.actuator.update(update)
+                self.updates_written += 1
+            except Exception as e:
+                logger.error(f"Error updating actuator: {e}")
+
+    async def _call_controller(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, method, *args)
+
+    def stats(self) -> Dict[str, float]:
+        """Return reading and actuator write counters."""
+        return {
+            "readings_received": self.readings_received,
+            "readings_dropped": self.readings_dropped,
+            "updates_written": self.updates_written,
+            "updates_superseded": self.updates_superseded,
+        }
@@ -0,0 +1,104 @@
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional
+
+from app.interfaces.actuator import ActuatorInterface
+from app.services.control_scheduler import PeriodicScheduler
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.logger import logger
+
+if TYPE_CHECKING:
+    from app.controllers.vectorized_pid_controller import PIDLoop, VectorizedPIDController
+    from app.services.stream_watchdog import StreamWatchdog
+
+
+class ScheduledLoop(NamedTuple):
+    """A control loop stepped by the `BatchControlScheduler`"""
+
+    loop: "PIDLoop"
+    actuator: ActuatorInterface
+    # Returns the latest sensor reading, or None if none was received yet
+    reading_source: Callable[[], Optional[SensorReading]]
+    watchdog: Optional["StreamWatchdog"] = None
+
+
+class BatchControlScheduler(PeriodicScheduler):
+    """
+    Steps all loops of a `VectorizedPIDController` at a fixed period in one batch.
+
+    Every period the latest reading of each loop is staged, unless the loop already
+    stepped on a reading with the same timestamp, see `ControlScheduler`. The engine
+    then steps all loops with a staged reading at once and the updates are written
+    to the actuators of their loops.
+
+    Loops with a watchdog stage readings through `StreamWatchdog.run_step` and write
+    updates through `StreamWatchdog.apply`, so a loop whose streams timed out neither
+    steps nor overwrites its safe state.
+
+    Parameters
+    ----------
+    engine : VectorizedPIDController
+        Engine the loops belong to
+    loops : List[ScheduledLoop]
+        The loops to step with their actuators, reading sources and watchdogs
+    period_s : float
+        Control period in seconds
+    """
+
+    def __init__(
+        self,
+        engine: "VectorizedPIDController",
+        loops: List[ScheduledLoop],
+        period_s: float,
+    ):
+        super().__init__(period_s)
+        self.engine = engine
+        self.loops = {scheduled.loop.index: scheduled for scheduled in loops}
+
+        self.unchanged_readings = 0
+        self.failed_writes = 0
+        self._last_timestamp_ns: Dict[int, int] = {}
+
+    def _tick(self) -> None:
+        self.ticks += 1
+        for index, scheduled in self.loops.items():
+            reading = scheduled.reading_source()
+            if reading is None:
+                continue
+            if reading.timestamp_ns == self._last_timestamp_ns.get(index):
+                self.unchanged_readings += 1
+                continue
+            self._last_timestamp_ns[index] = reading.timestamp_ns
+            if scheduled.watchdog is None:
+                scheduled.loop.submit(reading)
+            else:
+                scheduled.watchdog.run_step(scheduled.loop.submit, reading)
+
+        try:
+            indices, updates = self.engine.tick()
+        except Exception as e:
+            logger.error(f"Error in batched control step: {e}")
+            return
+
+        for index, update in zip(indices.tolist(), updates.tolist()):
+            scheduled = self.loops[index]
+            try:
+                if scheduled.watchdog is None:
+                    scheduled.actuator.update(update)
+                else:
+                    scheduled.watchdog.apply(scheduled.actuator.update, update)
+            except Exception as e:
+                self.failed_writes += 1
+                logger.error(f"Error writing the update of sensor {scheduled.loop.sensor_id}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return tick, deadline-miss and timing statistics.
+
+        Unchanged readings were not staged as their loop already stepped on them.
+        Failed writes count updates an actuator raised on.
+        """
+        return {
+            **super().stats(),
+            "loops": len(self.loops),
+            "unchanged_readings": self.unchanged_readings,
+            "failed_writes": self.failed_writes,
+        }
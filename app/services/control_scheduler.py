@@ -0,0 +1,166 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from app.interfaces.actuator import ActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.logger import logger
+from app.utils.stats import RunningStats
+
+if TYPE_CHECKING:
+    from app.services.stream_watchdog import StreamWatchdog
+
+
+class PeriodicScheduler:
+    """
+    Runs `_tick` at a fixed period in a daemon thread.
+
+    Ticks are planned on an absolute time grid so timing errors do not accumulate.
+    A tick that ends after the start of the next one counts as a deadline miss; the
+    missed ticks are skipped rather than executed back to back.
+
+    Parameters
+    ----------
+    period_s : float
+        Period in seconds
+    """
+
+    def __init__(self, period_s: float):
+        self.period_s = period_s
+
+        self.ticks = 0
+        self.deadline_misses = 0
+        self.skipped_ticks = 0
+        self.jitter = RunningStats()
+        self.step_duration = RunningStats()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the scheduler in a daemon thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler and wait for the running tick to finish"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        logger.info(f"{type(self).__name__} started with period {self.period_s} s")
+        deadline = time.monotonic() + self.period_s
+
+        while not self._stop.wait(max(deadline - time.monotonic(), 0)):
+            started = time.monotonic()
+            lateness = started - deadline
+            self.jitter.add(lateness)
+
+            self._tick()
+
+            finished = time.monotonic()
+            self.step_duration.add(finished - started)
+
+            deadline += self.period_s
+            if finished > deadline:
+                missed = int((finished - deadline) // self.period_s) + 1
+                self.deadline_misses += 1
+                self.skipped_ticks += missed
+                deadline += missed * self.period_s
+
+    def _tick(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return tick, deadline-miss and timing statistics.
+
+        Jitter is the delay between the planned and the actual start of a tick.
+        """
+        return {
+            "period_s": self.period_s,
+            "ticks": self.ticks,
+            "deadline_misses": self.deadline_misses,
+            "skipped_ticks": self.skipped_ticks,
+            **self.jitter.as_dict("jitter_s_"),
+            **self.step_duration.as_dict("step_duration_s_"),
+        }
+
+
+class ControlScheduler(PeriodicScheduler):
+    """
+    Runs the control step at a fixed period, decoupled from sensor message arrival.
+
+    Every period the latest sensor reading is taken from `reading_source`, fed to the
+    controller and the resulting update is applied to the actuator, see
+    `PeriodicScheduler` for the timing. A tick whose latest reading has the same
+    timestamp as the one the previous step used is skipped: stepping again would
+    integrate the same measurement once more, so a period shorter than the sensor
+    interval would inflate the integral and derivative terms. Setpoint changes
+    therefore take effect with the next reading.
+
+    Parameters
+    ----------
+    controller : ControllerInterface
+        Controller implementation calculating the updates
+    actuator : ActuatorInterface
+        Actuator implementation applying the updates
+    reading_source : Callable[[], Optional[SensorReading]]
+        Returns the latest sensor reading, or None if none was received yet
+    period_s : float
+        Control period in seconds
+    watchdog : Optional[StreamWatchdog]
+        If set, ticks are skipped while the watchdog reports stale inputs
+    """
+
+    def __init__(
+        self,
+        controller: ControllerInterface,
+        actuator: ActuatorInterface,
+        reading_source: Callable[[], Optional[SensorReading]],
+        period_s: float,
+        watchdog: Optional["StreamWatchdog"] = None,
+    ):
+        super().__init__(period_s)
+        self.controller = controller
+        self.actuator = actuator
+        self.reading_source = reading_source
+        self.watchdog = watchdog
+
+        self.unchanged_ticks = 0
+        self._last_timestamp_ns: Optional[int] = None
+
+    def _tick(self) -> None:
+        self.ticks += 1
+        reading = self.reading_source()
+        if reading is None:
+            return
+        if reading.timestamp_ns == self._last_timestamp_ns:
+            self.unchanged_ticks += 1
+            return
+        self._last_timestamp_ns = reading.timestamp_ns
+        try:
+            if self.watchdog is None:
+                self._step(reading)
+            else:
+                self.watchdog.run_step(self._step, reading)
+        except Exception as e:
+            logger.error(f"Error in scheduled control step: {e}")
+
+    def _step(self, reading: SensorReading) -> None:
+        update = self.controller.calculate_update(reading)
+        if update is not None:
+            self.actuator.update(update)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return tick, deadline-miss and timing statistics.
+
+        Jitter is the delay between the planned and the actual start of a tick.
+        Unchanged ticks found no reading newer than the previous step's.
+        """
+        return {**super().stats(), "unchanged_ticks": self.unchanged_ticks}
@@ -0,0 +1,195 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+from app.interfaces.actuator import ActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.deadline_timer import DeadlineTimer
+from app.utils.logger import logger
+from app.utils.metrics import STALE_READINGS, STREAM_TIMEOUTS
+
+SENSOR = "sensor"
+SETPOINT = "setpoint"
+_SAFE_STATE_RETRY = "safe_state_retry"
+
+_STALE_READINGS = STALE_READINGS.labels()
+
+
+class StreamWatchdog:
+    """
+    Supervises the sensor and setpoint streams feeding a controller.
+
+    Every received message re-arms the deadline of its stream on a shared
+    `DeadlineTimer`. When a stream stays silent past its timeout, the controller
+    is held, which pauses integration, and the actuator is driven to the safe
+    state. Once all timed-out streams deliver again, the controller is released
+    bumplessly from the safe state.
+
+    Independently of the timeouts, control steps on a reading received longer
+    than `max_reading_age_s` ago are skipped, so a setpoint change never acts on
+    an outdated measurement.
+
+    Control steps run through `run_step`, which serializes them with the fail-safe
+    so no update computed from stale data reaches the actuator after the safe state.
+    Updates calculated outside `run_step`, e.g. by a batched tick, are written through
+    `apply` for the same reason.
+
+    Deadlines are keyed by watchdog, so the watchdogs of several control loops can
+    share a timer.
+
+    Parameters
+    ----------
+    controller : ControllerInterface
+        Controller held while a stream is timed out
+    actuator : ActuatorInterface
+        Actuator control steps write to, driven to the safe state with `override`
+        so that no update queued or in flight overwrites the safe state and no
+        filter or circuit breaker drops it
+    timer : DeadlineTimer
+        Timer tracking the stream deadlines
+    sensor_timeout_s : Optional[float]
+        Maximum time between sensor readings, None to not supervise the sensor stream
+    setpoint_timeout_s : Optional[float]
+        Maximum time between setpoint messages, None to not supervise the setpoint stream
+    max_reading_age_s : Optional[float]
+        Maximum age of the reading a control step is calculated from, None for no limit
+    safe_state : Optional[float]
+        Actuator state written on a timeout, None to only hold the controller
+    safe_state_retry_s : float
+        Delay before a failed safe state write is retried, retries continue until a
+        write succeeds or the streams resume
+
+    Attributes
+    ----------
+    timed_out : Set[str]
+        Streams currently past their timeout
+    """
+
+    def __init__(
+        self,
+        controller: ControllerInterface,
+        actuator: ActuatorInterface,
+        timer: DeadlineTimer,
+        sensor_timeout_s: Optional[float] = None,
+        setpoint_timeout_s: Optional[float] = None,
+        max_reading_age_s: Optional[float] = None,
+        safe_state: Optional[float] = None,
+        safe_state_retry_s: float = 1.0,
+    ):
+        self.controller = controller
+        self.actuator = actuator
+        self.timer = timer
+        self.timeouts_s = {SENSOR: sensor_timeout_s, SETPOINT: setpoint_timeout_s}
+        self.max_reading_age_s = max_reading_age_s
+        self.safe_state = safe_state
+        self.safe_state_retry_s = safe_state_retry_s
+
+        self.timed_out: Set[str] = set()
+        self.timeout_counts = {SENSOR: 0, SETPOINT: 0}
+        self.stale_readings = 0
+        self.safe_state_writes = 0
+        self.safe_state_failures = 0
+
+        self.lock = threading.Lock()
+        self._sensor_received = 0.0
+        self._callbacks = {stream: self._timeout_callback(stream) for stream in self.timeouts_s}
+
+    def start(self) -> None:
+        """Arm the deadlines, a stream that never delivers times out as well"""
+        for stream in self.timeouts_s:
+            self._arm(stream)
+
+    def sensor_received(self) -> None:
+        """Record the arrival of a sensor reading"""
+        self._sensor_received = time.monotonic()
+        self._received(SENSOR)
+
+    def setpoint_received(self) -> None:
+        """Record the arrival of a setpoint message"""
+        self._received(SETPOINT)
+
+    def run_step(self, step: Callable[[SensorReading], None], reading: SensorReading) -> None:
+        """Run a control step unless a stream timed out or the reading is too old"""
+        with self.lock:
+            if self.timed_out:
+                return
+            if (
+                self.max_reading_age_s is not None
+                and time.monotonic() - self._sensor_received > self.max_reading_age_s
+            ):
+                self.stale_readings += 1
+                _STALE_READINGS.inc()
+                return
+            step(reading)
+
+    def apply(self, write: Callable[[float], None], value: float) -> None:
+        """Write an update calculated outside `run_step` unless a stream timed out meanwhile"""
+        with self.lock:
+            if not self.timed_out:
+                write(value)
+
+    def _arm(self, stream: str) -> None:
+        timeout_s = self.timeouts_s[stream]
+        if timeout_s is not None:
+            self.timer.arm((self, stream), timeout_s, self._callbacks[stream])
+
+    def _received(self, stream: str) -> None:
+        self._arm(stream)
+        if stream in self.timed_out:
+            with self.lock:
+                self.timed_out.discard(stream)
+                if self.timed_out:
+                    return
+                self.timer.cancel((self, _SAFE_STATE_RETRY))
+                logger.info(f"{stream.capitalize()} stream resumed, releasing controller")
+                self.controller.release(self.safe_state)
+
+    def _timeout_callback(self, stream: str) -> Callable[[], None]:
+        return lambda: self._on_timeout(stream)
+
+    def _on_timeout(self, stream: str) -> None:
+        with self.lock:
+            self.timeout_counts[stream] += 1
+            STREAM_TIMEOUTS.labels(stream=stream).inc()
+            logger.warning(
+                f"No {stream} message for {self.timeouts_s[stream]} s, entering safe state"
+            )
+            already_safe = bool(self.timed_out)
+            self.timed_out.add(stream)
+            if already_safe:
+                return
+            self.controller.hold()
+            if self.safe_state is not None:
+                self._write_safe_state()
+
+    def _retry_safe_state(self) -> None:
+        with self.lock:
+            if self.timed_out:
+                self._write_safe_state()
+
+    def _write_safe_state(self) -> None:
+        """Write the safe state, re-arming a retry until a write succeeded"""
+        try:
+            self.actuator.override(self.safe_state)
+        except Exception as e:
+            self.safe_state_failures += 1
+            logger.error(
+                f"Failed to write actuator safe state, retrying in {self.safe_state_retry_s} s: {e}"
+            )
+            self.timer.arm(
+                (self, _SAFE_STATE_RETRY), self.safe_state_retry_s, self._retry_safe_state
+            )
+            return
+        self.safe_state_writes += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return timeout, stale reading and safe state counters."""
+        return {
+            "safe_state": int(bool(self.timed_out)),
+            "sensor_timeouts": self.timeout_counts[SENSOR],
+            "setpoint_timeouts": self.timeout_counts[SETPOINT],
+            "stale_readings": self.stale_readings,
+            "safe_state_writes": self.safe_state_writes,
+            "safe_state_failures": self.safe_state_failures,
+        }
@@ -1,14 +1,33 @@
 import threading
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, List, Optional
 import json
 import websocket
 
 from app.interfaces.actuator import ActuatorInterface
 from app.interfaces.controller import ControllerInterface
+from app.services.control_scheduler import ControlScheduler
 from app.utils.config import config
+from app.utils.connection_gaps import ConnectionGaps
 from app.utils.logger import logger
+from app.utils.mailbox import LatestValueMailbox
+from app.utils.metrics import STAGE_SECONDS, WS_ERRORS, WS_MESSAGES, WS_RECONNECTS
+from app.utils.reconnect_backoff import ReconnectBackoff
+from app.utils.sensor_decoder import parse_sensor_message
 from app.swncrew_backend_client.models.sensor_reading import SensorReading
 
+if TYPE_CHECKING:
+    from app.services.stream_watchdog import StreamWatchdog
+
+_PARSE_SECONDS = STAGE_SECONDS.labels(stage="json_parse")
+_READING_SECONDS = STAGE_SECONDS.labels(stage="sensor_reading")
+_SETPOINT_MESSAGES = WS_MESSAGES.labels(websocket="setpoint")
+_SENSOR_MESSAGES = WS_MESSAGES.labels(websocket="sensor")
+_SETPOINT_ERRORS = WS_ERRORS.labels(websocket="setpoint")
+_SENSOR_ERRORS = WS_ERRORS.labels(websocket="sensor")
+_SETPOINT_RECONNECTS = WS_RECONNECTS.labels(websocket="setpoint")
+_SENSOR_RECONNECTS = WS_RECONNECTS.labels(websocket="sensor")
+
 
 class WebSocketService:
     """
@@ -20,18 +39,47 @@ class WebSocketService:
         Controller implementation for processing setpoint and sensor data
     actuator : ActuatorInterface
         Actuator implementation for applying controller updates
+    control_period_s : Optional[float]
+        If set, control steps run at this fixed period instead of per sensor message
+    coalesce_sensor : bool
+        If set, sensor readings are handed to a worker thread through a single-slot
+        mailbox, dropping readings that were superseded before being processed
+    watchdog : Optional[StreamWatchdog]
+        If set, supervises both streams and gates every control step
+    sensor_id : Optional[int]
+        Sensor whose readings and setpoints are received, defaults to `SENSOR_ID`
+    step_on_message : bool
+        If cleared, messages only update `sensor_reading` and the setpoint, and the
+        control steps are left to a scheduler outside the service
 
     Attributes
     ----------
     sensor_reading : Optional[SensorReading]
         Latest sensor reading received
+    scheduler : Optional[ControlScheduler]
+        Fixed-rate scheduler, None when control steps follow sensor messages
+    sensor_mailbox : Optional[LatestValueMailbox[SensorReading]]
+        Mailbox feeding the sensor worker, None when readings are processed inline
     setpoint_ws : Optional[websocket.WebSocketApp]
         WebSocket connection for setpoint data
     sensor_ws : Optional[websocket.WebSocketApp]
         WebSocket connection for sensor data
+    setpoint_gaps : ConnectionGaps
+        Interruptions of the setpoint stream by reconnects
+    sensor_gaps : ConnectionGaps
+        Interruptions of the sensor stream by reconnects
     """
 
-    def __init__(self, controller: ControllerInterface, actuator: ActuatorInterface):
+    def __init__(
+        self,
+        controller: ControllerInterface,
+        actuator: ActuatorInterface,
+        control_period_s: Optional[float] = None,
+        coalesce_sensor: bool = False,
+        watchdog: Optional["StreamWatchdog"] = None,
+        sensor_id: Optional[int] = None,
+        step_on_message: bool = True,
+    ):
         """
         Initialize WebSocket service with controller and actuator.
 
@@ -41,16 +89,74 @@ class WebSocketService:
             Controller implementation for processing setpoint and sensor data
         actuator : ActuatorInterface
             Actuator implementation for applying controller updates
+        control_period_s : Optional[float]
+            If set, control steps run at this fixed period instead of per sensor message
+        coalesce_sensor : bool
+            If set, only the newest pending sensor reading is processed
+        watchdog : Optional[StreamWatchdog]
+            If set, supervises both streams and gates every control step
+        sensor_id : Optional[int]
+            Sensor whose readings and setpoints are received, defaults to `SENSOR_ID`
+        step_on_message : bool
+            If cleared, control steps are left to a scheduler outside the service
         """
         self.actuator = actuator
         self.controller = controller
+        self.watchdog = watchdog
+        self.sensor_id = config.SENSOR_ID if sensor_id is None else sensor_id
         self.sensor_reading: Optional[SensorReading] = None
         self.setpoint_ws: Optional[websocket.WebSocketApp] = None
         self.sensor_ws: Optional[websocket.WebSocketApp] = None
+        self.scheduler: Optional[ControlScheduler] = None
+        if control_period_s is not None and step_on_message:
+            self.scheduler = ControlScheduler(
+                controller=controller,
+                actuator=actuator,
+                reading_source=lambda: self.sensor_reading,
+                period_s=control_period_s,
+                watchdog=watchdog,
+            )
+        # Steps run on the receiving thread or the sensor worker
+        self._steps_on_message = step_on_message and self.scheduler is None
+        self.sensor_mailbox: Optional[LatestValueMailbox[SensorReading]] = None
+        if coalesce_sensor and self._steps_on_message:
+            self.sensor_mailbox = LatestValueMailbox()
+        self.setpoint_gaps = ConnectionGaps(
+            "setpoint", data_gap=False, stable_s=config.WS_RECONNECT_MAX_S
+        )
+        self.sensor_gaps = ConnectionGaps("sensor", data_gap=True, stable_s=config.WS_RECONNECT_MAX_S)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
 
     def start(self):
         """Start WebSocket connections in daemon threads"""
+        self._stop.clear()
         self._establish_connections()
+        if self.scheduler is not None:
+            self.scheduler.start()
+        if self.sensor_mailbox is not None:
+            worker = threading.Thread(target=self._run_sensor_worker, daemon=True)
+            worker.start()
+            self._threads.append(worker)
+
+    def stop(self):
+        """
+        Close both connections and drain the control steps in progress.
+
+        No further messages are received once the connections are closed; a step
+        already running, and with coalescing the pending reading, still completes.
+        """
+        self._stop.set()
+        for ws in (self.setpoint_ws, self.sensor_ws):
+            if ws is not None:
+                ws.close()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.sensor_mailbox is not None:
+            self.sensor_mailbox.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
 
     def _establish_connections(self):
         """Create and start WebSocket connection threads"""
@@ -62,76 +168,150 @@ class WebSocketService:
 
         setpoint_thread.start()
         sensor_thread.start()
+        self._threads += [setpoint_thread, sensor_thread]
 
     def _run_setpoint_ws(self):
         """Run setpoint WebSocket connection"""
-        while True:
-            try:
-                self.setpoint_ws = websocket.WebSocketApp(
-                    f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/setpoint/{config.SENSOR_ID}",
-                    on_message=self._on_setpoint_message,
-                    on_error=self._on_setpoint_error,
-                    on_close=self._on_setpoint_close,
-                    on_open=self._on_setpoint_open,
-                )
-                self.setpoint_ws.run_forever()
-            except Exception as e:
-                logger.error(f"Setpoint WS error: {e}")
-                threading.Event().wait(5)  # Wait before reconnecting
+        self._run_ws(
+            f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/setpoint/{self.sensor_id}",
+            "Setpoint",
+            self.setpoint_gaps,
+            _SETPOINT_RECONNECTS,
+            on_message=self._on_setpoint_message,
+            on_error=self._on_setpoint_error,
+            on_close=self._on_setpoint_close,
+            on_open=self._on_setpoint_open,
+        )
 
     def _run_sensor_ws(self):
         """Run sensor WebSocket connection"""
-        while True:
+        self._run_ws(
+            f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/{self.sensor_id}",
+            "Sensor",
+            self.sensor_gaps,
+            _SENSOR_RECONNECTS,
+            on_message=self._on_sensor_message,
+            on_error=self._on_sensor_error,
+            on_close=self._on_sensor_close,
+            on_open=self._on_sensor_open,
+        )
+
+    def _run_ws(self, url: str, name: str, gaps: ConnectionGaps, reconnects, **callbacks):
+        """
+        Keep a WebSocket connection open until the service stops.
+
+        Keepalive pings detect a dead peer within `WS_PING_INTERVAL_S` plus
+        `WS_PING_TIMEOUT_S`. A lost connection is retried immediately, further
+        attempts back off exponentially with jitter.
+        """
+        backoff = ReconnectBackoff(config.WS_RECONNECT_INITIAL_S, config.WS_RECONNECT_MAX_S)
+        first_attempt = True
+        while not self._stop.is_set():
+            if not first_attempt:
+                reconnects.inc()
+            first_attempt = False
             try:
-                self.sensor_ws = websocket.WebSocketApp(
-                    f"ws://{config.BACKEND_BASE}/v1/sensors/flowmeters/ws/{config.SENSOR_ID}",
-                    on_message=self._on_sensor_message,
-                    on_error=self._on_sensor_error,
-                    on_close=self._on_sensor_close,
-                    on_open=self._on_sensor_open,
+                ws = websocket.WebSocketApp(url, **callbacks)
+                setattr(self, f"{name.lower()}_ws", ws)
+                ws.run_forever(
+                    ping_interval=config.WS_PING_INTERVAL_S,
+                    ping_timeout=config.WS_PING_TIMEOUT_S if config.WS_PING_INTERVAL_S else None,
                 )
-                self.sensor_ws.run_forever()
             except Exception as e:
-                logger.error(f"Sensor WS error: {e}")
-                threading.Event().wait(5)  # Wait before reconnecting
+                logger.error(f"{name} WS error: {e}")
+            if gaps.lost():
+                backoff.reset()
+            delay = backoff.next_delay()
+            if delay and not self._stop.is_set():
+                logger.info(f"{name} WebSocket reconnecting in {delay:.2f}s")
+            self._stop.wait(delay)
 
     def _on_setpoint_message(self, _ws, message: str) -> None:
         """Handle setpoint messages"""
         logger.debug(f"Received setpoint message: {message}")
+        _SETPOINT_MESSAGES.inc()
+        self.setpoint_gaps.message(time.perf_counter())
         try:
             setpoint = json.loads(message)
+            if self.watchdog is not None:
+                self.watchdog.setpoint_received()
             self.controller.set_setpoint(setpoint)
 
-            if self.sensor_reading:
-                update = self.controller.calculate_update(self.sensor_reading)
-                if update is not None:
-                    self.actuator.update(update)
+            if not self.sensor_reading or not self._steps_on_message:
+                return
+            if self.sensor_mailbox is not None:
+                # Recompute on the worker unless a newer reading is already pending
+                self.sensor_mailbox.put(self.sensor_reading, overwrite=False)
+            else:
+                self._control_step(self.sensor_reading)
 
         except Exception as e:
+            _SETPOINT_ERRORS.inc()
             logger.error(f"Error processing setpoint message: {e}")
 
     def _on_sensor_message(self, _ws, message: str) -> None:
         """Handle sensor messages"""
-        logger.debug(f"Received sensor message: {message}")
+        logger.debug("Received sensor message: %s", message)
+        _SENSOR_MESSAGES.inc()
         try:
-            self.sensor_reading = SensorReading(**json.loads(message))
-            update = self.controller.calculate_update(self.sensor_reading)
-            if update is not None:
-                self.actuator.update(update)
+            started = time.perf_counter()
+            self.sensor_gaps.message(started)
+            value, timestamp_ns = parse_sensor_message(message)
+            parsed = time.perf_counter()
+            self.sensor_reading = SensorReading(value, timestamp_ns)
+            _PARSE_SECONDS.observe(parsed - started)
+            _READING_SECONDS.observe(time.perf_counter() - parsed)
+            if self.watchdog is not None:
+                self.watchdog.sensor_received()
+            if not self._steps_on_message:
+                return
+            if self.sensor_mailbox is not None:
+                self.sensor_mailbox.put(self.sensor_reading)
+            else:
+                self._control_step(self.sensor_reading)
         except Exception as e:
+            _SENSOR_ERRORS.inc()
             logger.error(f"Error processing sensor message: {e}")
 
+    def _run_sensor_worker(self):
+        """Process the newest sensor reading from the mailbox"""
+        while True:
+            reading = self.sensor_mailbox.get()
+            if reading is None:
+                return
+            try:
+                self._control_step(reading)
+            except Exception as e:
+                logger.error(f"Error processing sensor reading: {e}")
+
+    def _control_step(self, reading: SensorReading) -> None:
+        """Run a control step, gated by the watchdog if there is one"""
+        if self.watchdog is None:
+            self._apply_update(reading)
+        else:
+            self.watchdog.run_step(self._apply_update, reading)
+
+    def _apply_update(self, reading: SensorReading) -> None:
+        """Calculate a controller update and apply it to the actuator"""
+        update = self.controller.calculate_update(reading)
+        if update is not None:
+            self.actuator.update(update)
+
     # WebSocket event handlers
     def _on_setpoint_open(self, _ws):
+        self.setpoint_gaps.opened()
         logger.info("Setpoint WebSocket opened")
 
     def _on_sensor_open(self, _ws):
+        self.sensor_gaps.opened()
         logger.info("Sensor WebSocket opened")
 
     def _on_setpoint_error(self, _ws, error):
+        _SETPOINT_ERRORS.inc()
         logger.error(f"Setpoint WebSocket error: {error}")
 
     def _on_sensor_error(self, _ws, error):
+        _SENSOR_ERRORS.inc()
         logger.error(f"Sensor WebSocket error: {error}")
 
     def _on_setpoint_close(self, _ws, code, msg):
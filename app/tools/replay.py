@@ -0,0 +1,159 @@
+"""
+Offline replay of recorded sensor streams through the PID controller.
+
+The recording is a JSON lines file. Every line is either a sensor reading
+``{"value": float, "timestamp_ns": int}`` or a setpoint change
+``{"setpoint": float | null, "timestamp_ns": int}``. The controller runs on a
+simulated clock driven by the recorded timestamps, without WebSockets, InfluxDB
+or the backend, so a recording replays as fast as the CPU allows.
+
+Usage:
+    python -m app.tools.replay recording.jsonl --output result.csv
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.controllers.pid_controller import PIDController
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+Event = Tuple[int, Optional[float], Optional[float], bool]
+"""Recorded event as (timestamp_ns, value, setpoint, is_setpoint)."""
+
+COLUMNS = ("measurement", "setpoint", "P", "I", "D", "output")
+
+
+@dataclass
+class ReplayResult:
+    """
+    Time series produced by a replay plus throughput figures.
+
+    Attributes
+    ----------
+    timestamps_ns : np.ndarray
+        Timestamp of every sensor reading
+    series : np.ndarray
+        One row per sensor reading, columns as in `COLUMNS`. The output is NaN
+        for readings that did not produce an actuator command.
+    steps : int
+        Number of controller steps executed
+    elapsed_s : float
+        Wall time spent stepping the controller
+    """
+
+    timestamps_ns: np.ndarray
+    series: np.ndarray
+    steps: int
+    elapsed_s: float
+
+    @property
+    def steps_per_s(self) -> float:
+        """Controller steps per second of wall time"""
+        return self.steps / self.elapsed_s if self.elapsed_s else float("inf")
+
+    def save_csv(self, path: str) -> None:
+        """Write the time series to a CSV file with a header row"""
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(",".join(("timestamp_ns",) + COLUMNS) + "\n")
+            for timestamp_ns, row in zip(self.timestamps_ns, self.series):
+                file.write(f"{timestamp_ns}," + ",".join(f"{v:.9g}" for v in row) + "\n")
+
+
+def load_recording(lines: Iterable[str]) -> List[Event]:
+    """Parse a JSON lines recording into replay events, skipping empty lines."""
+    events: List[Event] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if "setpoint" in record:
+            events.append((int(record["timestamp_ns"]), None, record["setpoint"], True))
+        else:
+            events.append((int(record["timestamp_ns"]), float(record["value"]), None, False))
+    return events
+
+
+def replay(
+    events: List[Event], tunings: Optional[Tuple[float, float, float]] = None
+) -> ReplayResult:
+    """
+    Run recorded events through a fresh `PIDController` on a simulated clock.
+
+    Parameters
+    ----------
+    events : List[Event]
+        Recorded events in chronological order
+    tunings : Optional[Tuple[float, float, float]]
+        Kp, Ki and Kd overriding the configured gains
+
+    Returns
+    -------
+    ReplayResult
+        Time series of PID components and actuator commands
+    """
+    now_s = 0.0
+    controller = PIDController(time_fn=lambda: now_s, telemetry=None)
+    if tunings is not None:
+        controller.pid.tunings = tunings
+    pid = controller.pid
+
+    readings = sum(1 for event in events if not event[3])
+    timestamps_ns = np.zeros(readings, dtype=np.int64)
+    series = np.full((readings, len(COLUMNS)), np.nan)
+    row = 0
+
+    started = time.perf_counter()
+    for timestamp_ns, value, setpoint, is_setpoint in events:
+        now_s = timestamp_ns / 1e9
+        if is_setpoint:
+            controller.set_setpoint(setpoint)
+            continue
+
+        update = controller.calculate_update(SensorReading(value, timestamp_ns))
+        p, i, d = pid.components
+        timestamps_ns[row] = timestamp_ns
+        series[row, :5] = (value, pid.setpoint, p, i, d)
+        if update is not None:
+            series[row, 5] = update
+        row += 1
+    elapsed_s = time.perf_counter() - started
+
+    return ReplayResult(
+        timestamps_ns=timestamps_ns, series=series, steps=row, elapsed_s=elapsed_s
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", help="JSON lines recording to replay")
+    parser.add_argument("--output", help="CSV file receiving the time series")
+    parser.add_argument(
+        "--tunings",
+        nargs=3,
+        type=float,
+        metavar=("KP", "KI", "KD"),
+        help="Gains overriding the configured PID constants",
+    )
+    args = parser.parse_args()
+
+    with open(args.recording, "r", encoding="utf-8") as file:
+        events = load_recording(file)
+
+    result = replay(events, tunings=tuple(args.tunings) if args.tunings else None)
+    if args.output:
+        result.save_csv(args.output)
+
+    print(
+        f"{result.steps} steps in {result.elapsed_s:.3f} s "
+        f"({result.steps_per_s:,.0f} steps/s, "
+        f"{result.elapsed_s / max(result.steps, 1) * 1e6:.2f} us/step)"
+    )
+
+
+if __name__ == "__main__":
+    main()
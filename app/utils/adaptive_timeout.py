@@ -0,0 +1,75 @@
+from collections import deque
+from typing import Deque, Dict
+
+
+class AdaptiveTimeout:
+    """
+    Request timeout derived from recently observed latencies.
+
+    The timeout is `multiplier` times the `percentile` of the last `window`
+    successful request durations, bounded by `min_s` and `max_s`. It is
+    recomputed every `update_every` observations, so reading it is free. A
+    timed-out request says nothing about how long it would have taken, so it
+    doubles the timeout instead, letting the timeout follow a backend that
+    became slower.
+
+    Parameters
+    ----------
+    initial_s : float
+        Timeout used until enough latencies were observed
+    min_s : float
+        Lower bound of the timeout
+    max_s : float
+        Upper bound of the timeout
+    percentile : float
+        Latency percentile the timeout is based on, between 0 and 1
+    multiplier : float
+        Factor applied to the latency percentile
+    window : int
+        Number of recent latencies considered
+    update_every : int
+        Observations between recomputations of the timeout
+    """
+
+    def __init__(
+        self,
+        initial_s: float,
+        min_s: float,
+        max_s: float,
+        percentile: float = 0.99,
+        multiplier: float = 3.0,
+        window: int = 256,
+        update_every: int = 32,
+    ):
+        self.min_s = min_s
+        self.max_s = max_s
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.update_every = update_every
+
+        self.current_s = min(max(initial_s, min_s), max_s)
+        self.timeouts = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._since_update = 0
+
+    def observe(self, latency_s: float) -> None:
+        """Record the duration of a successful request"""
+        self._latencies.append(latency_s)
+        self._since_update += 1
+        if self._since_update >= self.update_every:
+            self._update()
+
+    def observe_timeout(self) -> None:
+        """Record a request that timed out"""
+        self.timeouts += 1
+        self.current_s = min(self.current_s * 2, self.max_s)
+
+    def _update(self) -> None:
+        self._since_update = 0
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self.percentile), len(ordered) - 1)
+        self.current_s = min(max(ordered[index] * self.multiplier, self.min_s), self.max_s)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current timeout and the number of timed-out requests."""
+        return {"timeout_s": self.current_s, "timeouts": self.timeouts}
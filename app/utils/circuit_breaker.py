@@ -0,0 +1,96 @@
+import threading
+import time
+from typing import Callable, Dict, Literal
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+_STATE_CODES = {"closed": 0, "open": 1, "half_open": 2}
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around calls to an unreliable dependency.
+
+    The breaker starts closed and lets every call through. After
+    `failure_threshold` consecutive failures it opens, and calls are rejected
+    without touching the dependency. Once `reset_timeout_s` passed, the breaker
+    is half-open: a single probe call is let through, closing the breaker on
+    success and opening it again on failure.
+
+    Callers ask `allow()` before a call and report the outcome with
+    `record_success()` or `record_failure()`.
+
+    Parameters
+    ----------
+    failure_threshold : int
+        Consecutive failures that open the breaker
+    reset_timeout_s : float
+        Time the breaker stays open before a probe call is allowed
+    time_fn : Callable[[], float]
+        Clock returning seconds
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 5.0,
+        time_fn: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.time_fn = time_fn
+
+        self.state: BreakerState = "closed"
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be made now, counting rejected calls"""
+        if self.state == "closed":
+            return True
+        with self._lock:
+            if self.state == "open" and self.time_fn() - self._opened_at >= self.reset_timeout_s:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            if self.state == "closed":
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Report a successful call, closing the breaker"""
+        if self.state == "closed" and not self.consecutive_failures:
+            return
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Report a failed call, opening the breaker at the threshold or after a failed probe"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or (
+                self.state == "closed" and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self.opened += 1
+                self._opened_at = self.time_fn()
+                self._probing = False
+
+    def stats(self) -> Dict[str, float]:
+        """Return the state as a number (0 closed, 1 open, 2 half-open) and the counters."""
+        return {
+            "state": _STATE_CODES[self.state],
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -1,7 +1,10 @@
-from pydantic import Field, HttpUrl
+from functools import lru_cache
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import Field, HttpUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from app.utils.logger import logger
+from app.utils.logger import configure_logging, logger
 
 
 def read_version():
@@ -14,11 +17,77 @@ class Config(BaseSettings):
     """Holds configuration settings for the project."""
 
     BACKEND_BASE: str
+    BACKEND_MAX_CONNECTIONS: int = Field(
+        default=4, gt=0, description="Maximum number of pooled backend connections"
+    )
+    BACKEND_KEEPALIVE_EXPIRY_S: float = Field(
+        default=300.0, gt=0, description="Idle time after which pooled connections close"
+    )
+    BACKEND_HTTP2: bool = Field(
+        default=False, description="Use HTTP/2 for backend requests, requires h2"
+    )
+    BACKEND_WARMUP: bool = Field(
+        default=True, description="Open the backend connection at startup"
+    )
+    ACTUATOR_TIMEOUT_S: float = Field(
+        default=0.5, gt=0, description="Timeout of actuator requests, the upper bound if adaptive"
+    )
+    ACTUATOR_ADAPTIVE_TIMEOUT: bool = Field(
+        default=True, description="Derive the actuator request timeout from observed latencies"
+    )
+    ACTUATOR_TIMEOUT_MIN_S: float = Field(
+        default=0.05, gt=0, description="Lower bound of the adaptive actuator timeout"
+    )
+    ACTUATOR_BREAKER_THRESHOLD: int = Field(
+        default=3, ge=0, description="Consecutive failed actuator writes that open the breaker, 0 to disable"
+    )
+    ACTUATOR_BREAKER_RESET_S: float = Field(
+        default=1.0, gt=0, description="Time before an open actuator breaker lets a write through"
+    )
+    ACTUATOR_CHANNEL: Literal["http", "websocket"] = Field(
+        default="http",
+        description="Send valve states per HTTP request or over a persistent WebSocket",
+    )
     DEBUG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = Field(
+        default="text", description="Console log format, colored text or JSON lines"
+    )
+    LOG_DEBUG_SAMPLING: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Only emit every n-th DEBUG record, keyed by logger name",
+    )
     INFLUXDB_BUCKET: str
     INFLUXDB_ORG: str
     INFLUXDB_TOKEN: str
     INFLUXDB_URL: HttpUrl
+    INFLUXDB_BATCH_SIZE: int = Field(
+        default=500, gt=0, description="Maximum number of points per InfluxDB write"
+    )
+    INFLUXDB_FLUSH_INTERVAL_S: float = Field(
+        default=1.0, gt=0, description="Maximum time a point waits before being written"
+    )
+    INFLUXDB_QUEUE_SIZE: int = Field(
+        default=10_000, gt=0, description="Maximum number of points waiting to be written"
+    )
+    INFLUXDB_DROP_POLICY: Literal["oldest", "newest"] = Field(
+        default="oldest", description="Which point to drop when the queue is full"
+    )
+    INFLUXDB_GZIP: bool = Field(default=True, description="Compress InfluxDB writes")
+    INFLUXDB_BREAKER_THRESHOLD: int = Field(
+        default=3, ge=1, description="Consecutive failed writes that stop writing to InfluxDB"
+    )
+    INFLUXDB_BREAKER_RESET_S: float = Field(
+        default=5.0, gt=0, description="Time before writing to InfluxDB is tried again"
+    )
+    INFLUXDB_SPOOL_PATH: Optional[str] = Field(
+        default=None, description="File spooling points while InfluxDB is down, unset to drop them"
+    )
+    INFLUXDB_SPOOL_MAX_BYTES: int = Field(
+        default=256 * 1024 * 1024, gt=0, description="Size of the spool file"
+    )
+    INFLUXDB_REPLAY_CHUNK_BYTES: int = Field(
+        default=4 * 1024 * 1024, gt=0, description="Maximum size of a spool replay request"
+    )
     PROJECT_NAME: str = "swncrew pid controller"
     PROPORTIONAL_VALVE_ID: int = Field(
         default=0, ge=0, description="The proportional valve to control"
@@ -26,7 +95,7 @@ class Config(BaseSettings):
     SENSOR_ID: int = Field(
         default=0, ge=0, description="The sensor reading the parameter to control"
     )
-    VERSION: str = read_version()
+    VERSION: str = Field(default_factory=read_version)
 
     # PID Controller constants
     PID_KP: float
@@ -34,13 +103,189 @@ class Config(BaseSettings):
     PID_KD: float
     PID_OUTPUT_MIN: float
     PID_OUTPUT_MAX: float
+    PID_HISTORY_SIZE: int = Field(
+        default=36_000, ge=0, description="Number of recent controller steps kept in memory"
+    )
+    PID_HISTORY_PATH: Optional[str] = Field(
+        default="/tmp/pid_history_{SENSOR_ID}.bin",
+        description="File sharing the controller step history with the other workers, "
+        "empty to keep it in process memory",
+    )
+    PID_TIME_BASE: Literal["monotonic", "sensor"] = Field(
+        default="monotonic",
+        description="Derive the PID time step from the host clock or from sensor timestamps",
+    )
+    PID_STATE_PATH: Optional[str] = Field(
+        default=None, description="File persisting the controller state across restarts"
+    )
+    PID_STATE_INTERVAL_S: float = Field(
+        default=0.1, ge=0, description="Minimum time between controller state snapshots"
+    )
+    PID_STATE_MAX_AGE_S: float = Field(
+        default=30.0, ge=0, description="Maximum age of a controller state restored at startup"
+    )
+    PID_ENGINE: Literal["simple_pid", "vectorized"] = Field(
+        default="simple_pid",
+        description="Run a single loop with simple_pid or all CONTROL_LOOPS in batched NumPy steps",
+    )
+    CONTROL_LOOPS: Dict[int, int] = Field(
+        default_factory=dict,
+        description="Sensor ids mapped to the valve ids they control with PID_ENGINE=vectorized, "
+        "empty for SENSOR_ID and PROPORTIONAL_VALVE_ID only",
+    )
+
+    # Control scheduling
+    WS_SERVICE_MODE: Literal["thread", "asyncio"] = Field(
+        default="thread",
+        description="Run the WebSocket service in threads or in the event loop",
+    )
+    CONTROL_PERIOD_S: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Fixed control period, unset to run a step per sensor message; "
+        "ticks without a new reading are skipped",
+    )
+    WS_PING_INTERVAL_S: float = Field(
+        default=5.0, ge=0, description="Interval of WebSocket keepalive pings, 0 to disable"
+    )
+    WS_PING_TIMEOUT_S: float = Field(
+        default=2.0, gt=0, description="Time to wait for a pong before dropping the connection"
+    )
+    WS_RECONNECT_INITIAL_S: float = Field(
+        default=0.1, gt=0, description="Delay before the second WebSocket reconnect attempt"
+    )
+    WS_RECONNECT_MAX_S: float = Field(
+        default=5.0, gt=0, description="Maximum delay between WebSocket reconnect attempts"
+    )
+    CONTROL_LOCK_PATH: str = Field(
+        default="/tmp/pid_control_{SENSOR_ID}.lock",
+        description="Lock file electing the single worker that runs the control loop",
+    )
+    CONTROL_STATUS_PATH: str = Field(
+        default="/tmp/pid_control_{SENSOR_ID}.status",
+        description="File the control loop status is published to for the other workers",
+    )
+    CONTROL_STATUS_INTERVAL_S: float = Field(
+        default=1.0, gt=0, description="Time between published control loop statuses"
+    )
+    SHUTDOWN_TIMEOUT_S: float = Field(
+        default=10.0, gt=0, description="Maximum time to drain and stop the services"
+    )
+    CONTROL_ACTOR: bool = Field(
+        default=True,
+        description="Serialize all controller calls on a single actor thread",
+    )
+    SENSOR_COALESCING: bool = Field(
+        default=False,
+        description="Only process the newest pending sensor reading under load",
+    )
+    ACTUATOR_NONBLOCKING: bool = Field(
+        default=False,
+        description="Write actuator updates from a background thread, newest value wins",
+    )
+
+    # Stream supervision
+    SENSOR_MAX_AGE_S: Optional[float] = Field(
+        default=None, gt=0, description="Skip control steps on readings older than this"
+    )
+    SENSOR_TIMEOUT_S: Optional[float] = Field(
+        default=None, gt=0, description="Fail safe when no sensor reading arrives for this long"
+    )
+    SETPOINT_TIMEOUT_S: Optional[float] = Field(
+        default=None, gt=0, description="Fail safe when no setpoint arrives for this long"
+    )
+    ACTUATOR_SAFE_STATE: Optional[float] = Field(
+        default=None, description="Actuator state written on a watchdog timeout"
+    )
+    ACTUATOR_SAFE_STATE_RETRY_S: float = Field(
+        default=1.0, gt=0, description="Delay before a failed safe state write is retried"
+    )
+
+    # Actuator output filtering
+    ACTUATOR_DEADBAND_ABS: float = Field(
+        default=0.0, ge=0, description="Absolute change below which writes are skipped"
+    )
+    ACTUATOR_DEADBAND_REL: float = Field(
+        default=0.0, ge=0, description="Relative change below which writes are skipped"
+    )
+    ACTUATOR_QUANTUM: Optional[float] = Field(
+        default=None, gt=0, description="Actuator resolution outputs are rounded to"
+    )
+    ACTUATOR_HEARTBEAT_S: Optional[float] = Field(
+        default=None, gt=0, description="Resend an unchanged output after this period"
+    )
 
     model_config = SettingsConfigDict(env_file=".env.local")
 
+    @model_validator(mode="after")
+    def _check_service_mode(self) -> "Config":
+        if self.WS_SERVICE_MODE != "asyncio":
+            return self
+        thread_only = {
+            "SENSOR_TIMEOUT_S": self.SENSOR_TIMEOUT_S is not None,
+            "SETPOINT_TIMEOUT_S": self.SETPOINT_TIMEOUT_S is not None,
+            "SENSOR_MAX_AGE_S": self.SENSOR_MAX_AGE_S is not None,
+            "CONTROL_PERIOD_S": self.CONTROL_PERIOD_S is not None,
+            "SENSOR_COALESCING": self.SENSOR_COALESCING,
+            "ACTUATOR_NONBLOCKING": self.ACTUATOR_NONBLOCKING,
+            "ACTUATOR_CHANNEL": self.ACTUATOR_CHANNEL != "http",
+            # On by default, only rejected when configured explicitly
+            "CONTROL_ACTOR": "CONTROL_ACTOR" in self.model_fields_set,
+        }
+        unsupported = [name for name, is_set in thread_only.items() if is_set]
+        if unsupported:
+            raise ValueError(
+                f"{', '.join(unsupported)} only apply to WS_SERVICE_MODE=thread, "
+                "unset them or switch to the thread-based service"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def _check_pid_engine(self) -> "Config":
+        if self.PID_ENGINE != "vectorized":
+            if self.CONTROL_LOOPS:
+                raise ValueError("CONTROL_LOOPS only apply to PID_ENGINE=vectorized")
+            return self
+        if self.WS_SERVICE_MODE != "thread" or self.CONTROL_PERIOD_S is None:
+            raise ValueError(
+                "PID_ENGINE=vectorized steps all loops at CONTROL_PERIOD_S, "
+                "set it and use WS_SERVICE_MODE=thread"
+            )
+        if self.PID_STATE_PATH:
+            raise ValueError("PID_STATE_PATH only applies to PID_ENGINE=simple_pid")
+        return self
+
+    @model_validator(mode="after")
+    def _check_ping_timeout(self) -> "Config":
+        if self.WS_PING_INTERVAL_S and self.WS_PING_TIMEOUT_S >= self.WS_PING_INTERVAL_S:
+            raise ValueError("WS_PING_TIMEOUT_S must be shorter than WS_PING_INTERVAL_S")
+        return self
+
+
+@lru_cache(maxsize=None)
+def get_config() -> Config:
+    """Load the configuration once and apply its logging settings."""
+    loaded = Config()
+    configure_logging(loaded.DEBUG_LEVEL, loaded.LOG_FORMAT, loaded.LOG_DEBUG_SAMPLING)
+    logger.info(
+        "Start project with current configuration \n %s", loaded.model_dump_json(indent=2)
+    )
+    return loaded
+
+
+class LazyConfig:
+    """
+    Stand-in for the configuration that loads it on first attribute access.
+
+    Importing `config` is free; the environment is only read once a setting is
+    used. Settings are cached on the instance, so later reads are plain
+    attribute lookups.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(get_config(), name)
+        setattr(self, name, value)
+        return value
 
-config = Config()
 
-logger.setLevel(config.DEBUG_LEVEL.upper())
-logger.info(
-    "Start project with current configuration \n %s", config.model_dump_json(indent=2)
-)
+config: Config = LazyConfig()  # type: ignore[assignment]
@@ -0,0 +1,79 @@
+import time
+from typing import Dict, Optional
+
+from app.utils.metrics import WS_DATA_GAP_SECONDS, WS_DOWNTIME_SECONDS
+
+
+class ConnectionGaps:
+    """
+    Measures how long reconnects interrupt a WebSocket stream.
+
+    Per reconnect, the downtime runs from noticing the lost connection to
+    reopening it. With `data_gap`, the time between the last message before
+    and the first message after the reconnect is recorded too, which includes
+    the time it took to notice the loss; it is only meaningful for streams that
+    deliver messages continuously. All times are `time.perf_counter` seconds.
+
+    Parameters
+    ----------
+    websocket : str
+        Label of the WebSocket in the metrics
+    data_gap : bool
+        Whether to record the data gap
+    stable_s : float
+        Connections open at least this long count as healthy even without messages
+    """
+
+    def __init__(self, websocket: str, data_gap: bool, stable_s: float):
+        self.stable_s = stable_s
+        self.last_message: Optional[float] = None
+        self.reconnects = 0
+        self.downtime_s = 0.0
+
+        self._downtime = WS_DOWNTIME_SECONDS.labels(websocket=websocket)
+        self._data_gap = WS_DATA_GAP_SECONDS.labels(websocket=websocket) if data_gap else None
+        self._opened_at: Optional[float] = None
+        self._lost_at: Optional[float] = None
+        self._gap_since: Optional[float] = None
+
+    def opened(self) -> None:
+        """Record that the connection was opened"""
+        now = time.perf_counter()
+        self._opened_at = now
+        if self._lost_at is not None:
+            downtime = now - self._lost_at
+            self._downtime.observe(downtime)
+            self.downtime_s += downtime
+            self.reconnects += 1
+            self._lost_at = None
+
+    def lost(self) -> bool:
+        """
+        Record that the open connection was lost.
+
+        Returns
+        -------
+        bool
+            Whether the connection was healthy, i.e. delivered messages or stayed
+            open for `stable_s`, so reconnect attempts may start over
+        """
+        now = time.perf_counter()
+        opened_at, self._opened_at = self._opened_at, None
+        if opened_at is None:
+            return False
+        self._lost_at = now
+        if self._data_gap is not None and self._gap_since is None:
+            self._gap_since = self.last_message if self.last_message is not None else now
+        received = self.last_message is not None and self.last_message >= opened_at
+        return received or now - opened_at >= self.stable_s
+
+    def message(self, now: float) -> None:
+        """Record a message received at `now`"""
+        self.last_message = now
+        if self._gap_since is not None:
+            self._data_gap.observe(now - self._gap_since)
+            self._gap_since = None
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of reconnects and the total downtime."""
+        return {"reconnects": self.reconnects, "downtime_s": self.downtime_s}
@@ -0,0 +1,54 @@
+import fcntl
+import os
+from typing import Optional
+
+
+class ControlLock:
+    """
+    Exclusive, non-blocking lock on a file electing the process that runs a control loop.
+
+    The lock is an advisory `flock`, held for as long as the file stays open, so the
+    operating system releases it when the owning process exits for any reason and a
+    restarted process can take over. The lock file holds the PID of the owner for
+    diagnosis.
+
+    Parameters
+    ----------
+    path : str
+        Lock file, created if it does not exist
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def owned(self) -> bool:
+        """Whether this process holds the lock"""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other process holds it, True if it is held now"""
+        if self._fd is not None:
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Give up the lock so another process can take over"""
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
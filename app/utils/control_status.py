@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.logger import logger
+
+
+class ControlStatusFile:
+    """
+    Status of the control loop, published by its owner for the other workers.
+
+    The owning worker periodically writes the statistics, actuator breaker state,
+    controller snapshot and rendered metrics of the control loop as JSON. Each
+    status is written to a temporary file and renamed over the previous one, so
+    readers always load a complete status without any locking.
+
+    Parameters
+    ----------
+    path : str
+        Status file, its directory is created if it does not exist
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.published = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def publish(self, status: Dict[str, Any]) -> None:
+        """Replace the published status, stamped with the current wall clock"""
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            # Statistics may hold numpy scalars
+            json.dump({"published_ns": time.time_ns(), **status}, f, default=float)
+        os.replace(temporary, self.path)
+        self.published += 1
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the published status, None if there is none yet"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class ControlStatusPublisher:
+    """
+    Thread publishing the control loop status every `interval_s` seconds.
+
+    Parameters
+    ----------
+    status_file : ControlStatusFile
+        File the status is published to
+    collect : Callable[[], Dict[str, Any]]
+        Returns the current status, called on the publisher thread
+    interval_s : float
+        Time between two published statuses
+    """
+
+    def __init__(
+        self,
+        status_file: ControlStatusFile,
+        collect: Callable[[], Dict[str, Any]],
+        interval_s: float,
+    ):
+        self.status_file = status_file
+        self.collect = collect
+        self.interval_s = interval_s
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the publisher thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the publisher thread after publishing the final status"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._publish()
+
+    def _run(self) -> None:
+        self._publish()
+        while not self._stop.wait(self.interval_s):
+            self._publish()
+
+    def _publish(self) -> None:
+        try:
+            self.status_file.publish(self.collect())
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Error publishing the control loop status: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """Return the published status and failure counters."""
+        return {"published": self.status_file.published, "failures": self.failures}
@@ -0,0 +1,141 @@
+import math
+import mmap
+import os
+import struct
+import time
+from typing import Dict, NamedTuple, Optional
+
+# Magic and sequence number, the sequence is odd while a snapshot is being written
+_HEADER = struct.Struct("<4sQ")
+# Wall clock of the save, sensor timestamp, measurement, setpoint, P, I, D, output,
+# Kp, Ki, Kd, auto mode and whether a setpoint is set
+_RECORD = struct.Struct("<qqddddddddd??")
+_MAGIC = b"PID1"
+_SIZE = _HEADER.size + _RECORD.size
+_NONE = float("nan")
+
+
+class ControllerState(NamedTuple):
+    """Controller state as stored in the state file"""
+
+    saved_ns: int
+    timestamp_ns: Optional[int]
+    measurement: Optional[float]
+    setpoint: float
+    P: float
+    I: float
+    D: float
+    output: Optional[float]
+    Kp: float
+    Ki: float
+    Kd: float
+    auto_mode: bool
+    enabled: bool
+
+    @property
+    def age_s(self) -> float:
+        """Seconds since the state was saved"""
+        return (time.time_ns() - self.saved_ns) / 1e9
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class ControllerStateFile:
+    """
+    Controller state snapshots in a small memory-mapped file.
+
+    A snapshot is a single fixed-size record written in place, so saving it is a
+    memory copy without a system call; the operating system writes the page back
+    in the background and it survives a restart of the process. A sequence number
+    around the record lets readers, including other processes mapping the same
+    file, detect and retry a snapshot that was being written, and lets a process
+    restarted after a crash mid-write ignore it.
+
+    Saving is meant for a single writer.
+
+    Parameters
+    ----------
+    path : str
+        State file, created if it does not exist
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.saves = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a+b")
+        if os.path.getsize(path) < _SIZE:
+            self._file.truncate(_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), _SIZE)
+
+        magic, self._sequence = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._sequence = 0
+            _HEADER.pack_into(self._map, 0, _MAGIC, self._sequence)
+
+    def save(self, state: ControllerState) -> None:
+        """Overwrite the stored snapshot"""
+        # Round up past a snapshot left incomplete by a previous process
+        self._sequence += self._sequence % 2
+        _HEADER.pack_into(self._map, 0, _MAGIC, self._sequence + 1)
+        _RECORD.pack_into(
+            self._map,
+            _HEADER.size,
+            state.saved_ns,
+            -1 if state.timestamp_ns is None else state.timestamp_ns,
+            _NONE if state.measurement is None else state.measurement,
+            state.setpoint,
+            state.P,
+            state.I,
+            state.D,
+            _NONE if state.output is None else state.output,
+            state.Kp,
+            state.Ki,
+            state.Kd,
+            state.auto_mode,
+            state.enabled,
+        )
+        self._sequence += 2
+        _HEADER.pack_into(self._map, 0, _MAGIC, self._sequence)
+        self.saves += 1
+
+    def load(self, retries: int = 100) -> Optional[ControllerState]:
+        """Return the stored snapshot, None if there is none or it is incomplete"""
+        for _ in range(retries):
+            magic, before = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or before == 0:
+                return None
+            record = _RECORD.unpack_from(self._map, _HEADER.size)
+            _, after = _HEADER.unpack_from(self._map, 0)
+            if before == after and before % 2 == 0:
+                break
+        else:
+            # Still being written, or left incomplete by a writer that stopped mid-write
+            return None
+        saved_ns, timestamp_ns, measurement, setpoint, p, i, d, output, *rest = record
+        return ControllerState(
+            saved_ns,
+            None if timestamp_ns < 0 else timestamp_ns,
+            _optional(measurement),
+            setpoint,
+            p,
+            i,
+            d,
+            _optional(output),
+            *rest,
+        )
+
+    def close(self) -> None:
+        """Write the snapshot back to disk and close the file"""
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of saved snapshots."""
+        return {"saves": self.saves}
@@ -0,0 +1,102 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.utils.logger import logger
+
+
+class DeadlineTimer:
+    """
+    Single thread tracking any number of named deadlines.
+
+    Re-arming a deadline, which happens on every received message, only stores
+    the new expiry time. The heap holds at most one entry per name; when an entry
+    comes due, the thread checks the stored expiry and pushes the entry back if
+    the deadline was extended meanwhile. Deadlines therefore cost no thread or
+    polling loop of their own and re-arming never has to wake the timer thread.
+
+    Callbacks run in the timer thread and must not block for long.
+    """
+
+    def __init__(self):
+        self.fired = 0
+        self._deadlines: Dict[Hashable, Tuple[float, Callable[[], None]]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = 0
+        self._condition = threading.Condition(threading.Lock())
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the timer thread"""
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the timer thread without firing pending deadlines"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def arm(self, name: Hashable, timeout_s: float, callback: Callable[[], None]) -> None:
+        """Call `callback` once `timeout_s` passed without the deadline being armed again"""
+        expiry = time.monotonic() + timeout_s
+        with self._condition:
+            previous = self._deadlines.get(name)
+            self._deadlines[name] = (expiry, callback)
+            # Extending a deadline reuses its heap entry, only an earlier one needs a new entry
+            if previous is None or expiry < previous[0]:
+                self._push(expiry, name)
+
+    def cancel(self, name: Hashable) -> None:
+        """Forget a deadline, its heap entry is discarded when it comes due"""
+        with self._condition:
+            self._deadlines.pop(name, None)
+
+    def _push(self, expiry: float, name: Hashable) -> None:
+        self._counter += 1
+        earliest = not self._heap or expiry < self._heap[0][0]
+        heapq.heappush(self._heap, (expiry, self._counter, name))
+        if earliest:
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                due = self._wait_for_due()
+                if due is None:
+                    return
+            self.fired += 1
+            try:
+                due()
+            except Exception as e:
+                logger.error(f"Error in deadline callback: {e}")
+
+    def _wait_for_due(self) -> Optional[Callable[[], None]]:
+        """Block until a deadline expires and return its callback, None when stopped"""
+        while not self._stopped:
+            if not self._heap:
+                self._condition.wait()
+                continue
+            wake_at, _, name = self._heap[0]
+            now = time.monotonic()
+            if wake_at > now:
+                self._condition.wait(wake_at - now)
+                continue
+            heapq.heappop(self._heap)
+            entry = self._deadlines.get(name)
+            if entry is None:
+                continue
+            expiry, callback = entry
+            if expiry > now:
+                # Re-armed since this entry was pushed
+                self._push(expiry, name)
+                continue
+            del self._deadlines[name]
+            return callback
+        return None
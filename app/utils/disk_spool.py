@@ -0,0 +1,112 @@
+import mmap
+import os
+import struct
+from typing import Dict, Iterable
+
+# Read and write offsets of the spooled data, stored at the start of the file
+_HEADER = struct.Struct("<QQ")
+
+
+class DiskSpool:
+    """
+    Append-only, size-capped spool of line protocol records in a memory-mapped file.
+
+    Records are newline terminated lines, so spooled data can be handed to
+    InfluxDB in large chunks without re-encoding. The file has a fixed size;
+    its header stores the offsets of the unread data, so a restarted process
+    resumes where the previous one stopped. Appends and reads are plain memory
+    copies; the operating system writes the pages back in the background.
+
+    The spool is not thread-safe and is meant to be used by a single writer thread.
+
+    Parameters
+    ----------
+    path : str
+        Spool file, created if it does not exist
+    max_bytes : int
+        Size of the spool file, records that do not fit are dropped
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max(max_bytes, _HEADER.size + 1)
+
+        self.appended = 0
+        self.dropped = 0
+        self.replayed_bytes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a+b")
+        if os.path.getsize(path) < self.max_bytes:
+            self._file.truncate(self.max_bytes)
+        self._map = mmap.mmap(self._file.fileno(), self.max_bytes)
+
+        self._read, self._write = _HEADER.unpack_from(self._map, 0)
+        if not _HEADER.size <= self._read <= self._write <= self.max_bytes:
+            self._read = self._write = _HEADER.size
+            self._store_offsets()
+
+    @property
+    def pending_bytes(self) -> int:
+        """Size of the spooled data not replayed yet"""
+        return self._write - self._read
+
+    def append(self, lines: Iterable[bytes]) -> bool:
+        """Spool newline terminated records, False if they do not fit and were dropped"""
+        data = b"".join(lines)
+        if self._write + len(data) > self.max_bytes:
+            self._compact()
+            if self._write + len(data) > self.max_bytes:
+                self.dropped += data.count(b"\n")
+                return False
+        self._map[self._write:self._write + len(data)] = data
+        self._write += len(data)
+        self._store_offsets()
+        self.appended += data.count(b"\n")
+        return True
+
+    def peek(self, max_bytes: int) -> bytes:
+        """Return the oldest complete records up to `max_bytes`, at least one record"""
+        end = min(self._read + max_bytes, self._write)
+        if end < self._write:
+            cut = self._map.rfind(b"\n", self._read, end)
+            end = cut + 1 if cut >= 0 else self._map.find(b"\n", end, self._write) + 1
+        return self._map[self._read:end]
+
+    def consume(self, size: int) -> None:
+        """Discard `size` bytes of replayed records"""
+        self._read = min(self._read + size, self._write)
+        self.replayed_bytes += size
+        if self._read == self._write:
+            self._read = self._write = _HEADER.size
+        self._store_offsets()
+
+    def _compact(self) -> None:
+        """Move the unread records to the start of the file"""
+        if self._read == _HEADER.size:
+            return
+        pending = self.pending_bytes
+        self._map.move(_HEADER.size, self._read, pending)
+        self._read = _HEADER.size
+        self._write = _HEADER.size + pending
+        self._store_offsets()
+
+    def _store_offsets(self) -> None:
+        _HEADER.pack_into(self._map, 0, self._read, self._write)
+
+    def close(self) -> None:
+        """Write the spool back to disk and close the file"""
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Return spooled and dropped record counters and the pending size."""
+        return {
+            "pending_bytes": self.pending_bytes,
+            "appended": self.appended,
+            "dropped": self.dropped,
+            "replayed_bytes": self.replayed_bytes,
+        }
@@ -0,0 +1,161 @@
+import importlib.util
+import time
+from typing import Any, Dict
+
+import httpx
+
+from app.swncrew_backend_client import Client
+from app.swncrew_backend_client.api.default import root_get
+from app.utils.config import config
+from app.utils.logger import logger
+from app.utils.stats import RunningStats
+
+
+class ConnectionStats:
+    """
+    Counts requests and newly opened connections of the backend client.
+
+    Every request carries an httpcore trace callback, so connection setup is
+    observed without wrapping the transport. Requests that did not open a
+    connection reused one from the pool. Connections opened after the first one
+    either grew the pool for concurrent requests or replaced a connection that
+    expired or was closed; closes are not traced, so the two are not told apart.
+
+    Attributes
+    ----------
+    requests : int
+        Number of requests sent
+    connections : int
+        Number of TCP connections opened
+    connect_failures : int
+        Number of failed connection attempts
+    connect_time : RunningStats
+        Duration of successful connection setups in seconds
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.connect_failures = 0
+        self.connect_time = RunningStats()
+        self._connect_started = 0.0
+
+    def trace(self, event: str, _info: Dict[str, Any]) -> None:
+        """httpcore trace callback"""
+        if event.endswith(".send_request_headers.started"):
+            self.requests += 1
+        elif event == "connection.connect_tcp.started":
+            self._connect_started = time.perf_counter()
+        elif event == "connection.connect_tcp.complete":
+            self.connections += 1
+            self.connect_time.add(time.perf_counter() - self._connect_started)
+        elif event == "connection.connect_tcp.failed":
+            self.connect_failures += 1
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        """httpcore trace callback for the async client"""
+        self.trace(event, info)
+
+    def on_request(self, request: httpx.Request) -> None:
+        """httpx request hook attaching the trace callback"""
+        request.extensions["trace"] = self.trace
+
+    async def on_async_request(self, request: httpx.Request) -> None:
+        """httpx request hook attaching the async trace callback"""
+        request.extensions["trace"] = self.atrace
+
+    def stats(self) -> Dict[str, float]:
+        """Return request, connection and reuse counters."""
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": max(self.requests - self.connections, 0),
+            "extra_connections": max(self.connections - 1, 0),
+            "connect_failures": self.connect_failures,
+            **self.connect_time.as_dict("connect_time_s_"),
+        }
+
+
+def create_backend_client(connection_stats: ConnectionStats) -> Client:
+    """
+    Create the backend client with a persistent, tuned connection pool.
+
+    Both the sync and the async httpx clients are built eagerly with the configured
+    pool limits and keep-alive expiry. HTTP/2 is used when enabled and the optional
+    `h2` package is installed.
+
+    Args:
+        connection_stats (ConnectionStats): Receives the connection statistics of both clients.
+
+    Returns:
+        Client: The backend client.
+    """
+    http2 = config.BACKEND_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("BACKEND_HTTP2 requires the h2 package, falling back to HTTP/1.1")
+        http2 = False
+
+    base_url = f"http://{config.BACKEND_BASE}"
+    timeout = httpx.Timeout(config.ACTUATOR_TIMEOUT_S)
+    limits = httpx.Limits(
+        max_connections=config.BACKEND_MAX_CONNECTIONS,
+        max_keepalive_connections=config.BACKEND_MAX_CONNECTIONS,
+        keepalive_expiry=config.BACKEND_KEEPALIVE_EXPIRY_S,
+    )
+
+    client = Client(base_url=base_url, timeout=timeout)
+    client.set_httpx_client(
+        httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            event_hooks={"request": [connection_stats.on_request]},
+        )
+    )
+    client.set_async_httpx_client(
+        httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=limits,
+            http2=http2,
+            event_hooks={"request": [connection_stats.on_async_request]},
+        )
+    )
+    return client
+
+
+def warm_up(client: Client) -> None:
+    """
+    Open the connection to the backend before the first actuator write.
+
+    Failures are only logged, the connection is then opened by the first write.
+
+    Args:
+        client (Client): The backend client to warm up.
+
+    Returns:
+        None
+    """
+    try:
+        response = root_get.sync_detailed(client=client)
+        logger.info(f"Backend connection warmed up: {response.status_code}")
+    except Exception as e:
+        logger.warning(f"Backend connection warm-up failed: {e}")
+
+
+async def async_warm_up(client: Client) -> None:
+    """
+    Open the async connection to the backend before the first actuator write.
+
+    Args:
+        client (Client): The backend client to warm up.
+
+    Returns:
+        None
+    """
+    try:
+        response = await root_get.asyncio_detailed(client=client)
+        logger.info(f"Backend connection warmed up: {response.status_code}")
+    except Exception as e:
+        logger.warning(f"Backend connection warm-up failed: {e}")
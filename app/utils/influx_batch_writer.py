@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Literal, Optional
+
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.disk_spool import DiskSpool
+from app.utils.logger import logger
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.stats import RunningStats
+
+DropPolicy = Literal["oldest", "newest"]
+
+_FLUSH_SECONDS = STAGE_SECONDS.labels(stage="influx_flush")
+
+
+def encode_line(record: Any) -> bytes:
+    """Encode a `Point` or line protocol string as a newline terminated line"""
+    if isinstance(record, bytes):
+        line = record
+    elif isinstance(record, str):
+        line = record.encode()
+    else:
+        line = record.to_line_protocol().encode()
+    return line if line.endswith(b"\n") else line + b"\n"
+
+
+class InfluxBatchWriter:
+    """
+    Background writer collecting records into batches for InfluxDB.
+
+    Producers only append to a bounded in-memory queue and never wait for the
+    database. A writer thread flushes a batch as soon as `batch_size` records are
+    queued or `flush_interval_s` elapsed since the last flush. When the queue is
+    full, either the oldest queued record or the new record is dropped.
+
+    With a circuit breaker, batches are not sent while InfluxDB is considered
+    down. Batches that were not written go to the disk spool if there is one,
+    and are lost otherwise. Spooled data is replayed in chunks of
+    `replay_chunk_bytes` as soon as writes succeed again, interleaved with the
+    live batches.
+
+    Parameters
+    ----------
+    write_api : WriteApi
+        Synchronous InfluxDB write API used by the writer thread
+    bucket : str
+        The InfluxDB bucket where data will be written
+    batch_size : int
+        Maximum number of records per write request
+    flush_interval_s : float
+        Maximum time a record waits in the queue before being flushed
+    max_queue_size : int
+        Maximum number of queued records
+    drop_policy : DropPolicy
+        Which record to drop when the queue is full, "oldest" or "newest"
+    breaker : Optional[CircuitBreaker]
+        Breaker skipping writes while InfluxDB fails, None to always try
+    spool : Optional[DiskSpool]
+        Spool keeping batches that could not be written, None to drop them
+    replay_chunk_bytes : int
+        Maximum size of a write request replaying the spool
+    """
+
+    def __init__(
+        self,
+        write_api,
+        bucket: str,
+        batch_size: int = 500,
+        flush_interval_s: float = 1.0,
+        max_queue_size: int = 10_000,
+        drop_policy: DropPolicy = "oldest",
+        breaker: Optional[CircuitBreaker] = None,
+        spool: Optional[DiskSpool] = None,
+        replay_chunk_bytes: int = 4 * 1024 * 1024,
+    ):
+        self.write_api = write_api
+        self.bucket = bucket
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_queue_size = max_queue_size
+        self.drop_policy = drop_policy
+        self.breaker = breaker
+        self.spool = spool
+        self.replay_chunk_bytes = replay_chunk_bytes
+
+        self.queued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.spooled = 0
+        self.flush_latency = RunningStats()
+        self.batch_sizes = RunningStats()
+
+        self._queue: Deque[Any] = deque()
+        self._condition = threading.Condition(threading.Lock())
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the writer thread"""
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush all queued records and stop the writer thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.spool is not None:
+            self.spool.close()
+
+    def put(self, record: Any) -> None:
+        """Queue a record, dropping one according to the drop policy if full"""
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                self.dropped += 1
+                if self.drop_policy == "newest":
+                    return
+                self._queue.popleft()
+            self._queue.append(record)
+            self.queued += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                # Keep replaying without waiting while the spool has data and writes succeed
+                if not self._replay_due():
+                    self._condition.wait_for(
+                        lambda: self._stopped or len(self._queue) >= self.batch_size,
+                        self.flush_interval_s,
+                    )
+                batch = self._take_batch()
+                stopped = self._stopped
+
+            if batch:
+                self._flush(batch)
+            if self.spool is not None and self.spool.pending_bytes and not stopped:
+                self._replay_chunk()
+            if stopped and not self._queue:
+                return
+
+    def _replay_due(self) -> bool:
+        return (
+            self.spool is not None
+            and self.spool.pending_bytes > 0
+            and (self.breaker is None or self.breaker.state == "closed")
+        )
+
+    def _take_batch(self) -> List[Any]:
+        count = min(len(self._queue), self.batch_size)
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _flush(self, batch: List[Any]) -> None:
+        if self.breaker is not None and not self.breaker.allow():
+            self._keep(batch)
+            return
+        started = time.monotonic()
+        try:
+            self.write_api.write(bucket=self.bucket, record=batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} points to InfluxDB: {e}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            self._keep(batch)
+            return
+        if self.breaker is not None:
+            self.breaker.record_success()
+        elapsed = time.monotonic() - started
+        self.flush_latency.add(elapsed)
+        _FLUSH_SECONDS.observe(elapsed)
+        self.batch_sizes.add(len(batch))
+        self.written += len(batch)
+
+    def _keep(self, batch: List[Any]) -> None:
+        """Spool a batch that was not written, or count it as lost without a spool"""
+        if self.spool is not None and self.spool.append(encode_line(record) for record in batch):
+            self.spooled += len(batch)
+            return
+        self.failed += len(batch)
+
+    def _replay_chunk(self) -> None:
+        """Write the oldest spooled records in a single request"""
+        if self.breaker is not None and not self.breaker.allow():
+            return
+        chunk = self.spool.peek(self.replay_chunk_bytes)
+        try:
+            self.write_api.write(bucket=self.bucket, record=chunk)
+        except Exception as e:
+            logger.error(f"Failed to replay {len(chunk)} spooled bytes to InfluxDB: {e}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            return
+        if self.breaker is not None:
+            self.breaker.record_success()
+        self.spool.consume(len(chunk))
+        if not self.spool.pending_bytes:
+            logger.info("InfluxDB spool replayed")
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, point counters, flush latency, breaker and spool statistics."""
+        stats = {
+            "queue_depth": len(self._queue),
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "spooled": self.spooled,
+            **self.flush_latency.as_dict("flush_latency_s_"),
+            **self.batch_sizes.as_dict("batch_size_"),
+        }
+        if self.breaker is not None:
+            stats.update({f"breaker_{k}": v for k, v in self.breaker.stats().items()})
+        if self.spool is not None:
+            stats.update({f"spool_{k}": v for k, v in self.spool.stats().items()})
+        return stats
@@ -1,9 +1,15 @@
-from influxdb_client import InfluxDBClient, Point, WritePrecision
+from functools import lru_cache
+from typing import Optional
+
+from influxdb_client import InfluxDBClient
 from influxdb_client.client.write_api import SYNCHRONOUS
 from simple_pid import PID
 
+from app.utils.circuit_breaker import CircuitBreaker
 from app.utils.config import config
-from app.utils.logger import logger
+from app.utils.disk_spool import DiskSpool
+from app.utils.influx_batch_writer import InfluxBatchWriter
+from app.utils.line_protocol import PIDLineEncoder
 
 
 class InfluxConnector:
@@ -18,39 +24,64 @@ class InfluxConnector:
         The client instance used to interact with InfluxDB.
     write_api : WriteApi
         The API instance used to write data to InfluxDB.
+    writer : InfluxBatchWriter
+        The background writer batching points off the control path.
+    encoder : PIDLineEncoder
+        Encodes PID steps as line protocol.
 
     Methods
-    __init__(
-        url=config.INFLUXDB_URL.unicode_string(),
-        token=config.INFLUXDB_TOKEN,
-        org=config.INFLUXDB_ORG,
-        bucket=config.INFLUXDB_BUCKET
-    )
-        Initializes the InfluxConnector with the specified InfluxDB connection parameters.
+    __init__(url=None, token=None, org=None, bucket=None)
+        Initializes the InfluxConnector with the specified InfluxDB connection parameters,
+        defaulting to the configured ones.
     write_pid(pid: PID, timestamp_ns: int)
         Writes PID controller data to InfluxDB.
-    _write(point)
-        Writes a data point to InfluxDB and handles exceptions.
+    write_step(sensor_id, p, i, d, setpoint, auto_mode, timestamp_ns)
+        Writes a step of any control loop to InfluxDB, tagged with its sensor.
+    _write(line)
+        Queues a line protocol record for the background writer.
     """
 
     def __init__(
         self,
-        url=config.INFLUXDB_URL.unicode_string(),
-        token=config.INFLUXDB_TOKEN,
-        org=config.INFLUXDB_ORG,
-        bucket=config.INFLUXDB_BUCKET,
+        url: Optional[str] = None,
+        token: Optional[str] = None,
+        org: Optional[str] = None,
+        bucket: Optional[str] = None,
     ):
 
+        bucket = bucket or config.INFLUXDB_BUCKET
         self.bucket = bucket
         self.client = InfluxDBClient(
-            url=url,
-            token=token,
-            org=org,
+            url=url or config.INFLUXDB_URL.unicode_string(),
+            token=token or config.INFLUXDB_TOKEN,
+            org=org or config.INFLUXDB_ORG,
             debug=(config.DEBUG_LEVEL == "DEBUG"),
             timeout=250,
+            enable_gzip=config.INFLUXDB_GZIP,
         )
 
         self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        self.writer = InfluxBatchWriter(
+            self.write_api,
+            bucket=bucket,
+            batch_size=config.INFLUXDB_BATCH_SIZE,
+            flush_interval_s=config.INFLUXDB_FLUSH_INTERVAL_S,
+            max_queue_size=config.INFLUXDB_QUEUE_SIZE,
+            drop_policy=config.INFLUXDB_DROP_POLICY,
+            breaker=CircuitBreaker(
+                failure_threshold=config.INFLUXDB_BREAKER_THRESHOLD,
+                reset_timeout_s=config.INFLUXDB_BREAKER_RESET_S,
+            ),
+            spool=(
+                DiskSpool(config.INFLUXDB_SPOOL_PATH, config.INFLUXDB_SPOOL_MAX_BYTES)
+                if config.INFLUXDB_SPOOL_PATH
+                else None
+            ),
+            replay_chunk_bytes=config.INFLUXDB_REPLAY_CHUNK_BYTES,
+        )
+        self.writer.start()
+        self.encoder = PIDLineEncoder(config.SENSOR_ID)
+        self._encoders = {config.SENSOR_ID: self.encoder}
 
     def write_pid(self, pid: PID, timestamp_ns: int):
         """
@@ -68,24 +99,46 @@ class InfluxConnector:
 
         (p, i, d) = pid.components
 
-        point = (
-            Point("PID")
-            .field("P", float(p))
-            .field("I", float(i))
-            .field("D", float(d))
-            .field("setpoint", float(pid.setpoint))
-            .field("auto_mode", bool(pid.auto_mode))
-            .time(timestamp_ns, WritePrecision.NS)
-            .tag("sensor_id", config.SENSOR_ID)
-        )
+        self._write(self.encoder.encode(p, i, d, pid.setpoint, pid.auto_mode, timestamp_ns))
 
-        self._write(point)
+    def write_step(
+        self,
+        sensor_id: int,
+        p: float,
+        i: float,
+        d: float,
+        setpoint: float,
+        auto_mode: bool,
+        timestamp_ns: int,
+    ):
+        """
+        Write a step of the control loop of any sensor to InfluxDB.
+        Parameters
+        ----------
+        sensor_id : int
+            The sensor of the control loop, written as the `sensor_id` tag.
+        p, i, d : float
+            The PID components after the step.
+        setpoint : float
+            The setpoint of the control loop.
+        auto_mode : bool
+            Whether the control loop is enabled.
+        timestamp_ns : int
+            The timestamp in nanoseconds to associate with the data point.
+        Returns
+        -------
+        None
+        """
+        encoder = self._encoders.get(sensor_id)
+        if encoder is None:
+            encoder = self._encoders[sensor_id] = PIDLineEncoder(sensor_id)
+        self._write(encoder.encode(p, i, d, setpoint, auto_mode, timestamp_ns))
 
-    def _write(self, point):
-        try:
-            self.write_api.write(bucket=self.bucket, record=point)
-        except Exception as e:
-            logger.error(f"Failed to write to InfluxDB: {e}")
+    def _write(self, line: bytes):
+        self.writer.put(line)
 
 
-influx_connector = InfluxConnector()
+@lru_cache(maxsize=None)
+def get_influx_connector() -> InfluxConnector:
+    """Create the shared InfluxConnector on first use."""
+    return InfluxConnector()
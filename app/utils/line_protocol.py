@@ -0,0 +1,64 @@
+import math
+from typing import Union
+
+_MEASUREMENT_ESCAPES = str.maketrans({",": r"\,", " ": r"\ "})
+_TAG_ESCAPES = str.maketrans({",": r"\,", "=": r"\=", " ": r"\ "})
+
+
+def escape_measurement(name: str) -> str:
+    """Escape a measurement name for line protocol"""
+    return name.translate(_MEASUREMENT_ESCAPES)
+
+
+def escape_tag(value: Union[str, int]) -> str:
+    """Escape a tag key or value for line protocol"""
+    return str(value).translate(_TAG_ESCAPES)
+
+
+class PIDLineEncoder:
+    """
+    Encodes PID telemetry directly as InfluxDB line protocol.
+
+    Measurement and tag are escaped and encoded once into a bytes template, so
+    encoding a step is a single formatting operation producing the final bytes,
+    without building an `influxdb_client.Point` and serializing it afterwards.
+    Fields are written in the same sorted order `Point` uses. Non-finite values,
+    which line protocol cannot represent, are left out like `Point` does.
+
+    Parameters
+    ----------
+    sensor_id : Union[str, int]
+        Value of the `sensor_id` tag
+    measurement : str
+        Name of the measurement
+    """
+
+    def __init__(self, sensor_id: Union[str, int], measurement: str = "PID"):
+        series = f"{escape_measurement(measurement)},sensor_id={escape_tag(sensor_id)}"
+        self.prefix = f"{series} ".encode()
+        self._template = self.prefix + b"D=%r,I=%r,P=%r,auto_mode=%s,setpoint=%r %d"
+
+    def encode(
+        self,
+        p: float,
+        i: float,
+        d: float,
+        setpoint: float,
+        auto_mode: bool,
+        timestamp_ns: int,
+    ) -> bytes:
+        """Return the line protocol of a PID step, without trailing newline"""
+        p, i, d, setpoint = float(p), float(i), float(d), float(setpoint)
+        auto = b"true" if auto_mode else b"false"
+        # The sum is only non-finite if a value is, or on overflow, then check every field
+        if math.isfinite(p + i + d + setpoint):
+            return self._template % (d, i, p, auto, setpoint, timestamp_ns)
+        fields = [
+            b"%s=%r" % (name, value)
+            for name, value in ((b"D", d), (b"I", i), (b"P", p))
+            if math.isfinite(value)
+        ]
+        fields.append(b"auto_mode=" + auto)
+        if math.isfinite(setpoint):
+            fields.append(b"setpoint=%r" % setpoint)
+        return self.prefix + b",".join(fields) + b" %d" % timestamp_ns
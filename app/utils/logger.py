@@ -1,4 +1,9 @@
+import atexit
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
 
 
 class CustomFormatter(logging.Formatter):
@@ -25,6 +30,13 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + line_format + reset,
     }
 
+    def __init__(self):
+        super().__init__(self.line_format)
+        # Formatters are built once per level instead of once per record
+        self.formatters = {
+            level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()
+        }
+
     def format(self, record):
         """
         This function formats a log message based on its level
@@ -34,11 +46,76 @@ class CustomFormatter(logging.Formatter):
         Returns:
             str: The formatted log message.
         """
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self.formatters.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
         return formatter.format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """
+    This formatter renders every log record as a single JSON object per line
+    """
+
+    def format(self, record):
+        """
+        This function formats a log record as JSON
+
+        Args:
+            record (LogRecord): The log record to be formatted.
+        Returns:
+            str: The JSON encoded log record.
+        """
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class DebugSampler(logging.Filter):
+    """
+    This filter only lets every n-th DEBUG record of a logger pass
+
+    Args:
+        every (Dict[str, int]): Sampling interval per logger name, e.g. {"root": 100}.
+        default_every (int): Sampling interval for loggers not listed in `every`.
+    """
+
+    def __init__(self, every: Optional[Dict[str, int]] = None, default_every: int = 1):
+        super().__init__()
+        self.every = dict(every or {})
+        self.default_every = default_every
+        self.counters: Dict[str, int] = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        every = self.every.get(record.name, self.default_every)
+        if every <= 1:
+            return True
+        count = self.counters.get(record.name, 0)
+        self.counters[record.name] = count + 1
+        return count % every == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    This queue handler hands records to the listener thread without formatting them
+
+    Message interpolation and formatting happen in the listener thread, so the
+    thread emitting the record only pays for putting it into the queue.
+    """
+
+    def prepare(self, record):
+        return record
+
+
 # Create the main logger
 logger = logging.getLogger()
 
@@ -48,8 +125,39 @@ ch = logging.StreamHandler()
 # Set the custom formatter for the stream handler
 ch.setFormatter(CustomFormatter())
 
-# Add the stream handler to the logger
-logger.addHandler(ch)
+# Console output happens in a listener thread, callers only enqueue records
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = DeferredQueueHandler(log_queue)
+debug_sampler = DebugSampler()
+queue_handler.addFilter(debug_sampler)
+listener = QueueListener(log_queue, ch, respect_handler_level=True)
+
+# Add the queue handler to the logger
+logger.addHandler(queue_handler)
+listener.start()
+atexit.register(listener.stop)
+
+
+def configure_logging(
+    level: str,
+    log_format: str = "text",
+    debug_sampling: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Apply the configured log level, output format and debug sampling.
+
+    Args:
+        level (str): Name of the log level, e.g. "DEBUG".
+        log_format (str): "text" for colored console lines, "json" for JSON lines.
+        debug_sampling (Optional[Dict[str, int]]): Only emit every n-th DEBUG record per logger name.
+
+    Returns:
+        None
+    """
+    logger.setLevel(level.upper())
+    ch.setFormatter(JsonFormatter() if log_format == "json" else CustomFormatter())
+    debug_sampler.every = dict(debug_sampling or {})
+    debug_sampler.counters.clear()
 
 
 def not_implemented_warning() -> None:
@@ -0,0 +1,88 @@
+import threading
+from typing import Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatestValueMailbox(Generic[T]):
+    """
+    Single-slot mailbox that only keeps the newest value.
+
+    Producers never block: putting a value while an older one is still unconsumed
+    replaces it and counts the older one as dropped. Consumers always receive the
+    freshest value, so a slow consumer falls behind by at most one value instead of
+    working through a growing backlog.
+
+    Attributes
+    ----------
+    received : int
+        Number of values put into the mailbox
+    dropped : int
+        Number of values replaced before they were consumed
+    delivered : int
+        Number of values handed out to consumers
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._value: Optional[T] = None
+        self._full = False
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+        self.delivered = 0
+
+    def put(self, value: T, overwrite: bool = True) -> bool:
+        """
+        Store a value, replacing an unconsumed one unless `overwrite` is False.
+
+        Returns
+        -------
+        bool
+            True if the value was stored
+        """
+        with self._condition:
+            if self._full:
+                if not overwrite:
+                    return False
+                self.dropped += 1
+            self._value = value
+            self._full = True
+            self.received += 1
+            self._condition.notify()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """
+        Take the newest value, waiting up to `timeout` seconds for one to arrive.
+
+        Returns
+        -------
+        Optional[T]
+            The value, or None on timeout or after the mailbox was closed
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._full or self._closed, timeout
+            ):
+                return None
+            if not self._full:
+                return None
+            value, self._value, self._full = self._value, None, False
+            self.delivered += 1
+            return value
+
+    def close(self) -> None:
+        """Wake up all waiting consumers; subsequent gets return pending values only."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Return the mailbox counters."""
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "pending": int(self._full),
+        }
@@ -0,0 +1,236 @@
+import math
+import re
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Latency buckets in seconds, from microseconds up to the actuator timeout
+LATENCY_BUCKETS = (
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+# Buckets in seconds for interruptions of a stream, from a quick reconnect to minutes
+GAP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+StatsSource = Callable[[], Dict[str, float]]
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    Base class for labelled metrics.
+
+    Updates take no locks: children are only ever added, and a sample update is a
+    handful of attribute writes from the thread owning that stage. Scrapes read a
+    copy of the current values, so exposition never blocks the control loop.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[Tuple[str, str], ...], object] = {}
+
+    def labels(self, **labels: str):
+        """Return the child metric for the given label values, creating it once"""
+        key = tuple((name, str(labels[name])) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, labels, child) -> List[Tuple[str, Tuple, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for labels, child in list(self._children.items()):
+            for name, sample_labels, value in self._samples(labels, child):
+                lines.append(f"{name}{_format_labels(sample_labels)} {_format_value(value)}")
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter"""
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _samples(self, labels, child):
+        return [(f"{self.name}_total", labels, child.value)]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a sample"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Histogram with fixed, cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _samples(self, labels, child):
+        counts = list(child.counts)
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            samples.append(
+                (f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative)
+            )
+        samples.append((f"{self.name}_sum", labels, child.sum))
+        samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics and statistics sources exposed on `/metrics`.
+
+    Statistics sources return flat dictionaries of numbers; every entry is exposed
+    as a gauge named after the source and the key.
+    """
+
+    def __init__(self, prefix: str = "pid_control"):
+        self.prefix = prefix
+        self._metrics: List[_Metric] = []
+        self._stats_sources: Dict[str, StatsSource] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(f"{self.prefix}_{name}", documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram"""
+        metric = Histogram(f"{self.prefix}_{name}", documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(self, name: str, source: StatsSource) -> None:
+        """Expose the entries of a statistics source as gauges"""
+        self._stats_sources[name] = source
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for source_name, source in list(self._stats_sources.items()):
+            for key, value in source().items():
+                name = re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.prefix}_{source_name}_{key}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "stage_seconds", "Duration of the hot path stages in seconds", ("stage",)
+)
+WS_MESSAGES = registry.counter(
+    "websocket_messages", "Messages received per WebSocket", ("websocket",)
+)
+WS_ERRORS = registry.counter(
+    "websocket_errors", "Errors raised per WebSocket", ("websocket",)
+)
+WS_RECONNECTS = registry.counter(
+    "websocket_reconnects", "Reconnects per WebSocket", ("websocket",)
+)
+WS_DOWNTIME_SECONDS = registry.histogram(
+    "websocket_downtime_seconds",
+    "Time from losing a WebSocket connection to reopening it, per reconnect",
+    ("websocket",),
+    GAP_BUCKETS,
+)
+WS_DATA_GAP_SECONDS = registry.histogram(
+    "websocket_data_gap_seconds",
+    "Time between the last message before and the first message after a reconnect",
+    ("websocket",),
+    GAP_BUCKETS,
+)
+STREAM_TIMEOUTS = registry.counter(
+    "stream_timeouts", "Watchdog timeouts per input stream", ("stream",)
+)
+STALE_READINGS = registry.counter(
+    "stale_readings", "Control steps skipped because the sensor reading was too old"
+)
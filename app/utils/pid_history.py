@@ -0,0 +1,200 @@
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+FIELDS = ("measurement", "setpoint", "P", "I", "D", "output")
+
+# Magic, capacity and the number of steps started and completed so far, padded to keep
+# the arrays aligned
+_HEADER = struct.Struct("<4s4xQQQ")
+_HEADER_SIZE = 64
+_COUNTER = struct.Struct("<Q")
+_STARTED_OFFSET = 16
+_WRITTEN_OFFSET = 24
+_MAGIC = b"HIS1"
+_ROW_SIZE = 8 * (1 + len(FIELDS))
+
+
+def _size(capacity: int) -> int:
+    return _HEADER_SIZE + capacity * _ROW_SIZE
+
+
+class PIDHistoryBuffer:
+    """
+    Fixed-size ring buffer of recent controller steps.
+
+    All storage is preallocated, so memory stays constant no matter how long the
+    service runs; once full, the oldest steps are overwritten.
+
+    With a `path`, the buffer lives in a memory-mapped file that other processes,
+    e.g. further uvicorn workers, `attach` to read-only. The header counts the steps
+    the writer started and completed; readers check the completed steps before and
+    the started steps after copying the rows and drop the rows the writer overwrote
+    meanwhile, so they never see a torn step.
+
+    Appending is meant for a single writer.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of steps kept
+    path : Optional[str]
+        File backing the buffer, created if it does not exist, None to keep it in memory
+    """
+
+    def __init__(self, capacity: int, path: Optional[str] = None):
+        self.capacity = capacity
+        self.path = path
+        self._file = None
+        self._buffer: Union[bytearray, mmap.mmap]
+        if path is None:
+            self._buffer = bytearray(_size(capacity))
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a+b")
+            # Never shrunk, readers may still map the size of a previous writer
+            if os.path.getsize(path) < _size(capacity):
+                self._file.truncate(_size(capacity))
+            self._buffer = mmap.mmap(self._file.fileno(), _size(capacity))
+        self._written = 0
+        _HEADER.pack_into(self._buffer, 0, _MAGIC, capacity, self._written, self._written)
+        self._map_arrays()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def attach(cls, path: str) -> Optional["PIDHistoryBuffer"]:
+        """Map the buffer another process writes to `path` read-only, None if there is none"""
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        magic, capacity, _, _ = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or len(buffer) < _size(capacity):
+            buffer.close()
+            return None
+        history = cls.__new__(cls)
+        history.capacity = capacity
+        history.path = path
+        history._file = None
+        history._buffer = buffer
+        history._map_arrays()
+        history._lock = threading.Lock()
+        return history
+
+    def _map_arrays(self) -> None:
+        self.timestamp_ns = np.frombuffer(
+            self._buffer, dtype=np.int64, count=self.capacity, offset=_HEADER_SIZE
+        )
+        self.values = np.frombuffer(
+            self._buffer,
+            dtype=np.float64,
+            count=self.capacity * len(FIELDS),
+            offset=_HEADER_SIZE + 8 * self.capacity,
+        ).reshape(self.capacity, len(FIELDS))
+
+    @property
+    def written(self) -> int:
+        """Number of steps appended since the writer created the buffer"""
+        return _COUNTER.unpack_from(self._buffer, _WRITTEN_OFFSET)[0]
+
+    @property
+    def started(self) -> int:
+        """Number of steps the writer started to append, one more than `written` while appending"""
+        return _COUNTER.unpack_from(self._buffer, _STARTED_OFFSET)[0]
+
+    @property
+    def count(self) -> int:
+        """Number of steps currently kept"""
+        return min(self.written, self.capacity)
+
+    @property
+    def stale(self) -> bool:
+        """Whether the writer recreated the buffer with another capacity since it was attached"""
+        return _HEADER.unpack_from(self._buffer, 0)[1] != self.capacity
+
+    def append(
+        self,
+        timestamp_ns: int,
+        measurement: float,
+        setpoint: float,
+        p: float,
+        i: float,
+        d: float,
+        output: float,
+    ) -> None:
+        """Record a controller step"""
+        with self._lock:
+            index = self._written % self.capacity
+            self._written += 1
+            _COUNTER.pack_into(self._buffer, _STARTED_OFFSET, self._written)
+            self.timestamp_ns[index] = timestamp_ns
+            self.values[index] = (measurement, setpoint, p, i, d, output)
+            _COUNTER.pack_into(self._buffer, _WRITTEN_OFFSET, self._written)
+
+    def query(
+        self,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        max_points: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Return the recorded steps within a time range in chronological order.
+
+        Parameters
+        ----------
+        start_ns : Optional[int]
+            Inclusive lower bound of the sensor timestamps, None for no bound
+        end_ns : Optional[int]
+            Inclusive upper bound of the sensor timestamps, None for no bound
+        max_points : Optional[int]
+            Decimate the result by an integer stride to at most this many steps
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Arrays keyed by "timestamp_ns" and the names in `FIELDS`
+        """
+        with self._lock:
+            before = self.written
+            steps = np.arange(max(before - self.capacity, 0), before)
+            timestamp_ns = self.timestamp_ns[steps % self.capacity]
+            values = self.values[steps % self.capacity]
+            started = self.started
+
+        # Steps overwritten by a writer in another process while they were copied
+        kept = steps >= started - self.capacity
+        timestamp_ns, values = timestamp_ns[kept], values[kept]
+
+        mask = np.ones(timestamp_ns.shape, dtype=bool)
+        if start_ns is not None:
+            mask &= timestamp_ns >= start_ns
+        if end_ns is not None:
+            mask &= timestamp_ns <= end_ns
+        timestamp_ns, values = timestamp_ns[mask], values[mask]
+
+        if max_points is not None and timestamp_ns.size > max_points:
+            stride = -(-timestamp_ns.size // max_points)
+            timestamp_ns, values = timestamp_ns[::stride], values[::stride]
+
+        result = {"timestamp_ns": timestamp_ns}
+        for column, name in enumerate(FIELDS):
+            result[name] = values[:, column]
+        return result
+
+    def close(self) -> None:
+        """Write a file-backed buffer back to disk and close the file"""
+        if isinstance(self._buffer, mmap.mmap):
+            # Release the array views first, a mapping with exported buffers cannot be closed
+            del self.timestamp_ns, self.values
+            if self._file is not None:
+                self._buffer.flush()
+            self._buffer.close()
+        if self._file is not None:
+            self._file.close()
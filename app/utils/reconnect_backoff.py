@@ -0,0 +1,51 @@
+import random
+from typing import Callable, Dict
+
+
+class ReconnectBackoff:
+    """
+    Delays between reconnect attempts, growing exponentially with jitter.
+
+    The first attempt after a connection was lost is made immediately, since
+    most drops are transient and every second without data is a second without
+    control. Further attempts wait `initial_s`, doubling up to `max_s`, each
+    randomized to between half and the full delay so that clients dropped at
+    the same time do not reconnect in lockstep. The delays start over once a
+    connection was established successfully.
+
+    Parameters
+    ----------
+    initial_s : float
+        Delay before the second attempt
+    max_s : float
+        Upper bound of the delay
+    random_fn : Callable[[], float]
+        Source of random numbers in [0, 1), replaceable for reproducible delays
+    """
+
+    def __init__(
+        self,
+        initial_s: float,
+        max_s: float,
+        random_fn: Callable[[], float] = random.random,
+    ):
+        self.initial_s = initial_s
+        self.max_s = max_s
+        self.random_fn = random_fn
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        """Return the time to wait before the next attempt in seconds"""
+        self.attempts += 1
+        if self.attempts == 1:
+            return 0.0
+        delay = min(self.initial_s * 2 ** (self.attempts - 2), self.max_s)
+        return delay * (0.5 + 0.5 * self.random_fn())
+
+    def reset(self) -> None:
+        """Start over after a successful connection"""
+        self.attempts = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return the number of attempts since the last successful connection."""
+        return {"attempts": self.attempts}
@@ -0,0 +1,51 @@
+import json
+from typing import Tuple
+
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+_WHITESPACE = " \t\r\n"
+
+
+def parse_sensor_message(message: str) -> Tuple[float, int]:
+    """
+    Extract value and timestamp from a sensor message.
+
+    Messages of the known two-field ``{"value": ..., "timestamp_ns": ...}`` shape,
+    in either key order, are split directly on their separators without building
+    an intermediate dictionary. Any other message, for example with additional
+    keys, falls back to `json.loads`.
+
+    Args:
+        message (str): The raw WebSocket message.
+
+    Returns:
+        Tuple[float, int]: The sensor value and its timestamp in nanoseconds.
+    """
+    first, _, second = message.partition(",")
+    first_key, _, first_raw = first.partition(":")
+    second_key, _, second_raw = second.partition(":")
+    first_key = first_key.strip(_WHITESPACE + "{")
+    second_key = second_key.strip(_WHITESPACE)
+    try:
+        if first_key == '"value"' and second_key == '"timestamp_ns"':
+            return float(first_raw), int(second_raw.rstrip(_WHITESPACE + "}"))
+        if first_key == '"timestamp_ns"' and second_key == '"value"':
+            return float(second_raw.rstrip(_WHITESPACE + "}")), int(first_raw)
+    except ValueError:
+        pass
+    data = json.loads(message)
+    return float(data["value"]), int(data["timestamp_ns"])
+
+
+def decode_sensor_reading(message: str) -> SensorReading:
+    """
+    Decode a sensor message into a `SensorReading`.
+
+    Args:
+        message (str): The raw WebSocket message.
+
+    Returns:
+        SensorReading: The decoded reading.
+    """
+    value, timestamp_ns = parse_sensor_message(message)
+    return SensorReading(value, timestamp_ns)
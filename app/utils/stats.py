@@ -0,0 +1,59 @@
+import math
+from typing import Dict
+
+
+class RunningStats:
+    """
+    Constant-memory running statistics (Welford's algorithm).
+
+    Attributes
+    ----------
+    count : int
+        Number of recorded samples
+    mean : float
+        Arithmetic mean of the recorded samples
+    min : float
+        Smallest recorded sample
+    max : float
+        Largest recorded sample
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all recorded samples."""
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Record a new sample."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation, 0 with fewer than two samples."""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    def as_dict(self, prefix: str = "") -> Dict[str, float]:
+        """Return the statistics as a flat dictionary with prefixed keys."""
+        empty = self.count == 0
+        return {
+            f"{prefix}count": self.count,
+            f"{prefix}mean": self.mean,
+            f"{prefix}min": 0.0 if empty else self.min,
+            f"{prefix}max": 0.0 if empty else self.max,
+            f"{prefix}stddev": self.stddev,
+        }
@@ -0,0 +1,147 @@
+"""
+End-to-end latency benchmark of the WebSocket service against a local stub backend.
+
+Streams sensor readings at increasing rates and measures the time from the sensor
+timestamp to the arrival of the resulting valve write at the stub. A rate counts
+as sustainable while the p99 latency stays below the backlog threshold and the
+latency does not keep growing over the run.
+
+Usage:
+    python -m benchmarks.e2e_latency --rates 50 100 200 500 1000 --duration 5
+
+The control loop is started through `app.main`, so the output filter, circuit
+breaker and watchdog are wired as in production. Service options such as
+`SENSOR_COALESCING`, `ACTUATOR_NONBLOCKING` or `ACTUATOR_CHANNEL` are taken from
+the environment like in production.
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from benchmarks.stub_backend import StubBackend
+
+
+def configure_environment(stub: StubBackend, mode: str) -> None:
+    """Point the service at the stub and make the controller output the sequence number"""
+    os.environ.update(
+        {
+            "BACKEND_BASE": stub.base,
+            "INFLUXDB_URL": f"http://{stub.base}",
+            "INFLUXDB_BUCKET": "benchmark",
+            "INFLUXDB_ORG": "benchmark",
+            "INFLUXDB_TOKEN": "benchmark",
+            "PID_KP": "1",
+            "PID_KI": "0",
+            "PID_KD": "0",
+            "PID_OUTPUT_MIN": "-1e12",
+            "PID_OUTPUT_MAX": "1e12",
+            "WS_SERVICE_MODE": mode,
+        }
+    )
+    os.environ.setdefault("DEBUG_LEVEL", "WARNING")
+
+
+def start_service() -> Callable[[], None]:
+    """Start the control loop through `app.main` on a background event loop, return its stop"""
+    # pylint: disable=import-outside-toplevel
+    from app.main import start_control_loop, stop_services
+    from app.utils.config import config
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    shutdown: List = []
+    asyncio.run_coroutine_threadsafe(start_control_loop({}, shutdown), loop).result()
+
+    def stop() -> None:
+        asyncio.run_coroutine_threadsafe(
+            stop_services(shutdown, config.SHUTDOWN_TIMEOUT_S), loop
+        ).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return stop
+
+
+def wait_for_connections(stub: StubBackend, timeout_s: float = 10.0) -> None:
+    """Wait until the service connected to the stub and received its setpoint"""
+    deadline = time.monotonic() + timeout_s
+    while not (stub.sensor_connections and stub.setpoint_connections):
+        if time.monotonic() > deadline:
+            raise TimeoutError("Service did not connect to the stub backend")
+        time.sleep(0.05)
+    # Give the setpoint message time to enable the controller
+    time.sleep(0.5)
+
+
+def run_rate(stub: StubBackend, first: int, rate_hz: float, duration_s: float, drain_s: float):
+    """Stream one rate and return the latencies in milliseconds and the write count"""
+    count = int(rate_hz * duration_s)
+    writes_before = stub.posts + stub.commands
+    stub.stream(first, count, rate_hz)
+    time.sleep(duration_s + drain_s)
+    latencies_ms = np.array(stub.latencies_ns(first, count)) / 1e6
+    return count, latencies_ms, stub.posts + stub.commands - writes_before
+
+
+def is_backlogged(latencies_ms: np.ndarray, backlog_ms: float) -> bool:
+    """Whether latency exceeds the threshold or keeps growing during the run"""
+    if latencies_ms.size < 10:
+        return True
+    tenth = latencies_ms.size // 10
+    growing = np.median(latencies_ms[-tenth:]) > 2 * np.median(latencies_ms[:tenth]) + 1
+    return bool(np.percentile(latencies_ms, 99) > backlog_ms or growing)
+
+
+def main() -> None:
+    """Raise the sensor rate until the service backs up and report the latencies per rate"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--rates", nargs="+", type=float, default=[50, 100, 200, 500, 1000])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per rate")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds to wait for late writes")
+    parser.add_argument("--backlog-ms", type=float, default=100.0, help="p99 latency limit")
+    parser.add_argument("--mode", choices=("thread", "asyncio"), default="thread")
+    parser.add_argument("--port", type=int, default=5999)
+    args = parser.parse_args()
+
+    stub = StubBackend(port=args.port)
+    stub.start()
+    configure_environment(stub, args.mode)
+    stop_service = start_service()
+    wait_for_connections(stub)
+
+    print(
+        f"{'rate/s':>8} {'readings':>9} {'writes':>7} {'fresh':>6} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8}  status"
+    )
+    sustainable = None
+    first = 1
+    for rate_hz in args.rates:
+        count, latencies_ms, writes = run_rate(stub, first, rate_hz, args.duration, args.drain)
+        first += count
+        backlogged = is_backlogged(latencies_ms, args.backlog_ms)
+        if latencies_ms.size:
+            p50, p99, p999 = np.percentile(latencies_ms, [50, 99, 99.9])
+        else:
+            p50 = p99 = p999 = float("nan")
+        print(
+            f"{rate_hz:>8.0f} {count:>9} {writes:>7} {latencies_ms.size:>6} "
+            f"{p50:>8.2f} {p99:>8.2f} {p999:>8.2f}  {'backlog' if backlogged else 'ok'}"
+        )
+        if backlogged:
+            break
+        sustainable = rate_hz
+
+    sustainable_rate = sustainable if sustainable is not None else "none"
+    print(f"Maximum sustainable rate: {sustainable_rate} readings/s")
+    print(f"InfluxDB stub received {stub.influx_lines} lines in {stub.influx_writes} requests")
+    stop_service()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Import-time benchmark of the service entry point.
+
+Imports `app.main` in fresh interpreters, reports the best import time out of
+several runs and the slowest top-level packages according to `-X importtime`.
+With `--budget-ms` the benchmark exits with status 1 when the import takes
+longer, so it can guard cold start in CI.
+
+Usage:
+    python -m benchmarks.import_time --runs 5 --budget-ms 800
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MEASURE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def import_seconds(module: str) -> float:
+    """Time a single import of `module` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_packages(module: str, top: int) -> List[Tuple[str, float]]:
+    """
+    Cumulative import time in milliseconds of the packages pulled in by `module`.
+
+    A package is counted where it is imported from another package, so the time
+    of e.g. `starlette` also shows up in `fastapi`. The package of `module`
+    itself is left out since it contains everything.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    own = module.split(".")[0]
+    packages: Dict[str, float] = {}
+    # -X importtime prints a module after everything it imported, walk back to find parents
+    parents: List[Tuple[int, str]] = []
+    for line in reversed(result.stderr.splitlines()):
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        package = name.strip().split(".")[0]
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        parent = parents[-1][1] if parents else None
+        parents.append((depth, package))
+        if package not in (own, parent):
+            packages[package] = packages.get(package, 0.0) + int(cumulative) / 1000
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> None:
+    """Time the import of a module in fresh interpreters and list the slowest packages"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of packages to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Maximum import time")
+    args = parser.parse_args()
+
+    best_ms = min(import_seconds(args.module) for _ in range(args.runs)) * 1000
+    print(f"import {args.module}: {best_ms:.1f} ms (best of {args.runs})")
+    print(f"{'package':<32} {'cumulative ms':>14}")
+    for package, cumulative_ms in slowest_packages(args.module, args.top):
+        print(f"{package:<32} {cumulative_ms:>14.1f}")
+
+    if args.budget_ms is not None:
+        within = best_ms <= args.budget_ms
+        print(f"Budget {args.budget_ms:.0f} ms: {'ok' if within else 'exceeded'}")
+        if not within:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
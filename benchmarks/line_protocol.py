@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of PID telemetry encoding.
+
+Compares building an `influxdb_client.Point` per step and serializing it with
+`to_line_protocol()` against the pre-encoded `PIDLineEncoder`, and reports steps
+per second and the memory held while encoding a step.
+
+Usage:
+    python -m benchmarks.line_protocol --steps 200000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from influxdb_client import Point, WritePrecision
+
+from app.utils.line_protocol import PIDLineEncoder
+
+Step = Tuple[float, float, float, float, bool, int]
+
+SENSOR_ID = 1
+
+
+# Same arguments as PIDLineEncoder.encode, so both run on the same steps
+def point_encode(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    p: float, i: float, d: float, setpoint: float, auto_mode: bool, timestamp_ns: int
+) -> bytes:
+    """Encode a step the way the client did before, through an influxdb_client Point"""
+    point = (
+        Point("PID")
+        .field("P", float(p))
+        .field("I", float(i))
+        .field("D", float(d))
+        .field("setpoint", float(setpoint))
+        .field("auto_mode", bool(auto_mode))
+        .time(timestamp_ns, WritePrecision.NS)
+        .tag("sensor_id", SENSOR_ID)
+    )
+    return point.to_line_protocol().encode()
+
+
+def parse_line(line: bytes):
+    """Split a line into series, field values and timestamp to compare encodings"""
+    series, fields, timestamp = line.split(b" ")
+    values = {}
+    for field in fields.split(b","):
+        key, value = field.split(b"=")
+        values[key] = value if value in (b"true", b"false") else float(value)
+    return series, values, int(timestamp)
+
+
+def steps_per_second(encode: Callable[..., bytes], steps: List[Step], repeat: int) -> float:
+    """Best steps per second out of `repeat` passes over the steps"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for step in steps:
+            encode(*step)
+        best = min(best, time.perf_counter() - started)
+    return len(steps) / best
+
+
+def peak_step_bytes(encode: Callable[..., bytes], steps: List[Step]) -> int:
+    """Largest amount of memory held at once while encoding a single step"""
+    tracemalloc.start()
+    for step in steps:
+        encode(*step)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Check both encoders agree, then compare their throughput and memory per step"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--steps", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start_ns = time.time_ns()
+    steps = [
+        (0.5 + k * 1e-4, 0.01 * k, -1e-3 * k, 10.0, True, start_ns + k * 1_000_000)
+        for k in range(args.steps)
+    ]
+    encoder = PIDLineEncoder(SENSOR_ID)
+    for step in steps[:1000]:
+        # Point writes whole-number floats without the trailing ".0"
+        assert parse_line(point_encode(*step)) == parse_line(encoder.encode(*step))
+
+    before = steps_per_second(point_encode, steps, args.repeat)
+    after = steps_per_second(encoder.encode, steps, args.repeat)
+    print(f"Point + to_line_protocol(): {before:>12,.0f} steps/s")
+    print(f"PIDLineEncoder.encode:      {after:>12,.0f} steps/s")
+    print(f"Speedup: {after / before:.2f}x")
+
+    sample = steps[:1000]
+    print(f"Peak bytes per step, Point:          {peak_step_bytes(point_encode, sample):>8}")
+    print(f"Peak bytes per step, PIDLineEncoder: {peak_step_bytes(encoder.encode, sample):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of sensor frame decoding.
+
+Compares the generic `SensorReading(**json.loads(message))` construction with the
+fast path of `app.utils.sensor_decoder` and reports frames per second.
+
+Usage:
+    python -m benchmarks.sensor_decoding --frames 200000
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.sensor_decoder import decode_sensor_reading
+
+
+def generic_decode(message: str) -> SensorReading:
+    """Decode a frame the generic way, through a dict of keyword arguments"""
+    return SensorReading(**json.loads(message))
+
+
+def frames_per_second(
+    decode: Callable[[str], SensorReading], messages: List[str], repeat: int
+) -> float:
+    """Best frames per second out of `repeat` passes over the messages"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            decode(message)
+        best = min(best, time.perf_counter() - started)
+    return len(messages) / best
+
+
+def main() -> None:
+    """Decode the same frames with both decoders and report their throughput"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start_ns = time.time_ns()
+    messages = [
+        json.dumps({"value": 12.5 + i * 1e-3, "timestamp_ns": start_ns + i * 1_000_000})
+        for i in range(args.frames)
+    ]
+    for message in messages[:1000]:
+        assert generic_decode(message) == decode_sensor_reading(message)
+
+    before = frames_per_second(generic_decode, messages, args.repeat)
+    after = frames_per_second(decode_sensor_reading, messages, args.repeat)
+    print(f"json.loads + SensorReading(**...): {before:>12,.0f} frames/s")
+    print(f"decode_sensor_reading:            {after:>12,.0f} frames/s")
+    print(f"Speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Local stand-in for the swncrew backend and InfluxDB used by the benchmarks.
+
+Serves the sensor and setpoint WebSockets, the proportional valve endpoint and its
+acknowledging WebSocket command channel, and an InfluxDB line protocol write endpoint.
+Sensor streams are started on demand and every sensor value encodes its sequence
+number, so actuator writes can be matched to the reading that caused them (see
+`StubBackend.value_for`).
+"""
+
+import asyncio
+import gzip
+import threading
+from contextlib import asynccontextmanager
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+
+
+class StubBackend:
+    """
+    Stand-in backend recording send and arrival times in nanoseconds.
+
+    With a proportional-only controller (Kp=1, Ki=Kd=0) and the setpoint
+    `SETPOINT`, the reading with sequence number k produces the valve state k.
+
+    Attributes
+    ----------
+    sent_ns : Dict[int, int]
+        Sensor timestamp of every streamed reading by sequence number
+    posted_ns : Dict[int, int]
+        Arrival time of the first valve write carrying each sequence number
+    posts : int
+        Number of valve writes received over HTTP
+    commands : int
+        Number of valve commands received over the actuator WebSocket
+    influx_writes : int
+        Number of InfluxDB write requests received
+    influx_lines : int
+        Number of line protocol lines received
+    """
+
+    SETPOINT = 1_000_000.0
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5999):
+        self.host = host
+        self.port = port
+        self.sent_ns: Dict[int, int] = {}
+        self.posted_ns: Dict[int, int] = {}
+        self.posts = 0
+        self.commands = 0
+        self.actuator_connections = 0
+        self.influx_writes = 0
+        self.influx_lines = 0
+        self.sensor_connections = 0
+        self.setpoint_connections = 0
+        self._streams: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[uvicorn.Server] = None
+        self.app = self._create_app()
+
+    @classmethod
+    def value_for(cls, sequence: int) -> float:
+        """Sensor value producing the valve state `sequence`"""
+        return cls.SETPOINT - sequence
+
+    @property
+    def base(self) -> str:
+        """Address to use as `BACKEND_BASE`"""
+        return f"{self.host}:{self.port}"
+
+    def _create_app(self) -> FastAPI:
+        @asynccontextmanager
+        async def lifespan(_app: FastAPI):
+            self._loop = asyncio.get_running_loop()
+            self._streams = asyncio.Queue()
+            yield
+
+        app = FastAPI(lifespan=lifespan)
+
+        @app.get("/")
+        async def root():
+            return {"message": "stub backend"}
+
+        @app.websocket("/v1/sensors/flowmeters/ws/setpoint/{_sensor_id}")
+        async def setpoint_ws(websocket: WebSocket, _sensor_id: int):
+            await websocket.accept()
+            self.setpoint_connections += 1
+            await websocket.send_text(str(self.SETPOINT))
+            try:
+                while True:
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+
+        @app.websocket("/v1/sensors/flowmeters/ws/{_sensor_id}")
+        async def sensor_ws(websocket: WebSocket, _sensor_id: int):
+            await websocket.accept()
+            self.sensor_connections += 1
+            try:
+                while True:
+                    first, count, rate_hz = await self._streams.get()
+                    await self._stream(websocket, first, count, rate_hz)
+            except WebSocketDisconnect:
+                pass
+
+        @app.websocket("/v1/actuators/proportional/ws/{_actuator_id}")
+        async def proportional_ws(websocket: WebSocket, _actuator_id: int):
+            await websocket.accept()
+            self.actuator_connections += 1
+            try:
+                while True:
+                    command = await websocket.receive_json()
+                    self.commands += 1
+                    self.posted_ns.setdefault(int(round(command["state"])), time.time_ns())
+                    await websocket.send_json({"seq": command["seq"]})
+            except WebSocketDisconnect:
+                pass
+
+        @app.post("/v1/actuators/proportional/set")
+        async def set_proportional(request: Request):
+            arrived_ns = time.time_ns()
+            body = await request.json()
+            self.posts += 1
+            self.posted_ns.setdefault(int(round(body["state"])), arrived_ns)
+            return body
+
+        @app.post("/api/v2/write", status_code=204)
+        async def influx_write(request: Request):
+            body = await request.body()
+            if request.headers.get("content-encoding") == "gzip":
+                body = gzip.decompress(body)
+            self.influx_writes += 1
+            self.influx_lines += body.count(b"\n") + 1
+
+        return app
+
+    async def _stream(
+        self, websocket: WebSocket, first: int, count: int, rate_hz: float
+    ) -> None:
+        period_ns = int(1e9 / rate_hz)
+        start_ns = time.time_ns()
+        for i in range(count):
+            due_ns = start_ns + i * period_ns
+            delay_ns = due_ns - time.time_ns()
+            if delay_ns > 0:
+                await asyncio.sleep(delay_ns / 1e9)
+            sequence = first + i
+            timestamp_ns = time.time_ns()
+            self.sent_ns[sequence] = timestamp_ns
+            await websocket.send_text(
+                f'{{"value": {self.value_for(sequence)!r}, "timestamp_ns": {timestamp_ns}}}'
+            )
+
+    def stream(self, first: int, count: int, rate_hz: float) -> None:
+        """Stream `count` readings at `rate_hz` on the connected sensor WebSocket"""
+        self._loop.call_soon_threadsafe(
+            self._streams.put_nowait, (first, count, rate_hz)
+        )
+
+    def start(self) -> None:
+        """Serve the stub in a daemon thread and wait until it accepts connections"""
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning")
+        )
+        threading.Thread(target=self._server.run, daemon=True).start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Shut down the stub server"""
+        if self._server is not None:
+            self._server.should_exit = True
+
+    def latencies_ns(self, first: int, count: int) -> List[int]:
+        """Sensor-timestamp-to-valve-write latencies of the readings in a range"""
+        return [
+            self.posted_ns[k] - self.sent_ns[k]
+            for k in range(first, first + count)
+            if k in self.posted_ns and k in self.sent_ns
+        ]
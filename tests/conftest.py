@@ -0,0 +1,16 @@
+import os
+
+# Settings required by app.utils.config, which is loaded on import
+for name, value in {
+    "BACKEND_BASE": "localhost:9",
+    "INFLUXDB_URL": "http://localhost:1",
+    "INFLUXDB_TOKEN": "token",
+    "INFLUXDB_ORG": "org",
+    "INFLUXDB_BUCKET": "bucket",
+    "PID_KP": "1",
+    "PID_KI": "1",
+    "PID_KD": "0",
+    "PID_OUTPUT_MIN": "0",
+    "PID_OUTPUT_MAX": "100",
+}.items():
+    os.environ.setdefault(name, value)
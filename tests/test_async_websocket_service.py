@@ -0,0 +1,54 @@
+# pylint: disable=protected-access
+import asyncio
+from typing import List, Optional
+
+from app.interfaces.actuator import AsyncActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.services.async_websocket_service import AsyncWebSocketService
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+
+class EchoController(ControllerInterface):
+    def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
+        return sensor_reading.value
+
+    def set_setpoint(self, setpoint: Optional[float]) -> None:
+        pass
+
+
+class SlowActuator(AsyncActuatorInterface):
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.values: List[float] = []
+
+    async def update(self, value: float) -> None:
+        await asyncio.sleep(self.delay_s)
+        self.values.append(value)
+
+
+def sensor_message(value: float, timestamp_ns: int) -> str:
+    return f'{{"value": {value}, "timestamp_ns": {timestamp_ns}}}'
+
+
+def test_stop_writes_the_update_for_the_last_reading():
+    async def run() -> List[float]:
+        actuator = SlowActuator(delay_s=0.05)
+        service = AsyncWebSocketService(EchoController(), actuator)
+        service.start()
+        await service._on_sensor_message(sensor_message(1.0, 1))
+        # Stopped while the first write is in flight and the next reading is not computed yet
+        await asyncio.sleep(0.01)
+        await service._on_sensor_message(sensor_message(2.0, 2))
+        await service.stop()
+        return actuator.values
+
+    assert asyncio.run(run()) == [1.0, 2.0]
+
+
+def test_stop_without_pending_work_returns():
+    async def run() -> None:
+        service = AsyncWebSocketService(EchoController(), SlowActuator(delay_s=0.0))
+        service.start()
+        await asyncio.wait_for(service.stop(), 1.0)
+
+    asyncio.run(run())
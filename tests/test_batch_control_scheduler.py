@@ -0,0 +1,63 @@
+# pylint: disable=protected-access
+from typing import List
+
+from app.controllers.vectorized_pid_controller import VectorizedPIDController
+from app.interfaces.actuator import ActuatorInterface
+from app.services.batch_control_scheduler import BatchControlScheduler, ScheduledLoop
+from app.services.stream_watchdog import SENSOR, StreamWatchdog
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.deadline_timer import DeadlineTimer
+
+
+class RecordingActuator(ActuatorInterface):
+    def __init__(self):
+        self.values: List[float] = []
+
+    def update(self, value: float) -> None:
+        self.values.append(value)
+
+
+def test_loops_step_on_new_readings_only():
+    engine = VectorizedPIDController(time_base="sensor")
+    actuators = [RecordingActuator(), RecordingActuator()]
+    latest = [SensorReading(value=1.0, timestamp_ns=1), None]
+    loops = []
+    for index, actuator in enumerate(actuators):
+        loop = engine.add_loop(index)
+        loop.set_setpoint(10.0)
+        loops.append(ScheduledLoop(loop, actuator, lambda index=index: latest[index]))
+    scheduler = BatchControlScheduler(engine, loops, period_s=0.01)
+
+    scheduler._tick()
+    scheduler._tick()
+    latest[1] = SensorReading(value=2.0, timestamp_ns=1)
+    scheduler._tick()
+
+    assert len(actuators[0].values) == 1
+    assert len(actuators[1].values) == 1
+    assert scheduler.stats()["unchanged_readings"] == 2
+    assert engine.stats()["steps"] == 2
+
+
+def test_timed_out_loop_is_neither_stepped_nor_written():
+    engine = VectorizedPIDController(time_base="sensor")
+    actuators = [RecordingActuator(), RecordingActuator()]
+    timer = DeadlineTimer()
+    loops = []
+    for index, actuator in enumerate(actuators):
+        loop = engine.add_loop(index)
+        loop.set_setpoint(10.0)
+        watchdog = StreamWatchdog(loop, actuator, timer, sensor_timeout_s=1.0, safe_state=0.0)
+        loops.append(
+            ScheduledLoop(loop, actuator, lambda: SensorReading(value=1.0, timestamp_ns=1), watchdog)
+        )
+    scheduler = BatchControlScheduler(engine, loops, period_s=0.01)
+
+    # Both watchdogs share the timer, only the first loop times out
+    loops[0].watchdog._on_timeout(SENSOR)
+    scheduler._tick()
+
+    assert actuators[0].values == [0.0]
+    assert len(actuators[1].values) == 1
+    assert not loops[0].loop.snapshot.auto_mode
+    assert loops[1].loop.snapshot.auto_mode
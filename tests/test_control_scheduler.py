@@ -0,0 +1,43 @@
+# pylint: disable=protected-access
+from typing import List, Optional
+
+from app.interfaces.actuator import ActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.services.control_scheduler import ControlScheduler
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+
+class CountingController(ControllerInterface):
+    def __init__(self):
+        self.readings: List[SensorReading] = []
+
+    def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
+        self.readings.append(sensor_reading)
+        return sensor_reading.value
+
+    def set_setpoint(self, setpoint: Optional[float]) -> None:
+        pass
+
+
+class RecordingActuator(ActuatorInterface):
+    def __init__(self):
+        self.values: List[float] = []
+
+    def update(self, value: float) -> None:
+        self.values.append(value)
+
+
+def test_ticks_without_new_reading_are_skipped():
+    controller = CountingController()
+    actuator = RecordingActuator()
+    latest = SensorReading(value=1.0, timestamp_ns=1)
+    scheduler = ControlScheduler(controller, actuator, lambda: latest, period_s=0.01)
+
+    scheduler._tick()
+    scheduler._tick()
+    latest = SensorReading(value=2.0, timestamp_ns=2)
+    scheduler._tick()
+
+    assert actuator.values == [1.0, 2.0]
+    assert scheduler.ticks == 3
+    assert scheduler.stats()["unchanged_ticks"] == 1
@@ -0,0 +1,98 @@
+# pylint: disable=protected-access
+import struct
+import threading
+
+import pytest
+
+from app.utils.controller_state import ControllerState, ControllerStateFile
+
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 4
+
+
+def state(n: int = 1, **changes) -> ControllerState:
+    fields = dict(
+        saved_ns=n,
+        timestamp_ns=n,
+        measurement=float(n),
+        setpoint=float(n),
+        P=float(n),
+        I=float(n),
+        D=float(n),
+        output=float(n),
+        Kp=1.0,
+        Ki=0.5,
+        Kd=0.0,
+        auto_mode=True,
+        enabled=True,
+    )
+    fields.update(changes)
+    return ControllerState(**fields)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state" / "pid.state")
+
+
+def test_snapshot_round_trip(path):
+    state_file = ControllerStateFile(path)
+    assert state_file.load() is None
+
+    saved = state(timestamp_ns=None, measurement=None, output=None, enabled=False)
+    state_file.save(saved)
+
+    assert state_file.load() == saved
+    state_file.close()
+
+
+def test_other_mapping_reads_the_latest_snapshot(path):
+    writer = ControllerStateFile(path)
+    reader = ControllerStateFile(path)
+    writer.save(state(1))
+    writer.save(state(2))
+
+    assert reader.load() == state(2)
+    writer.close()
+    reader.close()
+
+
+def test_snapshot_being_written_is_not_loaded(path):
+    state_file = ControllerStateFile(path)
+    state_file.save(state(1))
+    # A writer that stopped between marking and completing the snapshot
+    (sequence,) = SEQUENCE.unpack_from(state_file._map, SEQUENCE_OFFSET)
+    SEQUENCE.pack_into(state_file._map, SEQUENCE_OFFSET, sequence + 1)
+    state_file.close()
+
+    restarted = ControllerStateFile(path)
+    assert restarted.load(retries=3) is None
+    restarted.save(state(2))
+    assert restarted.load() == state(2)
+    restarted.close()
+
+
+def test_concurrent_reader_never_sees_a_torn_snapshot(path):
+    writer = ControllerStateFile(path)
+    reader = ControllerStateFile(path)
+    writer.save(state(0))
+    done = threading.Event()
+
+    def save_repeatedly():
+        for n in range(1, 20_000):
+            writer.save(state(n))
+        done.set()
+
+    thread = threading.Thread(target=save_repeatedly)
+    thread.start()
+    loads = 0
+    while not done.is_set():
+        loaded = reader.load()
+        if loaded is not None:
+            assert loaded == state(loaded.saved_ns)
+            loads += 1
+    thread.join()
+
+    assert loads > 0
+    writer.close()
+    reader.close()
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.deadline_timer import DeadlineTimer
+
+
+@pytest.fixture
+def timer():
+    timer = DeadlineTimer()
+    timer.start()
+    yield timer
+    timer.stop()
+
+
+def test_deadline_fires_once(timer):
+    fired = threading.Event()
+    timer.arm("stream", 0.05, fired.set)
+
+    assert fired.wait(1.0)
+    time.sleep(0.1)
+    assert timer.fired == 1
+
+
+def test_rearming_extends_the_deadline(timer):
+    fired_at = []
+    started = time.monotonic()
+    timer.arm("stream", 0.1, lambda: fired_at.append(time.monotonic()))
+    for _ in range(3):
+        time.sleep(0.05)
+        timer.arm("stream", 0.1, lambda: fired_at.append(time.monotonic()))
+
+    time.sleep(0.3)
+    assert len(fired_at) == 1
+    assert fired_at[0] - started >= 0.25
+
+
+def test_earlier_deadline_wakes_the_timer(timer):
+    fired = threading.Event()
+    timer.arm("late", 10.0, lambda: None)
+    timer.arm("early", 0.05, fired.set)
+
+    assert fired.wait(1.0)
+
+
+def test_cancelled_deadline_does_not_fire(timer):
+    fired = threading.Event()
+    timer.arm("stream", 0.05, fired.set)
+    timer.cancel("stream")
+
+    assert not fired.wait(0.2)
+    assert timer.fired == 0
+
+
+def test_failing_callback_does_not_stop_the_timer(timer):
+    def fail():
+        raise RuntimeError("callback failed")
+
+    fired = threading.Event()
+    timer.arm("failing", 0.01, fail)
+    timer.arm("stream", 0.05, fired.set)
+
+    assert fired.wait(1.0)
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from app.utils.disk_spool import DiskSpool
+
+HEADER_SIZE = 16
+
+
+def records(*names: str):
+    return [f"{name}\n".encode() for name in names]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "spool" / "influx.spool")
+
+
+def test_peek_returns_complete_records_in_order(path):
+    spool = DiskSpool(path, 1024)
+    spool.append(records("m v=1", "m v=2", "m v=3"))
+
+    assert spool.peek(13) == b"m v=1\nm v=2\n"
+    spool.consume(12)
+    assert spool.peek(1024) == b"m v=3\n"
+    # A record larger than the requested size is still returned whole
+    assert spool.peek(2) == b"m v=3\n"
+    spool.consume(6)
+    assert spool.pending_bytes == 0
+    spool.close()
+
+
+def test_full_spool_compacts_before_dropping(path):
+    spool = DiskSpool(path, HEADER_SIZE + 18)
+    assert spool.append(records("aaaaa", "bbbbb", "ccccc"))
+    spool.consume(6)
+
+    # Only fits once the replayed record is compacted away
+    assert spool.append(records("ddddd"))
+    assert spool.peek(1024) == b"bbbbb\nccccc\nddddd\n"
+    assert not spool.append(records("eeeee"))
+    assert spool.stats()["dropped"] == 1
+    assert spool.peek(1024) == b"bbbbb\nccccc\nddddd\n"
+    spool.close()
+
+
+def test_reopened_spool_resumes_unread_records(path):
+    spool = DiskSpool(path, 1024)
+    spool.append(records("m v=1", "m v=2"))
+    spool.consume(6)
+    spool.close()
+
+    spool = DiskSpool(path, 1024)
+    assert spool.peek(1024) == b"m v=2\n"
+    spool.append(records("m v=3"))
+    assert spool.peek(1024) == b"m v=2\nm v=3\n"
+    spool.close()
+
+
+def test_invalid_offsets_reset_the_spool(path):
+    spool = DiskSpool(path, 1024)
+    spool.append(records("m v=1"))
+    spool.close()
+    with open(path, "r+b") as f:
+        f.write(b"\xff" * HEADER_SIZE)
+
+    spool = DiskSpool(path, 1024)
+    assert spool.pending_bytes == 0
+    assert os.path.getsize(path) == 1024
+    spool.close()
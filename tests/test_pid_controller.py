@@ -0,0 +1,48 @@
+import pytest
+
+from app.controllers.pid_controller import PIDController
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+
+
+def sensor_controller() -> PIDController:
+    return PIDController(time_base="sensor", history_size=0)
+
+
+def test_setpoint_change_recomputes_on_the_last_reading():
+    controller = sensor_controller()
+    controller.set_setpoint(10.0)
+    controller.calculate_update(SensorReading(value=5.0, timestamp_ns=1_000_000_000))
+    reading = SensorReading(value=5.0, timestamp_ns=2_000_000_000)
+    before = controller.calculate_update(reading)
+
+    controller.set_setpoint(20.0)
+    after = controller.calculate_update(reading)
+
+    assert after is not None and after > before
+    assert controller.snapshot.setpoint == 20.0
+    assert controller.stats()["duplicates"] == 0
+
+
+def test_recompute_does_not_advance_time():
+    controller = sensor_controller()
+    controller.set_setpoint(10.0)
+    controller.calculate_update(SensorReading(value=5.0, timestamp_ns=1_000_000_000))
+    reading = SensorReading(value=5.0, timestamp_ns=2_000_000_000)
+    controller.calculate_update(reading)
+    integral = controller.snapshot.I
+
+    controller.set_setpoint(10.0)
+    controller.calculate_update(reading)
+
+    assert controller.snapshot.I == pytest.approx(integral)
+
+
+def test_repeated_sensor_frames_are_duplicates():
+    controller = sensor_controller()
+    controller.set_setpoint(10.0)
+    reading = SensorReading(value=5.0, timestamp_ns=1_000_000_000)
+    controller.calculate_update(reading)
+
+    assert controller.calculate_update(reading) is None
+    assert controller.calculate_update(SensorReading(value=5.0, timestamp_ns=1)) is None
+    assert controller.stats() == {"steps": 1, "duplicates": 1, "out_of_order": 1}
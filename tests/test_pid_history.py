@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from app.utils.pid_history import PIDHistoryBuffer
+
+
+def append_steps(history: PIDHistoryBuffer, first: int, last: int) -> None:
+    for n in range(first, last + 1):
+        history.append(n, float(n), 10.0, 1.0, 2.0, 3.0, float(n))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history" / "pid.history")
+
+
+def test_oldest_steps_are_overwritten():
+    history = PIDHistoryBuffer(4)
+    append_steps(history, 1, 6)
+
+    steps = history.query()
+    assert list(steps["timestamp_ns"]) == [3, 4, 5, 6]
+    assert list(steps["output"]) == [3.0, 4.0, 5.0, 6.0]
+    assert list(history.query(start_ns=4, end_ns=5)["timestamp_ns"]) == [4, 5]
+    assert list(history.query(max_points=2)["timestamp_ns"]) == [3, 5]
+
+
+def test_other_process_reads_a_file_backed_history(path):
+    assert PIDHistoryBuffer.attach(path) is None
+    history = PIDHistoryBuffer(4, path)
+    reader = PIDHistoryBuffer.attach(path)
+    append_steps(history, 1, 5)
+
+    steps = reader.query()
+    assert list(steps["timestamp_ns"]) == [2, 3, 4, 5]
+    assert not reader.timestamp_ns.flags.writeable
+    reader.close()
+    history.close()
+
+
+def test_steps_overwritten_while_reading_are_dropped(path, monkeypatch):
+    history = PIDHistoryBuffer(4, path)
+    append_steps(history, 1, 4)
+    reader = PIDHistoryBuffer.attach(path)
+    # The writer started two more steps while the reader copied the rows
+    monkeypatch.setattr(PIDHistoryBuffer, "started", property(lambda self: 6))
+
+    assert list(reader.query()["timestamp_ns"]) == [3, 4]
+    history.close()
+
+
+def test_recreated_history_is_reattached(path):
+    history = PIDHistoryBuffer(4, path)
+    reader = PIDHistoryBuffer.attach(path)
+    history.close()
+
+    PIDHistoryBuffer(8, path).close()
+    assert reader.stale
+    assert np.array_equal(PIDHistoryBuffer.attach(path).query()["timestamp_ns"], [])
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from app.actuators.proportional_valve import (
+    AsyncProportionalValveActuator,
+    ProportionalValveActuator,
+)
+from app.swncrew_backend_client import Client
+from app.swncrew_backend_client.errors import UnexpectedStatus
+from app.utils.adaptive_timeout import AdaptiveTimeout
+
+BASE_URL = "http://backend"
+CLIENT_TIMEOUT = httpx.Timeout(5.0)
+
+
+class StandInBackend:
+    """Set state endpoint of the backend answering with `status`"""
+
+    def __init__(self, status: int = 200):
+        self.status = status
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(self.status, json={"id": 1, "state": 0.0})
+
+
+def sync_client(backend: StandInBackend) -> Client:
+    client = Client(base_url=BASE_URL, timeout=CLIENT_TIMEOUT)
+    return client.set_httpx_client(
+        httpx.Client(
+            base_url=BASE_URL, timeout=CLIENT_TIMEOUT, transport=httpx.MockTransport(backend)
+        )
+    )
+
+
+def async_client(backend: StandInBackend) -> Client:
+    client = Client(base_url=BASE_URL, timeout=CLIENT_TIMEOUT)
+    return client.set_async_httpx_client(
+        httpx.AsyncClient(
+            base_url=BASE_URL, timeout=CLIENT_TIMEOUT, transport=httpx.MockTransport(backend)
+        )
+    )
+
+
+def timeout() -> AdaptiveTimeout:
+    return AdaptiveTimeout(initial_s=0.25, min_s=0.01, max_s=0.5, update_every=1)
+
+
+def test_update_posts_state():
+    backend = StandInBackend()
+    ProportionalValveActuator(sync_client(backend)).update(42.0)
+
+    (request,) = backend.requests
+    assert request.url.path == "/v1/actuators/proportional/set"
+    assert json.loads(request.content)["state"] == 42.0
+
+
+@pytest.mark.parametrize("status", [422, 500, 503])
+def test_update_fails_on_error_status(status):
+    backend = StandInBackend(status)
+    adaptive = timeout()
+    actuator = ProportionalValveActuator(sync_client(backend), adaptive)
+
+    with pytest.raises(UnexpectedStatus):
+        actuator.update(42.0)
+    # Error responses say nothing about the latency of applying a state
+    assert adaptive.current_s == 0.25
+
+
+def test_timeout_follows_adaptive_timeout():
+    backend = StandInBackend()
+    adaptive = timeout()
+    actuator = ProportionalValveActuator(sync_client(backend), adaptive)
+
+    actuator.update(1.0)
+    # Recomputed from the observed latency after every request
+    adapted_s = adaptive.current_s
+    actuator.update(2.0)
+
+    assert adapted_s != 0.25
+    timeouts = [request.extensions["timeout"]["read"] for request in backend.requests]
+    assert timeouts == [0.25, adapted_s]
+
+
+def test_async_update_fails_on_error_status():
+    backend = StandInBackend(500)
+    actuator = AsyncProportionalValveActuator(async_client(backend), timeout())
+
+    with pytest.raises(UnexpectedStatus):
+        asyncio.run(actuator.update(42.0))
+    assert backend.requests[0].extensions["timeout"]["read"] == 0.25
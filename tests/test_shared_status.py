@@ -0,0 +1,109 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.controllers.shared_controller_view import SharedControllerView
+from app.routes.api import create_api_router
+from app.routes.metrics import create_metrics_router
+from app.utils.control_status import ControlStatusFile
+from app.utils.metrics import MetricsRegistry
+from app.utils.pid_history import PIDHistoryBuffer
+
+STATUS = {
+    "stats": {"worker": {"control_owner": 1}, "controller": {"steps": 7}},
+    "breaker": {
+        "state": "open",
+        "consecutive_failures": 3,
+        "opened": 1,
+        "rejected": 2,
+        "timeout_s": 0.25,
+    },
+    "snapshot": {
+        "timestamp_ns": 5,
+        "measurement": 1.0,
+        "setpoint": 2.0,
+        "P": 0.5,
+        "I": 0.25,
+        "D": 0.0,
+        "output": 0.75,
+        "auto_mode": True,
+    },
+    "metrics": "pid_control_controller_steps 7\n",
+}
+
+
+@pytest.fixture
+def status_file(tmp_path):
+    return ControlStatusFile(str(tmp_path / "control.status"))
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / "pid.history")
+
+
+@pytest.fixture
+def client(status_file, history_path):
+    """API of a worker not owning the control loop"""
+    application = FastAPI()
+    application.include_router(
+        create_api_router(
+            SharedControllerView(status_file, history_path=history_path),
+            stats_sources={"worker": lambda: {"control_owner": 0}},
+            control_status=status_file,
+        )
+    )
+    application.include_router(create_metrics_router(MetricsRegistry(), status_file))
+    return TestClient(application)
+
+
+def test_unpublished_status_is_unavailable(client):
+    assert client.get("/stats").status_code == 503
+    assert client.get("/metrics").status_code == 503
+    assert client.get("/actuator/breaker").status_code == 503
+    assert client.get("/pid/history").status_code == 404
+
+
+def test_owner_status_is_served(client, status_file):
+    status_file.publish(STATUS)
+
+    stats = client.get("/stats").json()
+    assert stats["controller"] == {"steps": 7}
+    assert stats["worker"] == {"control_owner": 0}
+    assert stats["control_status"]["age_s"] >= 0
+    assert client.get("/metrics").text == STATUS["metrics"]
+    assert client.get("/actuator/breaker").json() == STATUS["breaker"]
+    assert client.get("/pid/components").json() == {"P": 0.5, "I": 0.25, "D": 0.0}
+
+
+def test_disabled_breaker_is_not_found(client, status_file):
+    status_file.publish({**STATUS, "breaker": None})
+
+    assert client.get("/actuator/breaker").status_code == 404
+
+
+def test_owner_history_is_served(client, history_path):
+    history = PIDHistoryBuffer(8, history_path)
+    history.append(5, 1.0, 2.0, 0.5, 0.25, 0.0, 0.75)
+
+    steps = client.get("/pid/history").json()
+    assert steps["timestamp_ns"] == [5]
+    assert steps["output"] == [0.75]
+    history.close()
+
+
+def test_loops_are_selected_by_sensor(status_file):
+    application = FastAPI()
+    application.include_router(
+        create_api_router(
+            SharedControllerView(status_file),
+            control_status=status_file,
+            loops={3: SharedControllerView(status_file, sensor_id=3)},
+        )
+    )
+    client = TestClient(application)
+    status_file.publish({**STATUS, "snapshots": {"3": {**STATUS["snapshot"], "P": 1.5}}})
+
+    assert client.get("/pid/components").json()["P"] == 0.5
+    assert client.get("/pid/components", params={"sensor_id": 3}).json()["P"] == 1.5
+    assert client.get("/pid/components", params={"sensor_id": 4}).status_code == 404
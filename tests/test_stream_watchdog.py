@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import List, Optional
+
+from app.actuators.actuator_writer import ActuatorWriter
+from app.interfaces.actuator import ActuatorInterface
+from app.interfaces.controller import ControllerInterface
+from app.services.stream_watchdog import StreamWatchdog
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.deadline_timer import DeadlineTimer
+
+
+class HoldingController(ControllerInterface):
+    def __init__(self):
+        self.held = False
+        self.released_with: List[Optional[float]] = []
+
+    def calculate_update(self, sensor_reading: SensorReading) -> Optional[float]:
+        return sensor_reading.value
+
+    def set_setpoint(self, setpoint: Optional[float]) -> None:
+        pass
+
+    def hold(self) -> None:
+        self.held = True
+
+    def release(self, output: Optional[float] = None) -> None:
+        self.held = False
+        self.released_with.append(output)
+
+
+class GatedActuator(ActuatorInterface):
+    """Records written values, blocking each write until `gate` is set"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.writing = threading.Event()
+        self.values: List[float] = []
+
+    def update(self, value: float) -> None:
+        self.writing.set()
+        self.gate.wait()
+        self.values.append(value)
+
+
+def wait_for(condition, timeout_s: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_safe_state_is_not_overwritten_by_queued_updates():
+    valve = GatedActuator()
+    writer = ActuatorWriter(valve)
+    writer.start()
+    timer = DeadlineTimer()
+    timer.start()
+    watchdog = StreamWatchdog(
+        HoldingController(), writer, timer, sensor_timeout_s=0.05, safe_state=0.0
+    )
+    try:
+        valve.gate.clear()
+        writer.update(1.0)
+        valve.writing.wait(1.0)
+        # Queued behind the write in flight when the sensor stream times out
+        writer.update(2.0)
+        watchdog.start()
+        wait_for(lambda: watchdog.timed_out)
+        valve.gate.set()
+
+        wait_for(lambda: watchdog.safe_state_writes == 1)
+        time.sleep(0.05)
+        assert valve.values == [1.0, 0.0]
+        assert writer.stats()["discarded"] == 1
+    finally:
+        timer.stop()
+        writer.stop()
+
+
+class FailingActuator(ActuatorInterface):
+    """Fails the first `failures` writes"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.values: List[float] = []
+
+    def update(self, value: float) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        self.values.append(value)
+
+
+def test_timeout_holds_and_resuming_releases_from_safe_state():
+    controller = HoldingController()
+    valve = FailingActuator(failures=1)
+    timer = DeadlineTimer()
+    timer.start()
+    watchdog = StreamWatchdog(
+        controller,
+        valve,
+        timer,
+        sensor_timeout_s=0.05,
+        safe_state=5.0,
+        safe_state_retry_s=0.05,
+    )
+    steps: List[SensorReading] = []
+    reading = SensorReading(value=1.0, timestamp_ns=1)
+    try:
+        watchdog.start()
+        wait_for(lambda: watchdog.safe_state_writes == 1)
+        assert controller.held
+        assert watchdog.safe_state_failures == 1
+        assert valve.values == [5.0]
+
+        watchdog.run_step(steps.append, reading)
+        assert steps == []
+
+        watchdog.sensor_received()
+        watchdog.run_step(steps.append, reading)
+        assert not controller.held
+        # Bumpless from the state the actuator holds
+        assert controller.released_with == [5.0]
+        assert steps == [reading]
+        assert watchdog.stats()["sensor_timeouts"] == 1
+    finally:
+        timer.stop()
+
+
+def test_steps_on_outdated_readings_are_skipped():
+    timer = DeadlineTimer()
+    watchdog = StreamWatchdog(
+        HoldingController(), FailingActuator(0), timer, max_reading_age_s=0.05
+    )
+    steps: List[SensorReading] = []
+    reading = SensorReading(value=1.0, timestamp_ns=1)
+
+    watchdog.sensor_received()
+    watchdog.run_step(steps.append, reading)
+    time.sleep(0.1)
+    watchdog.run_step(steps.append, reading)
+
+    assert steps == [reading]
+    assert watchdog.stale_readings == 1
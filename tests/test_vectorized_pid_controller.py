@@ -0,0 +1,154 @@
+import random
+from typing import List, Tuple
+
+import pytest
+
+from app.controllers.pid_controller import PIDController
+from app.controllers.vectorized_pid_controller import VectorizedPIDController
+from app.swncrew_backend_client.models.sensor_reading import SensorReading
+from app.utils.pid_history import PIDHistoryBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingTelemetry:
+    def __init__(self):
+        self.steps: List[Tuple] = []
+
+    def write_step(self, sensor_id, p, i, d, setpoint, auto_mode, timestamp_ns):
+        self.steps.append((sensor_id, p, i, d, setpoint, auto_mode, timestamp_ns))
+
+
+def reading(value: float, seconds: float) -> SensorReading:
+    return SensorReading(value=value, timestamp_ns=int(seconds * 1e9))
+
+
+@pytest.mark.parametrize("time_base", ["monotonic", "sensor"])
+def test_loop_matches_pid_controller(time_base):
+    clock = FakeClock()
+    reference = PIDController(time_fn=clock, history_size=0, time_base=time_base)
+    loop = VectorizedPIDController(time_fn=clock, time_base=time_base).add_loop(1)
+    rng = random.Random(7)
+    timestamp_ns = 0
+
+    for _ in range(500):
+        clock.now += rng.choice([0.0, 0.005, 0.02, 0.1])
+        # Repeated and out-of-order sensor frames included
+        timestamp_ns += rng.choice([0, -5, 10_000_000, 50_000_000])
+        command = rng.random()
+        if command < 0.05:
+            setpoint = rng.choice([None, 10.0, 50.0])
+            reference.set_setpoint(setpoint)
+            loop.set_setpoint(setpoint)
+        elif command < 0.08:
+            reference.hold()
+            loop.hold()
+        elif command < 0.11:
+            output = rng.choice([None, 3.0])
+            reference.release(output)
+            loop.release(output)
+        sensor_reading = SensorReading(value=rng.uniform(0, 60), timestamp_ns=timestamp_ns)
+
+        assert loop.calculate_update(sensor_reading) == pytest.approx(
+            reference.calculate_update(sensor_reading)
+        )
+        assert loop.snapshot == pytest.approx(reference.snapshot)
+
+    assert loop.stats() == reference.stats()
+
+
+def test_tick_steps_all_staged_loops_at_once():
+    clock = FakeClock()
+    engine = VectorizedPIDController(time_fn=clock, time_base="sensor")
+    loops = [engine.add_loop(sensor_id) for sensor_id in range(3)]
+    references = [PIDController(time_fn=clock, history_size=0, time_base="sensor") for _ in loops]
+    for setpoint, loop, reference in zip((10.0, 20.0, None), loops, references):
+        loop.set_setpoint(setpoint)
+        reference.set_setpoint(setpoint)
+
+    for second in (1, 2, 3):
+        for value, loop in zip((1.0, 2.0, 3.0), loops):
+            loop.submit(reading(value, second))
+        indices, updates = engine.tick()
+
+        # The disabled loop drops its reading
+        assert indices.tolist() == [0, 1]
+        for index, update in zip(indices.tolist(), updates.tolist()):
+            expected = references[index].calculate_update(reading(index + 1.0, second))
+            assert update == pytest.approx(expected)
+
+    indices, _ = engine.tick()
+    assert indices.size == 0
+    assert engine.stats() == {
+        "loops": 3,
+        "ticks": 4,
+        "steps": 6,
+        "duplicates": 0,
+        "out_of_order": 0,
+    }
+
+
+def test_held_loop_skips_ticks_and_restarts_bumplessly():
+    engine = VectorizedPIDController(time_fn=FakeClock(), time_base="sensor")
+    held, running = engine.add_loop(1), engine.add_loop(2)
+    for loop in (held, running):
+        loop.set_setpoint(10.0)
+        loop.submit(reading(5.0, 1))
+    engine.tick()
+
+    held.hold()
+    for loop in (held, running):
+        loop.submit(reading(5.0, 2))
+    indices, _ = engine.tick()
+    assert indices.tolist() == [1]
+    assert not held.snapshot.auto_mode
+
+    held.release(40.0)
+    # The first step after releasing starts from the given output
+    assert sum(held.snapshot[3:6]) == pytest.approx(40.0)
+    held.submit(reading(10.0, 3))
+    indices, updates = engine.tick()
+    assert indices.tolist() == [0]
+    assert updates[0] == pytest.approx(40.0, abs=1e-6)
+
+
+def test_steps_are_recorded_per_loop():
+    telemetry = RecordingTelemetry()
+    engine = VectorizedPIDController(
+        time_fn=FakeClock(), telemetry=telemetry, time_base="sensor"
+    )
+    histories = [PIDHistoryBuffer(8), PIDHistoryBuffer(8)]
+    loops = [engine.add_loop(7, histories[0]), engine.add_loop(9, histories[1])]
+    for loop in loops:
+        loop.set_setpoint(10.0)
+    loops[1].submit(reading(4.0, 1))
+    _, updates = engine.tick()
+
+    steps = histories[1].query()
+    assert histories[0].count == 0
+    assert steps["timestamp_ns"].tolist() == [1_000_000_000]
+    assert steps["measurement"].tolist() == [4.0]
+    assert steps["output"].tolist() == [updates[0]]
+    snapshot = loops[1].snapshot
+    assert telemetry.steps == [
+        (9, snapshot.P, snapshot.I, snapshot.D, 10.0, True, 1_000_000_000)
+    ]
+
+
+def test_loops_grow_beyond_the_initial_capacity():
+    engine = VectorizedPIDController(time_fn=FakeClock(), time_base="sensor", capacity=1)
+    loops = [engine.add_loop(sensor_id) for sensor_id in range(5)]
+    for loop in loops:
+        loop.set_setpoint(10.0)
+        loop.submit(reading(5.0, 1))
+
+    indices, _ = engine.tick()
+
+    assert indices.tolist() == [0, 1, 2, 3, 4]
+    assert all(loop.snapshot.setpoint == 10.0 for loop in loops)
@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from typing import Callable, List
+
+import pytest
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve
+
+from app.actuators.websocket_valve import WebSocketValveActuator
+from app.interfaces.actuator import ActuatorInterface
+
+
+class RecordingActuator(ActuatorInterface):
+    """Fallback standing in for the HTTP actuator"""
+
+    def __init__(self):
+        self.values: List[float] = []
+
+    def update(self, value: float) -> None:
+        self.values.append(value)
+
+
+class StandInBackend:
+    """Actuator command channel of the backend, acknowledging commands while `ack` is set"""
+
+    def __init__(self):
+        self.ack = threading.Event()
+        self.ack.set()
+        self.commands: List[dict] = []
+        self.connections = []
+        self._server = serve(self._handle, "127.0.0.1", 0)
+        self.url = f"ws://127.0.0.1:{self._server.socket.getsockname()[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _handle(self, connection) -> None:
+        self.connections.append(connection)
+        try:
+            for message in connection:
+                command = json.loads(message)
+                self.commands.append(command)
+                if self.ack.is_set():
+                    connection.send(json.dumps({"seq": command["seq"]}))
+        except ConnectionClosed:
+            pass
+
+    def drop_connections(self) -> None:
+        for connection in self.connections:
+            connection.close()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._thread.join()
+
+
+def wait_for(condition: Callable[[], bool], timeout_s: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def backend():
+    backend = StandInBackend()
+    yield backend
+    backend.shutdown()
+
+
+@pytest.fixture
+def fallback():
+    return RecordingActuator()
+
+
+@pytest.fixture
+def actuator(backend, fallback):
+    actuator = WebSocketValveActuator(
+        fallback, url=backend.url, ack_timeout_s=0.2, reconnect_interval_s=0.05
+    )
+    actuator.start()
+    wait_for(lambda: actuator.connected)
+    yield actuator
+    actuator.stop()
+
+
+def test_acknowledgements_are_matched_by_sequence_number(actuator, backend, fallback):
+    for value in (10.0, 20.0, 30.0):
+        actuator.update(value)
+
+    wait_for(lambda: actuator.acked == 3)
+    assert [command["state"] for command in backend.commands] == [10.0, 20.0, 30.0]
+    assert [command["seq"] for command in backend.commands] == [1, 2, 3]
+    assert actuator.stats()["ack_timeouts"] == 0
+    assert actuator.ack_latency.count == 3
+    assert fallback.values == []
+
+
+def test_unknown_acknowledgements_are_ignored(actuator, backend):
+    actuator.update(10.0)
+    wait_for(lambda: actuator.acked == 1)
+
+    backend.connections[-1].send(json.dumps({"seq": 1}))
+    backend.connections[-1].send(json.dumps({"seq": 99}))
+    actuator.update(20.0)
+
+    wait_for(lambda: actuator.acked == 2)
+    time.sleep(0.05)
+    assert actuator.acked == 2
+
+
+def test_unacknowledged_command_is_resent_over_fallback(actuator, backend, fallback):
+    backend.ack.clear()
+    actuator.update(42.0)
+
+    wait_for(lambda: fallback.values == [42.0])
+    assert actuator.ack_timeouts == 1
+    assert actuator.resent == 1
+    assert actuator.acked == 0
+
+
+def test_commands_use_fallback_after_ack_timeout(actuator, backend, fallback):
+    backend.ack.clear()
+    actuator.update(1.0)
+    time.sleep(0.3)
+    actuator.update(2.0)
+
+    # The newer command supersedes the overdue one instead of resending it
+    assert fallback.values == [2.0]
+    assert actuator.fallbacks == 1
+    assert actuator.resent == 0
+    assert actuator.ack_timeouts == 1
+
+
+def test_superseded_commands_are_not_resent(actuator, backend, fallback):
+    backend.ack.clear()
+    actuator.update(1.0)
+    wait_for(lambda: len(backend.commands) == 1)
+    backend.ack.set()
+    actuator.update(2.0)
+
+    wait_for(lambda: actuator.acked == 1)
+    time.sleep(0.5)
+    assert fallback.values == []
+    assert actuator.resent == 0
+
+
+def test_reconnects_after_connection_is_dropped(actuator, backend, fallback):
+    actuator.update(1.0)
+    wait_for(lambda: actuator.acked == 1)
+
+    backend.drop_connections()
+    wait_for(lambda: actuator.connects == 2 and actuator.connected)
+    actuator.update(2.0)
+
+    wait_for(lambda: actuator.acked == 2)
+    assert backend.commands[-1]["state"] == 2.0
+    assert fallback.values == []
+
+
+def test_unavailable_channel_uses_fallback(backend, fallback):
+    backend.shutdown()
+    actuator = WebSocketValveActuator(fallback, url=backend.url, reconnect_interval_s=0.05)
+    actuator.start()
+    try:
+        actuator.update(5.0)
+    finally:
+        actuator.stop()
+
+    assert fallback.values == [5.0]
+    assert actuator.stats()["connected"] == 0
+    assert actuator.sent == 0
+
+
+def test_override_is_acknowledged_behind_earlier_commands(actuator, backend, fallback):
+    actuator.update(1.0)
+    actuator.override(0.0)
+
+    assert [command["state"] for command in backend.commands] == [1.0, 0.0]
+    assert actuator.acked == 2
+    assert fallback.values == []
+
+
+def test_override_supersedes_unacknowledged_commands(actuator, backend, fallback):
+    backend.ack.clear()
+    actuator.update(1.0)
+    actuator.override(0.0)
+
+    time.sleep(0.5)
+    # The earlier command is overdue before the override is written, and never resent
+    assert fallback.values and set(fallback.values) == {0.0}
+    assert actuator.ack_timeouts == 2